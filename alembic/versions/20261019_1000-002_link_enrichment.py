@@ -0,0 +1,62 @@
+"""Link metadata enrichment
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Nullable metadata columns on entries
+    op.add_column("entries", sa.Column("link_title", sa.String(length=500), nullable=True))
+    op.add_column("entries", sa.Column("link_description", sa.Text(), nullable=True))
+    op.add_column("entries", sa.Column("link_image", sa.Text(), nullable=True))
+    op.add_column("entries", sa.Column("reading_time_minutes", sa.Integer(), nullable=True))
+    op.add_column("entries", sa.Column("enriched_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Durable queue of pending enrichment work
+    op.create_table(
+        "link_enrichment_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.Integer(), nullable=False),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_link_enrichment_jobs_entry_id"),
+        "link_enrichment_jobs",
+        ["entry_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(op.f("ix_link_enrichment_jobs_entry_id"), table_name="link_enrichment_jobs")
+    op.drop_table("link_enrichment_jobs")
+
+    op.drop_column("entries", "enriched_at")
+    op.drop_column("entries", "reading_time_minutes")
+    op.drop_column("entries", "link_image")
+    op.drop_column("entries", "link_description")
+    op.drop_column("entries", "link_title")
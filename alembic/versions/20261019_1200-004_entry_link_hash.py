@@ -0,0 +1,32 @@
+"""Entry link hash for duplicate detection
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Existing rows are filled by scripts/backfill_link_hashes.py
+    op.add_column("entries", sa.Column("link_hash", sa.String(length=32), nullable=True))
+    op.create_index(
+        "ix_entries_owner_id_link_hash", "entries", ["owner_id", "link_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_entries_owner_id_link_hash", table_name="entries")
+    op.drop_column("entries", "link_hash")
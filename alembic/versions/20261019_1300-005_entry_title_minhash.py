@@ -0,0 +1,28 @@
+"""Entry title MinHash signatures
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # Existing rows get signatures lazily on the first duplicates lookup
+    op.add_column("entries", sa.Column("title_minhash", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_column("entries", "title_minhash")
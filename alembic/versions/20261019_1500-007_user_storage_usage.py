@@ -0,0 +1,55 @@
+"""Per-user upload storage usage
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    op.create_table(
+        "user_storage_usage",
+        sa.Column("user_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("bytes_used", sa.BigInteger(), nullable=False),
+        sa.Column("file_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index(
+        op.f("ix_user_storage_usage_bytes_used"),
+        "user_storage_usage",
+        ["bytes_used"],
+        unique=False,
+    )
+    # Seed totals from existing uploads; the reconciliation job refines them
+    op.execute(
+        """
+        INSERT INTO user_storage_usage (user_id, bytes_used, file_count)
+        SELECT uploads.owner_id, SUM(upload_blobs.size), COUNT(*)
+        FROM uploads JOIN upload_blobs ON upload_blobs.sha256 = uploads.sha256
+        GROUP BY uploads.owner_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index(op.f("ix_user_storage_usage_bytes_used"), table_name="user_storage_usage")
+    op.drop_table("user_storage_usage")
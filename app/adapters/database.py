@@ -5,19 +5,27 @@ from collections.abc import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+# Imported for their engine-wide cursor event listeners
+from app.adapters import query_stats, slow_queries  # noqa: F401
 from app.core.config import settings
+from app.core.metrics import register_pool_metrics
 
 logger = logging.getLogger(__name__)
 
-# Create async engine
+# Create async engine; SQLite (local runs, load tests) does not use a sized pool
+pool_options = (
+    {} if settings.database_url.startswith("sqlite") else {"pool_size": 10, "max_overflow": 20}
+)
 engine = create_async_engine(
     settings.database_url,
     echo=settings.db_echo,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    **pool_options,
 )
 
+# Pool usage is read at scrape time; dispose() replaces the pool
+register_pool_metrics(lambda: engine.sync_engine.pool)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
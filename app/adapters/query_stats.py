@@ -0,0 +1,91 @@
+"""
+Per-context database query statistics.
+Cursor events on every engine add to the statistics object of the current
+context, so a request (or any other unit of work) can see how many queries
+it ran and how long they took without passing anything through the code.
+"""
+
+import contextvars
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Queries executed and time spent in the database for one unit of work."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.count = 0
+        self.duration = 0.0
+        # Executions per statement text; parameters are bound separately, so
+        # a loop issuing the same query per row shows up as one hot entry
+        self.statements: dict[str, int] = {}
+
+    @property
+    def duration_ms(self) -> float:
+        """Total query time in milliseconds."""
+        return self.duration * 1000
+
+    def most_repeated(self) -> tuple[Optional[str], int]:
+        """
+        Get the statement executed most often.
+
+        Returns:
+            Tuple of (statement, executions), or (None, 0) without queries
+        """
+        if not self.statements:
+            return None, 0
+        statement = max(self.statements, key=self.statements.__getitem__)
+        return statement, self.statements[statement]
+
+
+_query_stats: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+
+
+def track_queries() -> QueryStats:
+    """
+    Start collecting query statistics for the current context.
+
+    Tasks created afterwards share the same statistics object.
+
+    Returns:
+        Statistics object updated as queries run
+    """
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Get the statistics collected for the current context, if any."""
+    return _query_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    """Remember when the statement started."""
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    """Add the statement to the statistics of the current context."""
+    stats = _query_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is None or started is None:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - started
+    stats.statements[statement] = stats.statements.get(statement, 0) + 1
@@ -0,0 +1,180 @@
+"""
+Per-statement timing aggregated by normalized fingerprint.
+Every statement is timed by the cursor events of query_stats; this module
+folds the timings into a bounded table keyed by the statement with its
+literals stripped, and logs statements slower than the configured threshold.
+"""
+
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logging import get_request_id
+
+logger = logging.getLogger(__name__)
+
+# Recent durations kept per fingerprint for the percentiles
+SAMPLES_PER_FINGERPRINT = 256
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+\b|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so executions differing only in values share a key.
+
+    String and numeric literals and driver placeholders become ``?``, lists of
+    values collapse to ``(?+)`` and whitespace is squeezed.
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        Normalized statement
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, int(round(fraction * len(ordered))) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class _FingerprintStats:
+    """Timings of one fingerprint."""
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=SAMPLES_PER_FINGERPRINT)
+
+
+class StatementTable:
+    """
+    Bounded table of statement timings by fingerprint.
+
+    Counts, totals and maxima are exact; percentiles cover the most recent
+    executions. When full, the least recently executed fingerprint is evicted.
+    Updates come from the event loop thread, so the table takes no locks.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialize table.
+
+        Args:
+            max_size: Maximum number of fingerprints kept
+        """
+        self.max_size = max_size
+        self.evicted = 0
+        self._entries: OrderedDict[str, _FingerprintStats] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Add one execution.
+
+        Args:
+            statement: Normalized statement
+            duration: Execution time in seconds
+        """
+        entry = self._entries.get(statement)
+        if entry is None:
+            if len(self._entries) >= self.max_size:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+            entry = self._entries[statement] = _FingerprintStats()
+        else:
+            self._entries.move_to_end(statement)
+        entry.count += 1
+        entry.total += duration
+        entry.samples.append(duration)
+        if duration > entry.max:
+            entry.max = duration
+
+    def top(self, limit: int, order_by: str = "total") -> list[dict[str, Any]]:
+        """
+        Get the most expensive fingerprints.
+
+        Args:
+            limit: Number of rows to return
+            order_by: Column to sort by: total, count, p95 or max
+
+        Returns:
+            Rows with fingerprint, count and timings in milliseconds
+        """
+        rows = []
+        for statement, entry in list(self._entries.items()):
+            ordered = sorted(entry.samples)
+            rows.append(
+                {
+                    "fingerprint": statement,
+                    "count": entry.count,
+                    "total_ms": round(entry.total * 1000, 3),
+                    "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+                    "max_ms": round(entry.max * 1000, 3),
+                }
+            )
+        key = "count" if order_by == "count" else f"{order_by}_ms"
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def clear(self) -> None:
+        """Forget all recorded statements."""
+        self._entries.clear()
+        self.evicted = 0
+
+
+statement_table = StatementTable(settings.slow_query_table_size)
+
+
+def record_statement(statement: str, duration: float) -> None:
+    """
+    Aggregate one execution and log it when slow.
+
+    Args:
+        statement: SQL text as sent to the driver
+        duration: Execution time in seconds
+    """
+    normalized = fingerprint(statement)
+    statement_table.record(normalized, duration)
+    duration_ms = duration * 1000
+    if duration_ms >= settings.slow_query_threshold_ms:
+        logger.warning(
+            f"Slow query ({duration_ms:.1f}ms, request_id={get_request_id() or '-'}): "
+            f"{normalized[:500]}",
+            extra={"duration_ms": round(duration_ms, 3), "fingerprint": normalized},
+        )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    """Time the statement using the start recorded by query_stats."""
+    started: Optional[float] = getattr(context, "_query_started", None)
+    if started is not None:
+        record_statement(statement, time.perf_counter() - started)
@@ -0,0 +1,177 @@
+"""Administrative maintenance endpoints."""
+
+import asyncio
+import logging
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.database import get_db
+from app.adapters.slow_queries import statement_table
+from app.core.memory import MemoryTracingError, memory_tracer
+from app.core.profiler import (
+    MAX_PROFILE_SECONDS,
+    ProfileInProgressError,
+    format_collapsed,
+    profiler,
+)
+from app.core.security import require_admin
+from app.domain.models import User
+from app.services.link_checker import link_checker
+from app.services.storage_usage import StorageUsageService
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+logger = logging.getLogger(__name__)
+
+
+@router.post("/link-checks", status_code=status.HTTP_202_ACCEPTED)
+async def start_link_check(
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Start a background liveness scan of all entry links.
+
+    Only one scan runs at a time; progress is available from the status endpoint.
+    """
+    if not link_checker.start():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Link check already running",
+        )
+    logger.info(f"Link check started by admin {current_user.id}")
+    return {"status": "started"}
+
+
+@router.get("/link-checks/status")
+async def link_check_status(
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Report progress of the current or last link check.
+    """
+    return {"running": link_checker.running, **link_checker.progress}
+
+
+@router.get("/storage/top")
+async def top_storage_consumers(
+    limit: int = Query(10, ge=1, le=100, description="Number of users to return"),
+    current_user: User = Depends(require_admin),
+    db: AsyncSession = Depends(get_db),
+) -> list[dict[str, Any]]:
+    """
+    List the users holding the most upload bytes, largest first.
+    """
+    return await StorageUsageService(db).top(limit)
+
+
+@router.get("/db/statements")
+async def top_statements(
+    limit: int = Query(20, ge=1, le=200, description="Number of statements to return"),
+    order_by: Literal["total", "count", "p95", "max"] = Query(
+        "total", description="Column to sort by, descending"
+    ),
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    List statement fingerprints by time spent in the database since startup.
+    """
+    return {
+        "tracked": len(statement_table),
+        "evicted": statement_table.evicted,
+        "statements": statement_table.top(limit, order_by),
+    }
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(
+        5.0, gt=0, le=MAX_PROFILE_SECONDS, description="How long to sample, in seconds"
+    ),
+    current_user: User = Depends(require_admin),
+) -> PlainTextResponse:
+    """
+    Sample the stacks of this worker's threads and event loop tasks.
+
+    Returns collapsed stacks for flame graph tools. Only one profile runs at a time.
+    """
+    logger.info(f"Profile of {seconds}s started by admin {current_user.id}")
+    try:
+        stacks, samples = await profiler.profile_async(seconds)
+    except ProfileInProgressError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    return PlainTextResponse(format_collapsed(stacks), headers={"X-Profile-Samples": str(samples)})
+
+
+@router.post("/memory/tracing")
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=25, description="Stack frames stored per allocation"),
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Start tracing allocations with tracemalloc in this worker.
+
+    Tracing slows allocations down and uses memory until it is stopped.
+    """
+    memory_tracer.start(frames)
+    logger.info(f"Memory tracing started by admin {current_user.id}")
+    return memory_tracer.status()
+
+
+@router.delete("/memory/tracing")
+async def stop_memory_tracing(
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Stop tracing allocations and drop all snapshots.
+    """
+    memory_tracer.stop()
+    logger.info(f"Memory tracing stopped by admin {current_user.id}")
+    return memory_tracer.status()
+
+
+@router.get("/memory")
+async def memory_status(
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Report whether tracing runs, traced memory and the snapshots kept.
+    """
+    return memory_tracer.status()
+
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED)
+async def take_memory_snapshot(
+    current_user: User = Depends(require_admin),
+) -> dict[str, Any]:
+    """
+    Take a snapshot of allocations per source line.
+
+    Only the most recent snapshots are kept.
+    """
+    try:
+        # Walking every traced block takes a while; keep the loop responsive
+        snapshot = await asyncio.to_thread(memory_tracer.take_snapshot)
+    except MemoryTracingError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
+    return snapshot.summary()
+
+
+@router.get("/memory/diff")
+async def memory_diff(
+    base: int = Query(..., description="Earlier snapshot id"),
+    target: int = Query(..., description="Later snapshot id"),
+    limit: int = Query(20, ge=1, le=500, description="Number of sites to return"),
+    group_by: Literal["lineno", "filename"] = Query("lineno", description="Grouping of sites"),
+    current_user: User = Depends(require_admin),
+) -> list[dict[str, Any]]:
+    """
+    List the allocation sites whose size changed most between two snapshots.
+    """
+    try:
+        return memory_tracer.diff(base, target, limit, group_by)
+    except KeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Snapshot {e.args[0]} not found"
+        ) from e
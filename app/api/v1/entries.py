@@ -3,15 +3,24 @@
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.adapters.database import get_db
 from app.core.config import settings
 from app.core.security import get_current_active_user
 from app.domain.models import EntryStatus, User
-from app.domain.schemas import EntryCreate, EntryListResponse, EntryResponse, EntryUpdate
+from app.domain.schemas import (
+    DuplicateGroup,
+    DuplicateGroupListResponse,
+    DuplicateLinkPolicy,
+    EntryCreate,
+    EntryListResponse,
+    EntryResponse,
+    EntryUpdate,
+)
 from app.services.entry_service import EntryService
+from app.services.link_enrichment import link_enricher
 
 router = APIRouter(prefix="/entries", tags=["entries"])
 logger = logging.getLogger(__name__)
@@ -20,6 +29,12 @@ logger = logging.getLogger(__name__)
 @router.post("", response_model=EntryResponse, status_code=status.HTTP_201_CREATED)
 async def create_entry(
     entry_data: EntryCreate,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    on_duplicate: DuplicateLinkPolicy = Query(
+        DuplicateLinkPolicy(settings.duplicate_link_policy),
+        description="Handling of links already saved by the user (allow, report, reject)",
+    ),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> EntryResponse:
@@ -31,9 +46,28 @@ async def create_entry(
     - **link**: Optional URL to the content
     - **status**: Current status (to_read, in_progress, completed, archived)
     - **description**: Optional description
+    - **on_duplicate**: `report` adds an `X-Duplicate-Of` header with the existing
+      entry ID, `reject` responds with 409, `allow` skips the check
+
+    Link metadata (title, description, image, reading time) is fetched in the
+    background after the entry has been committed.
     """
     entry_service = EntryService(db)
+
+    duplicate_id = None
+    if on_duplicate != DuplicateLinkPolicy.ALLOW and entry_data.link:
+        duplicate_id = await entry_service.find_duplicate_link(current_user, str(entry_data.link))
+        if duplicate_id is not None and on_duplicate == DuplicateLinkPolicy.REJECT:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Link already saved in entry {duplicate_id}",
+            )
+
     entry = await entry_service.create_entry(entry_data, current_user)
+    if duplicate_id is not None:
+        response.headers["X-Duplicate-Of"] = str(duplicate_id)
+    if entry.link:
+        background_tasks.add_task(link_enricher.submit, entry.id, entry.link)
     return EntryResponse.model_validate(entry)
 
 
@@ -65,8 +99,6 @@ async def list_entries(
     if status and status not in [s.value for s in EntryStatus]:
         valid_statuses = [s.value for s in EntryStatus]
         logger.warning(f"Invalid status filter: {status}")
-        from fastapi import HTTPException
-
         raise HTTPException(
             status_code=400,
             detail=f"Invalid status. Must be one of: {valid_statuses}",
@@ -83,6 +115,31 @@ async def list_entries(
     )
 
 
+@router.get("/duplicates", response_model=DuplicateGroupListResponse)
+async def list_duplicate_entries(
+    threshold: float = Query(
+        0.5, ge=0.1, le=1.0, description="Minimum estimated title similarity (0.1-1.0)"
+    ),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> DuplicateGroupListResponse:
+    """
+    List groups of the current user's entries with near-identical titles.
+
+    Similarity is estimated from MinHash signatures and candidates are found
+    through LSH buckets, so large libraries avoid pairwise comparison.
+    """
+    entry_service = EntryService(db)
+    groups = await entry_service.find_title_duplicates(current_user, threshold)
+    return DuplicateGroupListResponse(
+        groups=[
+            DuplicateGroup(entry_ids=entry_ids, titles=titles, similarity=similarity)
+            for entry_ids, titles, similarity in groups
+        ],
+        total=len(groups),
+    )
+
+
 @router.get("/{entry_id}", response_model=EntryResponse)
 async def get_entry(
     entry_id: int,
@@ -103,6 +160,7 @@ async def get_entry(
 async def update_entry(
     entry_id: int,
     entry_data: EntryUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ) -> EntryResponse:
@@ -114,6 +172,8 @@ async def update_entry(
     """
     entry_service = EntryService(db)
     entry = await entry_service.update_entry(entry_id, entry_data, current_user)
+    if entry_data.link is not None and entry.enriched_at is None:
+        background_tasks.add_task(link_enricher.submit, entry.id, entry.link)
     return EntryResponse.model_validate(entry)
 
 
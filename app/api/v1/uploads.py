@@ -0,0 +1,213 @@
+"""Upload endpoints for storing and serving files."""
+
+import logging
+import os
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.database import get_db
+from app.core.config import settings
+from app.core.multipart import PART_OVERHEAD, MultipartError, RequestTooLargeError, spool_multipart
+from app.core.responses import (
+    RangeFileResponse,
+    RangeNotSatisfiableError,
+    etag_matches,
+    parse_byte_range,
+)
+from app.core.security import get_current_active_user
+from app.core.storage import StorageBackend, get_storage
+from app.core.thumbnails import THUMBNAIL_CONTENT_TYPE, thumbnail_key
+from app.domain.models import User
+from app.services.storage_usage import StorageUsageService
+from app.services.upload_service import UploadService
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+logger = logging.getLogger(__name__)
+
+# Presigned object store URLs are valid for this many seconds
+REDIRECT_URL_EXPIRES = 300
+# Per-file errors that mean "too big" rather than "invalid"
+_SIZE_ERRORS = {"file_too_large", "storage_quota_exceeded"}
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def upload_files(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Any:
+    """
+    Upload several images at once as multipart/form-data `files` parts.
+
+    Each part is streamed to a temporary file and validated concurrently
+    (magic bytes, size, JPEG end marker). The batch is atomic: either every
+    file is stored, or none is and the response lists each file's result.
+    Bodies that cannot fit the remaining storage quota are refused before or
+    while spooling, not after.
+    """
+    # Reject from Content-Length before reading; PART_OVERHEAD leaves room for
+    # boundaries and part headers, which are not charged to the quota
+    remaining = await StorageUsageService(db).remaining(current_user.id)
+    if remaining is not None:
+        content_length = request.headers.get("content-length", "")
+        if remaining == 0 or (
+            content_length.isdigit() and int(content_length) > remaining + PART_OVERHEAD
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="storage_quota_exceeded",
+            )
+
+    try:
+        parts = await spool_multipart(
+            request.stream(),
+            request.headers.get("content-type", ""),
+            storage.staging_dir,
+            max_files=settings.upload_batch_max_files,
+            max_total=remaining,
+        )
+    except RequestTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except MultipartError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not parts:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files uploaded")
+
+    stored, results = await UploadService(db, storage).store_batch(current_user, parts)
+    if not stored:
+        errors = {result["error"] for result in results if result["error"]}
+        return JSONResponse(
+            status_code=(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                if errors <= _SIZE_ERRORS
+                else status.HTTP_422_UNPROCESSABLE_ENTITY
+            ),
+            content={
+                "error": {
+                    "code": "upload_rejected",
+                    "message": "No files were stored",
+                    "details": {"files": results},
+                }
+            },
+        )
+    return {"files": results}
+
+
+@router.api_route("/{upload_id}", methods=["GET", "HEAD"], response_class=Response)
+async def get_upload(
+    upload_id: int,
+    request: Request,
+    width: Optional[int] = Query(
+        None, description="Serve the thumbnail of this width (see thumbnail_widths)"
+    ),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """
+    Serve an uploaded file.
+
+    Blobs are content-addressed, so the SHA-256 is a strong ETag and responses
+    are cacheable as immutable. Single `Range` requests get 206 Partial Content.
+    When `upload_accel_redirect_prefix` is configured, nginx sends the bytes via
+    `X-Accel-Redirect`; object storage backends redirect to a presigned URL.
+
+    - **width**: Serve a JPEG thumbnail; the original is served until it exists
+      or if the original is narrower
+    """
+    if width is not None and width not in settings.thumbnail_widths:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unsupported thumbnail width, use one of {settings.thumbnail_widths}",
+        )
+
+    upload_service = UploadService(db, storage)
+    upload = await upload_service.get_upload(upload_id, current_user)
+    blob = await upload_service.get_blob(upload.sha256)
+
+    key, content_type, etag = blob.path, blob.content_type, f'"{blob.sha256}"'
+    cache_control = f"private, max-age={settings.upload_cache_max_age}, immutable"
+    if width is not None:
+        thumb_key = thumbnail_key(blob.sha256, width)
+        if await storage.exists(thumb_key):
+            key, content_type = thumb_key, THUMBNAIL_CONTENT_TYPE
+            etag = f'"{blob.sha256}.w{width}"'
+        else:
+            # The thumbnail may still be rendering; do not pin the original to this URL
+            cache_control = "private, no-cache"
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = storage.local_path(key)
+    if path is None:
+        url = storage.url_for(key, expires=REDIRECT_URL_EXPIRES)
+        if url is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+        return RedirectResponse(
+            url,
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={"Cache-Control": "private, no-store"},
+        )
+
+    if settings.upload_accel_redirect_prefix:
+        headers["X-Accel-Redirect"] = settings.upload_accel_redirect_prefix + key
+        return Response(media_type=content_type, headers=headers)
+
+    try:
+        stat_result = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        logger.error(f"Blob file missing for upload {upload_id}: {key}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+
+    # If-Range with a different validator means the client's partial copy is stale
+    byte_range = None
+    if request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_byte_range(request.headers.get("range"), stat_result.st_size)
+        except RangeNotSatisfiableError:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={"Content-Range": f"bytes */{stat_result.st_size}"},
+            )
+
+    return RangeFileResponse(
+        path,
+        stat_result=stat_result,
+        byte_range=byte_range,
+        media_type=content_type,
+        headers=headers,
+    )
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_upload(
+    upload_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> None:
+    """
+    Delete an upload.
+
+    Only the owner or an admin can delete the upload. The stored file is
+    removed once no other upload references the same content.
+    """
+    upload_service = UploadService(db, storage)
+    keys = await upload_service.release(upload_id, current_user)
+    # Files go only after the blob row deletion is durable
+    await db.commit()
+    await upload_service.delete_files(keys)
+    return None
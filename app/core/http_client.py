@@ -1,17 +1,25 @@
 """
 Secure HTTP client with security policies for external service integration.
-Implements timeouts, size limits, SSL verification, and retry policies.
+Implements timeouts, size limits, SSL verification, retry policies, and
+cached DNS resolution with post-resolution SSRF checks.
 """
 
 import asyncio
 import logging
+import socket
+import time
+from collections import OrderedDict
 from ipaddress import ip_address, ip_network
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
 import httpx
 from httpx import HTTPError, Limits, Timeout
 
+from app.core.config import settings
+from app.core.metrics import observe_dns_resolution, register_cache_metrics
+from app.core.tracing import span
+
 logger = logging.getLogger(__name__)
 
 _DISALLOWED_HOSTS = {"localhost"}
@@ -27,6 +35,220 @@ _PRIVATE_NETWORKS = (
     ip_network("fe80::/10"),
 )
 
+# Called with (host, resolution latency in seconds, cache hit)
+ResolverMetricsHook = Callable[[str, float, bool], None]
+
+
+class UnsafeAddressError(ValueError):
+    """Raised when a host resolves to a disallowed network address."""
+
+
+def is_disallowed_address(address: str) -> bool:
+    """
+    Check whether an IP address belongs to a private or loopback network.
+
+    Args:
+        address: IPv4 or IPv6 address literal
+
+    Returns:
+        True if the address must not be contacted
+    """
+    try:
+        ip = ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return True
+
+    # IPv4-mapped IPv6 addresses (::ffff:10.0.0.1) are checked as IPv4
+    mapped = getattr(ip, "ipv4_mapped", None)
+    if mapped is not None:
+        ip = mapped
+
+    return any(ip in network for network in _PRIVATE_NETWORKS)
+
+
+def original_url(request: httpx.Request) -> str:
+    """
+    Rebuild the URL as requested by the caller from a pinned request.
+
+    Pinned requests carry the vetted IP in the URL and the original name in
+    the Host header; this restores the hostname for reporting.
+
+    Args:
+        request: Request sent by SecureHTTPClient
+
+    Returns:
+        URL string with the original hostname
+    """
+    host_header = request.headers.get("Host")
+    if not host_header:
+        return str(request.url)
+    return str(request.url.copy_with(netloc=host_header.encode("ascii")))
+
+
+def _consume_exception(future: "asyncio.Future[Tuple[str, ...]]") -> None:
+    """Mark a shared lookup's failure as retrieved when every waiter is gone."""
+    if not future.cancelled():
+        future.exception()
+
+
+class CachingResolver:
+    """
+    Async DNS resolver with a TTL cache and SSRF enforcement.
+    Each host is resolved at most once per TTL window; concurrent lookups
+    for the same host share a single in-flight resolution.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        metrics_hook: Optional[ResolverMetricsHook] = None,
+    ):
+        """
+        Initialize caching resolver.
+
+        Args:
+            ttl: Seconds a resolved address set stays cached
+            max_entries: Maximum number of cached hosts (LRU eviction)
+            metrics_hook: Optional callback receiving resolution metrics
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.metrics_hook = metrics_hook
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, Tuple[float, Tuple[str, ...]]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Tuple[str, ...]]"] = {}
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Drop all cached resolutions."""
+        self._cache.clear()
+
+    def _get_cached(self, host: str) -> Optional[Tuple[str, ...]]:
+        """Return cached addresses for host if they have not expired."""
+        cached = self._cache.get(host)
+        if cached is None:
+            return None
+        expires_at, addresses = cached
+        if expires_at <= time.monotonic():
+            del self._cache[host]
+            return None
+        self._cache.move_to_end(host)
+        return addresses
+
+    def _store(self, host: str, addresses: Tuple[str, ...]) -> None:
+        """Cache addresses for host, evicting the least recently used entry."""
+        self._cache[host] = (time.monotonic() + self.ttl, addresses)
+        self._cache.move_to_end(host)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _report(self, host: str, started: float, cache_hit: bool) -> None:
+        """Forward resolution metrics to the configured hook."""
+        if self.metrics_hook is None:
+            return
+        try:
+            self.metrics_hook(host, time.perf_counter() - started, cache_hit)
+        except Exception:
+            logger.exception("Resolver metrics hook failed")
+
+    async def _lookup(self, host: str) -> Tuple[str, ...]:
+        """Resolve host to a de-duplicated tuple of addresses."""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        addresses: Dict[str, None] = {}
+        for _family, _type, _proto, _canonname, sockaddr in infos:
+            addresses.setdefault(str(sockaddr[0]), None)
+        if not addresses:
+            raise OSError(f"No addresses found for {host}")
+        return tuple(addresses)
+
+    async def _lookup_and_store(self, host: str) -> Tuple[str, ...]:
+        """Resolve host, cache the result and release the in-flight slot."""
+        try:
+            addresses = await self._lookup(host)
+        finally:
+            self._inflight.pop(host, None)
+        self._store(host, addresses)
+        return addresses
+
+    async def resolve(self, host: str) -> Tuple[str, ...]:
+        """
+        Resolve host to its addresses, using the cache when possible.
+
+        Args:
+            host: Hostname to resolve
+
+        Returns:
+            Tuple of IP address strings
+
+        Raises:
+            OSError: If resolution fails
+        """
+        host = host.lower().rstrip(".")
+        started = time.perf_counter()
+
+        addresses = self._get_cached(host)
+        if addresses is not None:
+            self.hits += 1
+            self._report(host, started, True)
+            return addresses
+
+        self.misses += 1
+        future = self._inflight.get(host)
+        if future is None:
+            # The lookup runs in its own task so that cancelling any one
+            # caller (e.g. a client disconnect) does not cancel the others
+            future = asyncio.ensure_future(self._lookup_and_store(host))
+            future.add_done_callback(_consume_exception)
+            self._inflight[host] = future
+        addresses = await asyncio.shield(future)
+
+        self._report(host, started, False)
+        return addresses
+
+    async def resolve_safe(self, host: str) -> str:
+        """
+        Resolve host and verify that every address is publicly routable.
+
+        Args:
+            host: Hostname or IP literal
+
+        Returns:
+            Vetted IP address to pin the connection to
+
+        Raises:
+            UnsafeAddressError: If any resolved address is disallowed
+            OSError: If resolution fails
+        """
+        try:
+            ip_address(host)
+        except ValueError:
+            addresses = await self.resolve(host)
+        else:
+            addresses = (host,)
+
+        for address in addresses:
+            if is_disallowed_address(address):
+                raise UnsafeAddressError(f"Host {host} resolves to a disallowed address")
+
+        return addresses[0]
+
+
+# Shared resolver so that all clients benefit from the same cache
+default_resolver = CachingResolver(
+    ttl=settings.dns_cache_ttl,
+    max_entries=settings.dns_cache_max_entries,
+    metrics_hook=observe_dns_resolution,
+)
+register_cache_metrics("dns", lambda: (default_resolver.hits, default_resolver.misses))
+
 
 class SecureHTTPClient:
     """
@@ -44,6 +266,7 @@ class SecureHTTPClient:
         verify_ssl: bool = True,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        resolver: Optional[CachingResolver] = None,
     ):
         """
         Initialize secure HTTP client.
@@ -57,6 +280,7 @@ class SecureHTTPClient:
             verify_ssl: Whether to verify SSL certificates
             max_retries: Maximum number of retry attempts
             retry_delay: Initial retry delay in seconds
+            resolver: DNS resolver used to vet and pin destination addresses
         """
         self.base_url = base_url
         self.timeout = timeout
@@ -66,6 +290,7 @@ class SecureHTTPClient:
         self.verify_ssl = verify_ssl
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.resolver = resolver or default_resolver
 
         # Create timeout configuration
         self.timeout_config = Timeout(
@@ -130,6 +355,36 @@ class SecureHTTPClient:
         except Exception:
             return False
 
+    async def _pin_request(self, request: httpx.Request) -> None:
+        """
+        Resolve the request host, enforce SSRF policy and pin the vetted IP.
+
+        Runs as an httpx request hook, so every redirect hop is checked too.
+        The original hostname is kept in the Host header and used for SNI,
+        which keeps certificate verification bound to the requested name.
+
+        Args:
+            request: Outgoing request, modified in place
+
+        Raises:
+            UnsafeAddressError: If the host resolves to a disallowed address
+        """
+        host_header = request.headers.get("Host") or request.url.netloc.decode("ascii")
+        hostname = (urlparse(f"//{host_header}").hostname or request.url.host).lower()
+        if not self._validate_url(str(request.url.copy_with(host=hostname))):
+            raise UnsafeAddressError(f"Invalid or unsafe URL: {request.url}")
+
+        try:
+            pinned_ip = await self.resolver.resolve_safe(hostname)
+        except OSError as e:
+            raise httpx.ConnectError(f"DNS resolution failed for {hostname}: {e}") from e
+
+        request.url = request.url.copy_with(host=pinned_ip)
+        if request.url.scheme == "https" and pinned_ip != hostname:
+            request.extensions["sni_hostname"] = hostname
+        else:
+            request.extensions.pop("sni_hostname", None)
+
     async def _make_request(self, method: str, url: str, **kwargs) -> httpx.Response:
         """
         Make HTTP request with security policies.
@@ -157,33 +412,42 @@ class SecureHTTPClient:
             "max_redirects": self.max_redirects,
             "verify": self.verify_ssl,
             "limits": self.limits,
+            "event_hooks": {"request": [self._pin_request]},
         }
 
         # Add any additional parameters
         request_params.update(kwargs)
 
-        async with httpx.AsyncClient(**request_params) as client:
-            try:
-                response = await client.request(method, url)
-
-                # Check response size
-                if hasattr(response, "content") and len(response.content) > self.max_response_size:
-                    raise HTTPError(f"Response too large: {len(response.content)} bytes")
-
-                return response
-
-            except httpx.TimeoutException as e:
-                logger.warning(f"Request timeout for {url}: {e}")
-                raise HTTPError(f"Request timeout: {e}") from e
-            except httpx.ConnectError as e:
-                logger.warning(f"Connection error for {url}: {e}")
-                raise HTTPError(f"Connection error: {e}") from e
-            except httpx.HTTPStatusError as e:
-                logger.warning(f"HTTP error for {url}: {e.response.status_code}")
-                raise HTTPError(f"HTTP error {e.response.status_code}: {e}") from e
-            except Exception as e:
-                logger.error(f"Unexpected error for {url}: {e}")
-                raise HTTPError(f"Unexpected error: {e}")
+        with span("http.client", method=method, host=urlparse(url).hostname or "") as current:
+            async with httpx.AsyncClient(**request_params) as client:
+                try:
+                    response = await client.request(method, url)
+
+                    # Check response size
+                    if (
+                        hasattr(response, "content")
+                        and len(response.content) > self.max_response_size
+                    ):
+                        raise HTTPError(f"Response too large: {len(response.content)} bytes")
+
+                    current.set_attribute("status_code", response.status_code)
+                    return response
+
+                except UnsafeAddressError:
+                    logger.warning(f"Blocked request to disallowed address for {url}")
+                    raise
+                except httpx.TimeoutException as e:
+                    logger.warning(f"Request timeout for {url}: {e}")
+                    raise HTTPError(f"Request timeout: {e}") from e
+                except httpx.ConnectError as e:
+                    logger.warning(f"Connection error for {url}: {e}")
+                    raise HTTPError(f"Connection error: {e}") from e
+                except httpx.HTTPStatusError as e:
+                    logger.warning(f"HTTP error for {url}: {e.response.status_code}")
+                    raise HTTPError(f"HTTP error {e.response.status_code}: {e}") from e
+                except Exception as e:
+                    logger.error(f"Unexpected error for {url}: {e}")
+                    raise HTTPError(f"Unexpected error: {e}")
 
     async def _retry_request(self, method: str, url: str, **kwargs) -> httpx.Response:
         """
@@ -246,6 +510,22 @@ class SecureHTTPClient:
         """
         return await self._retry_request("GET", url, params=params, headers=headers, **kwargs)
 
+    async def head(
+        self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs
+    ) -> httpx.Response:
+        """
+        Make HEAD request.
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            **kwargs: Additional request parameters
+
+        Returns:
+            HTTP response
+        """
+        return await self._retry_request("HEAD", url, headers=headers, **kwargs)
+
     async def post(
         self,
         url: str,
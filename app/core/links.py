@@ -0,0 +1,97 @@
+"""
+Link canonicalization for duplicate detection.
+Maps URL variants that point to the same resource onto one canonical form
+and a compact hash suitable for indexing.
+"""
+
+import hashlib
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only carry campaign/click tracking information
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "gbraid",
+    "wbraid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_hsenc",
+    "_hsmi",
+    "ref_src",
+    "spm",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Hex digest length stored in entries.link_hash (128 bits of SHA-256)
+LINK_HASH_LENGTH = 32
+
+
+def _is_tracking_param(name: str) -> bool:
+    """Check whether a query parameter is a known tracking parameter."""
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_link(url: str) -> str:
+    """
+    Normalize a URL so that equivalent links compare equal.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    query parameters, and sorts the remaining query parameters.
+
+    Args:
+        url: Absolute URL
+
+    Returns:
+        Canonical URL string
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".")
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc_host = f"[{host}]" if ":" in host else host
+        netloc = f"{netloc_host}:{port}"
+    else:
+        netloc = f"[{host}]" if ":" in host else host
+
+    if parts.username:
+        credentials = parts.username
+        if parts.password:
+            credentials += f":{parts.password}"
+        netloc = f"{credentials}@{netloc}"
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    )
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+
+def link_hash(url: Optional[str]) -> Optional[str]:
+    """
+    Compute the indexed hash of a link's canonical form.
+
+    Args:
+        url: Absolute URL or None
+
+    Returns:
+        Hex digest of LINK_HASH_LENGTH characters, or None for empty links
+    """
+    if not url:
+        return None
+    digest = hashlib.sha256(canonicalize_link(url).encode("utf-8")).hexdigest()
+    return digest[:LINK_HASH_LENGTH]
@@ -1,16 +1,34 @@
-"""Logging configuration with request_id support."""
+"""
+Logging configuration with request_id support.
+Records are handed to a bounded queue and written to stdout by a listener
+thread, so logging never blocks the event loop on I/O.
+"""
 
+import atexit
 import contextvars
+import json
 import logging
+import queue
+import random
 import sys
+import time
 import uuid
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
 
 from fastapi import Request
 
+from app.adapters.query_stats import QueryStats, track_queries
+from app.core.config import settings
+from app.core.metrics import REQUESTS_IN_FLIGHT, observe_request, registry
+from app.core.tracing import Trace, finish_trace, start_trace
+
 # Context variable for request_id
 request_id_ctx: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="")
 
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("app.access")
+
 
 class RequestIdFilter(logging.Filter):
     """Add request_id to log records."""
@@ -21,29 +39,158 @@ class RequestIdFilter(logging.Filter):
         return True
 
 
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+    | {"message", "asctime", "request_id"}
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format the record as JSON."""
+        payload = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", ""),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler that drops or briefly blocks when the queue is full.
+
+    With ``block`` the caller waits up to ``timeout`` seconds for room before
+    the record is dropped; either way dropped records are counted instead of
+    stalling the application indefinitely.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block: bool = False, timeout: float = 0.05):
+        """
+        Initialize queue handler.
+
+        Args:
+            log_queue: Bounded queue read by the listener thread
+            block: Wait for room instead of dropping immediately
+            timeout: Maximum wait in seconds when blocking
+        """
+        super().__init__(log_queue)
+        self.block = block
+        self.timeout = timeout
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a record on the queue, counting it if there is no room."""
+        try:
+            if self.block:
+                self.queue.put(record, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_listener_running = False
+
+
 def setup_logging() -> None:
-    """Configure application logging."""
+    """Configure application logging through a bounded queue."""
+    global _queue_handler, _listener
+
     # Create formatter
-    formatter = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - [request_id=%(request_id)s] - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
+    if settings.log_format == "json":
+        formatter: logging.Formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [request_id=%(request_id)s] - %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
 
-    # Create console handler
+    # The console handler runs on the listener thread
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(formatter)
-    handler.addFilter(RequestIdFilter())
 
-    # Configure root logger
+    # request_id lives in a context variable, so it is read before queueing
     root_logger = logging.getLogger()
+    stop_logging()
+    if _queue_handler is not None:
+        root_logger.removeHandler(_queue_handler)
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    _queue_handler = BoundedQueueHandler(
+        log_queue,
+        block=settings.log_queue_policy == "block",
+        timeout=settings.log_queue_block_timeout,
+    )
+    _queue_handler.addFilter(RequestIdFilter())
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    start_logging()
+    # Flush what is still queued if the process exits without a shutdown event
+    atexit.register(stop_logging)
+
+    # Configure root logger
     root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(handler)
+    root_logger.addHandler(_queue_handler)
 
     # Reduce noise from libraries
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
+def start_logging() -> None:
+    """Start the listener thread that writes queued records."""
+    global _listener_running
+    if _listener is not None and not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener_running
+    if _listener is not None and _listener_running:
+        _listener.stop()
+        _listener_running = False
+
+
+def get_logging_stats() -> dict[str, int]:
+    """
+    Get logging queue counters.
+
+    Returns:
+        Dictionary with queued, capacity and dropped record counts
+    """
+    if _queue_handler is None:
+        return {"queued": 0, "capacity": 0, "dropped": 0}
+    return {
+        "queued": _queue_handler.queue.qsize(),
+        "capacity": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+    }
+
+
+registry.callback(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+    lambda: get_logging_stats()["dropped"],
+    type_name="counter",
+)
+registry.callback(
+    "log_queue_depth", "Log records waiting to be written", lambda: get_logging_stats()["queued"]
+)
+
+
 def get_request_id() -> str:
     """Get current request_id."""
     return request_id_ctx.get("")
@@ -54,11 +201,113 @@ def set_request_id(request_id: str) -> None:
     request_id_ctx.set(request_id)
 
 
+def should_log_access(status_code: int, duration_ms: float) -> bool:
+    """
+    Decide whether a request gets an access log record.
+
+    Client and server errors and slow requests are always logged; the rest is
+    sampled at ``access_log_sample_rate``.
+
+    Args:
+        status_code: Response status code
+        duration_ms: Total request duration in milliseconds
+
+    Returns:
+        True if the request should be logged
+    """
+    if not settings.access_log_enabled:
+        return False
+    if status_code >= 400 or duration_ms >= settings.access_log_slow_ms:
+        return True
+    return random.random() < settings.access_log_sample_rate
+
+
+def route_template(request: Request) -> str:
+    """Get the matched route template, which keeps cardinality bounded unlike the raw path."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+def finish_request(
+    request: Request,
+    status_code: int,
+    started: float,
+    stats: QueryStats,
+    bytes_out: int,
+    trace: Optional[Trace] = None,
+) -> None:
+    """Record a finished request in the metrics, the trace and, if sampled, the access log."""
+    duration = time.perf_counter() - started
+    template = route_template(request)
+    REQUESTS_IN_FLIGHT.dec()
+    observe_request(request.method, template, status_code, duration)
+    if trace is not None:
+        finish_trace(
+            trace,
+            f"{request.method} {template}",
+            status=status_code,
+            db_queries=stats.count,
+            bytes_out=bytes_out,
+        )
+
+    statement, repeats = stats.most_repeated()
+    if repeats >= settings.db_n_plus_one_threshold:
+        logger.warning(
+            f"Possible N+1 query in {request.method} {template}: statement executed "
+            f"{repeats} times: {' '.join(statement.split())[:200]}"
+        )
+
+    duration_ms = duration * 1000
+    if not should_log_access(status_code, duration_ms):
+        return
+    access_logger.info(
+        f"{request.method} {template} {status_code} {duration_ms:.1f}ms",
+        extra={
+            "method": request.method,
+            "route": template,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "db_ms": round(stats.duration_ms, 3),
+            "db_queries": stats.count,
+            "db_max_repeats": repeats,
+            "bytes_out": bytes_out,
+        },
+    )
+
+
 async def add_request_id(request: Request, call_next: Any) -> Any:
-    """Middleware to add request_id to each request."""
+    """Middleware to add request_id to each request and record it in metrics and the access log."""
     request_id = str(uuid.uuid4())
     set_request_id(request_id)
+    started = time.perf_counter()
+    stats = track_queries()
+    trace = start_trace(request_id, f"{request.method} {request.url.path}")
+    REQUESTS_IN_FLIGHT.inc()
 
-    response = await call_next(request)
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish_request(request, 500, started, stats, 0, trace)
+        raise
     response.headers["X-Request-ID"] = request_id
+    if settings.debug:
+        # Queries issued while the body streams are not included here
+        response.headers["X-DB-Queries"] = str(stats.count)
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"'
+        )
+
+    # Log once the body has been sent, so duration and size cover streaming
+    body_iterator = response.body_iterator
+
+    async def counted_body() -> Any:
+        bytes_out = 0
+        try:
+            async for chunk in body_iterator:
+                bytes_out += len(chunk)
+                yield chunk
+        finally:
+            finish_request(request, response.status_code, started, stats, bytes_out, trace)
+
+    response.body_iterator = counted_body()
     return response
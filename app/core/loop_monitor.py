@@ -0,0 +1,139 @@
+"""
+Event loop health monitoring.
+A background task sleeps for a fixed interval and records how late it wakes
+up: the scheduling lag every other callback suffers too. An optional
+watchdog thread pings the loop and, when a ping is not answered within the
+stall threshold, logs the stack the loop thread is stuck in.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Measures event loop lag and reports callbacks that block the loop."""
+
+    def __init__(self, interval: float = 0.25, stall_threshold: Optional[float] = None):
+        """
+        Initialize monitor.
+
+        Args:
+            interval: Seconds between lag measurements
+            stall_threshold: Seconds a callback may hold the loop before its
+                stack is reported; None disables the watchdog
+        """
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether the lag measurement task is active."""
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start measuring; must be called from the loop to monitor."""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure())
+        if self.stall_threshold is not None:
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                args=(loop, threading.get_ident()),
+                name="loop-watchdog",
+                daemon=True,
+            )
+            self._watchdog.start()
+        logger.info("Event loop monitor started")
+
+    async def stop(self) -> None:
+        """Stop the measurement task and the watchdog."""
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+        logger.info("Event loop monitor stopped")
+
+    def record_lag(self, lag: float) -> None:
+        """Record one lag measurement in seconds."""
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        EVENT_LOOP_LAG.observe(lag)
+
+    async def _measure(self) -> None:
+        """Sleep for the interval and record how late the wake-up was."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, time.monotonic() - expected))
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread: int) -> None:
+        """Ping the loop from this thread and report pings it fails to answer in time."""
+        while not self._stopping.wait(self.stall_threshold):
+            answered = threading.Event()
+            sent = time.monotonic()
+            try:
+                loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # Loop closed
+                return
+            if answered.wait(self.stall_threshold):
+                continue
+            self.report_stall(loop, loop_thread, time.monotonic() - sent)
+            # Report each stall once; wait for the loop to come back
+            while not answered.wait(self.stall_threshold) and not self._stopping.is_set():
+                pass
+
+    def report_stall(
+        self, loop: asyncio.AbstractEventLoop, loop_thread: int, blocked_for: float
+    ) -> None:
+        """
+        Log the stack the loop thread is currently executing.
+
+        Args:
+            loop: Blocked event loop
+            loop_thread: Ident of the thread running the loop
+            blocked_for: Seconds the loop has been unresponsive so far
+        """
+        self.stalls += 1
+        EVENT_LOOP_STALLS.inc()
+        frame = sys._current_frames().get(loop_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        task = asyncio.current_task(loop)
+        logger.warning(
+            f"Event loop blocked for {blocked_for * 1000:.0f}ms "
+            f"in task {task.get_name() if task is not None else '<none>'}:\n{stack}"
+        )
+
+
+def create_loop_monitor() -> LoopMonitor:
+    """Create a monitor configured from the settings."""
+    threshold = (
+        settings.loop_stall_threshold_ms / 1000 if settings.loop_stall_detector_enabled else None
+    )
+    return LoopMonitor(settings.loop_monitor_interval, threshold)
+
+
+loop_monitor = create_loop_monitor()
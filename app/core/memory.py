@@ -0,0 +1,182 @@
+"""
+Allocation tracking with tracemalloc.
+Tracing is off until an admin starts it, so it costs nothing by default.
+Snapshots are reduced to per-line totals when taken, and only a few are
+kept, so inspecting a leak does not become one.
+"""
+
+import itertools
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# (filename, lineno) -> (bytes, blocks)
+SiteTotals = dict[tuple[str, int], tuple[int, int]]
+
+
+class MemoryTracingError(RuntimeError):
+    """Raised when snapshots are requested while tracing is off."""
+
+
+class MemorySnapshot:
+    """Allocation totals per source line at one point in time."""
+
+    __slots__ = ("id", "taken_at", "sites", "total_size", "total_count")
+
+    def __init__(self, snapshot_id: int, sites: SiteTotals) -> None:
+        self.id = snapshot_id
+        self.taken_at = time.time()
+        self.sites = sites
+        self.total_size = sum(size for size, _ in sites.values())
+        self.total_count = sum(count for _, count in sites.values())
+
+    def summary(self) -> dict[str, Any]:
+        """Describe the snapshot without its sites."""
+        return {
+            "id": self.id,
+            "taken_at": self.taken_at,
+            "sites": len(self.sites),
+            "size": self.total_size,
+            "count": self.total_count,
+        }
+
+
+def _group(sites: SiteTotals, group_by: str) -> dict[str, tuple[int, int]]:
+    """Sum site totals by "file:line" or by file."""
+    grouped: dict[str, tuple[int, int]] = {}
+    for (filename, lineno), (size, count) in sites.items():
+        key = filename if group_by == "filename" else f"{filename}:{lineno}"
+        previous_size, previous_count = grouped.get(key, (0, 0))
+        grouped[key] = (previous_size + size, previous_count + count)
+    return grouped
+
+
+class MemoryTracer:
+    """Starts tracemalloc on demand and keeps a bounded set of snapshots."""
+
+    def __init__(self, max_snapshots: int = 5, max_sites: int = 10_000):
+        """
+        Initialize tracer.
+
+        Args:
+            max_snapshots: Snapshots kept; the oldest is dropped beyond this
+            max_sites: Source lines kept per snapshot, largest first
+        """
+        self.max_snapshots = max_snapshots
+        self.max_sites = max_sites
+        self._snapshots: OrderedDict[int, MemorySnapshot] = OrderedDict()
+        self._ids = itertools.count(1)
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        """
+        Start tracing allocations.
+
+        Args:
+            frames: Stack frames stored per allocation; more frames cost more memory
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and forget all snapshots."""
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def status(self) -> dict[str, Any]:
+        """Report tracing state, traced memory and kept snapshots."""
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": [snapshot.summary() for snapshot in self._snapshots.values()],
+        }
+
+    def take_snapshot(self) -> MemorySnapshot:
+        """
+        Take a snapshot reduced to per-line totals.
+
+        Returns:
+            The stored snapshot
+
+        Raises:
+            MemoryTracingError: If tracing is off
+        """
+        if not tracemalloc.is_tracing():
+            raise MemoryTracingError("Memory tracing is not running")
+        statistics = tracemalloc.take_snapshot().filter_traces(_FILTERS).statistics("lineno")
+        sites = {
+            (stat.traceback[0].filename, stat.traceback[0].lineno): (stat.size, stat.count)
+            for stat in statistics[: self.max_sites]
+        }
+        snapshot = MemorySnapshot(next(self._ids), sites)
+        self._snapshots[snapshot.id] = snapshot
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot
+
+    def get(self, snapshot_id: int) -> MemorySnapshot:
+        """
+        Get a kept snapshot.
+
+        Raises:
+            KeyError: If the snapshot does not exist or was dropped
+        """
+        return self._snapshots[snapshot_id]
+
+    def diff(
+        self, base_id: int, target_id: int, limit: int = 20, group_by: str = "lineno"
+    ) -> list[dict[str, Any]]:
+        """
+        Compare two snapshots.
+
+        Args:
+            base_id: Earlier snapshot
+            target_id: Later snapshot
+            limit: Number of rows to return
+            group_by: "lineno" for file and line, "filename" for whole files
+
+        Returns:
+            Rows with the largest absolute size change first
+
+        Raises:
+            KeyError: If either snapshot does not exist
+        """
+        base = _group(self.get(base_id).sites, group_by)
+        target = _group(self.get(target_id).sites, group_by)
+        rows = []
+        for site in base.keys() | target.keys():
+            base_size, base_count = base.get(site, (0, 0))
+            size, count = target.get(site, (0, 0))
+            if size == base_size and count == base_count:
+                continue
+            rows.append(
+                {
+                    "site": site,
+                    "size": size,
+                    "size_diff": size - base_size,
+                    "count": count,
+                    "count_diff": count - base_count,
+                }
+            )
+        rows.sort(key=lambda row: abs(row["size_diff"]), reverse=True)
+        return rows[:limit]
+
+
+memory_tracer = MemoryTracer(settings.memory_max_snapshots, settings.memory_max_sites)
@@ -0,0 +1,430 @@
+"""
+In-process metrics registry exported in the Prometheus text format.
+Metrics are updated from the event loop thread, where updates cannot
+interleave, so the hot path takes no locks: an update is a dictionary
+lookup for the label set plus a few integer and float additions.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+Sample = tuple[str, LabelValues, float]
+# A callback returns one value, or a value per label set
+CallbackResult = Union[float, dict[LabelValues, float]]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the text format."""
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _CounterChild:
+    """Monotonic counter for one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the counter."""
+        self.value += amount
+
+
+class _GaugeChild:
+    """Gauge for one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the gauge."""
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrease the gauge."""
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        """Set the gauge."""
+        self.value = value
+
+
+class _HistogramChild:
+    """Fixed-bucket histogram for one label set."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One slot per bucket plus +Inf; cumulated only when exported
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    """A named metric family with optional labels."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        """
+        Initialize metric family.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels, in the order labels() takes them
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[LabelValues, Any] = {}
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        """Get the child for a label set, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield (name suffix, label values, value) for every child."""
+        for values, child in list(self._children.items()):
+            yield "", values, child.value
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the unlabelled counter."""
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increase the unlabelled gauge."""
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        """Decrease the unlabelled gauge."""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge."""
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    """Histogram with fixed upper bounds."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize histogram family.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels
+            buckets: Upper bounds of the buckets, +Inf is implied
+        """
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        """Record one observation in the unlabelled histogram."""
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield cumulative buckets, sum and count for every child."""
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.bounds, math.inf), child.counts):
+                cumulative += count
+                yield "_bucket", (*values, _format_value(bound)), cumulative
+            yield "_sum", values, child.sum
+            yield "_count", values, cumulative
+
+
+class CallbackMetric(Metric):
+    """Metric whose value is read from a callback at export time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackResult],
+        labelnames: Iterable[str] = (),
+        type_name: str = "gauge",
+    ):
+        """
+        Initialize callback metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            callback: Returns the value, or a mapping of label values to values
+            labelnames: Names of the labels in the callback's mapping keys
+            type_name: Exported type, gauge or counter
+        """
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type_name = type_name
+
+    def samples(self) -> Iterator[Sample]:
+        """Yield the values returned by the callback."""
+        result = self.callback()
+        if isinstance(result, dict):
+            for values, value in result.items():
+                yield "", values, value
+        else:
+            yield "", (), result
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family, replacing one with the same name."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Get a registered metric family by name."""
+        return self._metrics.get(name)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackResult],
+        labelnames: Iterable[str] = (),
+        type_name: str = "gauge",
+    ) -> CallbackMetric:
+        """Create and register a metric read from a callback."""
+        return self.register(CallbackMetric(name, documentation, callback, labelnames, type_name))
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Text ready to serve with CONTENT_TYPE
+        """
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            labelnames = metric.labelnames
+            for suffix, values, value in metric.samples():
+                names = (*labelnames, "le") if suffix == "_bucket" else labelnames
+                if names:
+                    labels = ",".join(
+                        f'{label}="{_escape(str(v))}"' for label, v in zip(names, values)
+                    )
+                    lines.append(f"{metric.name}{suffix}{{{labels}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{metric.name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Global registry served at /metrics
+registry = MetricsRegistry()
+
+REQUESTS_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed"
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ("method", "route", "status"),
+)
+PASSWORD_HASH_DURATION = registry.histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing and verifying passwords with bcrypt",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0),
+)
+EVENT_LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop callback was due and when it ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DNS_RESOLUTION_DURATION = registry.histogram(
+    "dns_resolution_seconds",
+    "Time to resolve outbound hostnames, by whether the resolver cache answered",
+    ("cache",),
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+EVENT_LOOP_STALLS = registry.counter(
+    "event_loop_stalls_total", "Callbacks that held the event loop past the stall threshold"
+)
+
+
+def observe_request(method: str, route: str, status_code: int, duration: float) -> None:
+    """
+    Record a finished HTTP request.
+
+    Args:
+        method: HTTP method
+        route: Route template (not the raw path, to bound label cardinality)
+        status_code: Response status code
+        duration: Total duration in seconds
+    """
+    REQUEST_DURATION.labels(method, route, str(status_code)).observe(duration)
+
+
+def observe_dns_resolution(host: str, duration: float, cache_hit: bool) -> None:
+    """
+    Record one hostname resolution (a CachingResolver metrics hook).
+
+    Args:
+        host: Resolved hostname; not used as a label, to bound cardinality
+        duration: Resolution time in seconds
+        cache_hit: Whether the resolver cache answered
+    """
+    DNS_RESOLUTION_DURATION.labels("hit" if cache_hit else "miss").observe(duration)
+
+
+def register_pool_metrics(get_pool: Callable[[], Any]) -> None:
+    """
+    Export connection pool usage read at scrape time.
+
+    Args:
+        get_pool: Returns the current pool (engines replace it on dispose)
+    """
+
+    def reader(attribute: str) -> Callable[[], float]:
+        def read() -> float:
+            method = getattr(get_pool(), attribute, None)
+            # QueuePool counts overflow from -pool_size; only positive values are extra
+            return max(0, method()) if callable(method) else 0
+
+        return read
+
+    registry.callback("db_pool_size", "Configured database pool size", reader("size"))
+    registry.callback(
+        "db_pool_checked_out", "Database connections currently in use", reader("checkedout")
+    )
+    registry.callback(
+        "db_pool_overflow", "Database connections open beyond the pool size", reader("overflow")
+    )
+
+
+_cache_readers: dict[str, Callable[[], tuple[int, int]]] = {}
+
+
+def register_cache_metrics(cache: str, get_counts: Callable[[], tuple[int, int]]) -> None:
+    """
+    Export hit and miss counts of an in-process cache.
+
+    Args:
+        cache: Cache name used as the ``cache`` label
+        get_counts: Returns (hits, misses)
+    """
+    _cache_readers[cache] = get_counts
+
+
+def _cache_lookups() -> dict[LabelValues, float]:
+    """Hit and miss counts of every registered cache."""
+    samples: dict[LabelValues, float] = {}
+    for cache, get_counts in _cache_readers.items():
+        hits, misses = get_counts()
+        samples[(cache, "hit")] = hits
+        samples[(cache, "miss")] = misses
+    return samples
+
+
+def _cache_hit_ratios() -> dict[LabelValues, float]:
+    """Hit ratio of every registered cache."""
+    ratios: dict[LabelValues, float] = {}
+    for cache, get_counts in _cache_readers.items():
+        hits, misses = get_counts()
+        ratios[(cache,)] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+
+registry.callback(
+    "cache_lookups_total",
+    "Lookups in in-process caches by result",
+    _cache_lookups,
+    ("cache", "result"),
+    type_name="counter",
+)
+registry.callback(
+    "cache_hit_ratio", "Fraction of cache lookups that hit", _cache_hit_ratios, ("cache",)
+)
@@ -0,0 +1,168 @@
+"""
+MinHash signatures and LSH bucketing for near-duplicate title detection.
+Titles are normalized, split into character shingles and reduced to fixed-size
+signatures whose agreement estimates Jaccard similarity. Signatures are grouped
+into LSH bands so that candidates are found without pairwise comparison.
+"""
+
+import re
+import unicodedata
+from typing import Iterable
+
+import numpy as np
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+SIGNATURE_DTYPE = np.dtype("<u4")
+
+# Mersenne prime for universal hashing; keeps a * x + b within uint64
+_PRIME = np.uint64((1 << 31) - 1)
+
+# Permutation coefficients must be identical across processes because
+# signatures are persisted, hence the fixed seed.
+_rng = np.random.default_rng(0x5EED)
+_PERM_A = _rng.integers(1, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_PRIME), size=NUM_PERM, dtype=np.uint64)
+# Odd multipliers folding one band into a single uint64 bucket key
+_BAND_MIX = _rng.integers(1, 1 << 63, size=ROWS_PER_BAND, dtype=np.uint64) | np.uint64(1)
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title for shingling.
+
+    Args:
+        title: Raw entry title
+
+    Returns:
+        Lowercased title without accents, punctuation or repeated whitespace
+    """
+    decomposed = unicodedata.normalize("NFKD", title)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", stripped.lower()).split())
+
+
+def _shingle_ids(text: str) -> np.ndarray:
+    """Encode all character shingles of text as uint64 ids (vectorized)."""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype="<u4").astype(np.uint64)
+    if codes.size < SHINGLE_SIZE:
+        return codes if codes.size else np.zeros(1, dtype=np.uint64)
+
+    # Polynomial rolling combination of SHINGLE_SIZE consecutive code points
+    ids = np.zeros(codes.size - SHINGLE_SIZE + 1, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        ids = ids * np.uint64(0x110000) + codes[offset : offset + ids.size]
+    return np.unique(ids % _PRIME)
+
+
+def title_signature(title: str) -> bytes:
+    """
+    Compute the MinHash signature of a title.
+
+    Args:
+        title: Raw entry title
+
+    Returns:
+        NUM_PERM little-endian uint32 values as bytes
+    """
+    shingles = _shingle_ids(normalize_title(title))
+    hashed = (_PERM_A[:, None] * shingles[None, :] + _PERM_B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(SIGNATURE_DTYPE).tobytes()
+
+
+def estimate_similarity(left: bytes, right: bytes) -> float:
+    """
+    Estimate Jaccard similarity of two titles from their signatures.
+
+    Args:
+        left: Signature bytes
+        right: Signature bytes
+
+    Returns:
+        Fraction of matching signature positions
+    """
+    a = np.frombuffer(left, dtype=SIGNATURE_DTYPE)
+    b = np.frombuffer(right, dtype=SIGNATURE_DTYPE)
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    """Find the union-find root of i with path halving."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return int(i)
+
+
+def find_duplicate_groups(
+    ids: Iterable[int], signatures: Iterable[bytes], threshold: float = 0.5
+) -> list[tuple[list[int], float]]:
+    """
+    Group items whose signatures indicate near-duplicate titles.
+
+    Each LSH band is bucketed with a single vectorized np.unique pass. Within a
+    bucket, members are compared to the bucket representative only, so work is
+    linear in the number of items rather than quadratic.
+
+    Args:
+        ids: Item identifiers
+        signatures: Signature bytes aligned with ids
+        threshold: Minimum estimated similarity to link two items
+
+    Returns:
+        List of (sorted member ids, minimum similarity to the group root)
+        for groups with at least two members
+    """
+    id_array = np.fromiter(ids, dtype=np.int64)
+    if id_array.size < 2:
+        return []
+    matrix = np.frombuffer(b"".join(signatures), dtype=SIGNATURE_DTYPE).reshape(-1, NUM_PERM)
+
+    parent = np.arange(id_array.size)
+    for band in range(BANDS):
+        block = matrix[:, band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND].astype(np.uint64)
+        # Key collisions only add candidates; they are filtered by the agreement check
+        keys = (block * _BAND_MIX).sum(axis=1)
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        starts = np.empty(keys.size, dtype=bool)
+        starts[0] = True
+        np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=starts[1:])
+        # Every item points at the first item of its bucket in sorted order
+        representatives = np.empty_like(order)
+        representatives[order] = order[np.flatnonzero(starts)[np.cumsum(starts) - 1]]
+
+        candidates = np.nonzero(representatives != np.arange(id_array.size))[0]
+        if candidates.size == 0:
+            continue
+        candidate_reps = representatives[candidates]
+        agreement = (matrix[candidates] == matrix[candidate_reps]).mean(axis=1)
+        accepted = agreement >= threshold
+        for item, rep in zip(candidates[accepted], candidate_reps[accepted]):
+            root_a, root_b = _find(parent, int(item)), _find(parent, int(rep))
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # Pointer jumping resolves every item to its root in O(log n) vector steps
+    roots = parent
+    while True:
+        jumped = roots[roots]
+        if np.array_equal(jumped, roots):
+            break
+        roots = jumped
+    # Only items that share a root with at least one other item form groups
+    _, inverse, counts = np.unique(roots, return_inverse=True, return_counts=True)
+    grouped = np.nonzero(counts[inverse.ravel()] > 1)[0]
+    order = grouped[np.argsort(roots[grouped], kind="stable")]
+    boundaries = np.nonzero(np.diff(roots[order]))[0] + 1
+
+    groups: list[tuple[list[int], float]] = []
+    for members in np.split(order, boundaries) if order.size else []:
+        root = members[0]
+        similarity = (matrix[members[1:]] == matrix[root]).mean(axis=1).min()
+        groups.append((sorted(int(i) for i in id_array[members]), round(float(similarity), 3)))
+    return groups
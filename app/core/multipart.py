@@ -0,0 +1,184 @@
+"""
+Streaming multipart/form-data parsing for batch uploads.
+File parts are written straight to temporary files as the body arrives, so
+memory use does not grow with the number or size of the files.
+"""
+
+import asyncio
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.upload import MAX_FILE_SIZE, check_symlinks
+
+# Allowance per part for boundaries and part headers
+PART_OVERHEAD = 16 * 1024
+MAX_FILENAME_LENGTH = 255
+
+
+class MultipartError(ValueError):
+    """Malformed multipart body or one that breaks the batch limits."""
+
+
+class RequestTooLargeError(MultipartError):
+    """Multipart body larger than the batch limits allow."""
+
+
+class QuotaExceededError(RequestTooLargeError):
+    """File parts larger than the uploader's remaining storage quota."""
+
+    def __init__(self) -> None:
+        super().__init__("storage_quota_exceeded")
+
+
+def _part_filename(raw: bytes) -> str:
+    """Decode a client filename, keeping only its last path component."""
+    name = raw.decode("utf-8", errors="replace").replace("\\", "/")
+    return os.path.basename(name)[:MAX_FILENAME_LENGTH]
+
+
+async def spool_multipart(
+    chunks: AsyncIterable[bytes],
+    content_type: str,
+    staging_dir: str,
+    field_name: str = "files",
+    max_files: int = 10,
+    max_size: int = MAX_FILE_SIZE,
+    max_total: Optional[int] = None,
+) -> list[dict]:
+    """
+    Stream the file parts of a multipart body into temporary files.
+
+    Parts named ``field_name`` that carry a filename are spooled; other parts
+    are discarded. A part over ``max_size`` is cut off and reported as
+    file_too_large instead of failing the whole body, but the body as a whole
+    may not exceed ``max_files`` full-size parts. Spooling stops as soon as
+    the file parts together exceed ``max_total`` (the remaining quota).
+
+    Args:
+        chunks: Async iterable of request body chunks
+        content_type: Request Content-Type header
+        staging_dir: Directory for the temporary files
+        field_name: Form field holding the files
+        max_files: Maximum number of file parts
+        max_size: Maximum size of one file in bytes
+        max_total: Maximum size of all file parts together, or None
+
+    Returns:
+        One dictionary per file part with filename, temp_path (None if the
+        part was cut off), size and error
+
+    Raises:
+        MultipartError: If the body is not valid multipart/form-data or has
+            too many files
+        RequestTooLargeError: If the body exceeds the batch limits
+        QuotaExceededError: If the file parts exceed max_total
+    """
+    media_type, params = parse_options_header(content_type)
+    if media_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise MultipartError("Expected multipart/form-data with a boundary")
+
+    events: list[tuple[str, bytes]] = []
+
+    def on_data(kind: str):
+        return lambda data, start, end: events.append((kind, data[start:end]))
+
+    parser = MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": lambda: events.append(("part_begin", b"")),
+            "on_header_field": on_data("header_field"),
+            "on_header_value": on_data("header_value"),
+            "on_header_end": lambda: events.append(("header_end", b"")),
+            "on_headers_finished": lambda: events.append(("headers_finished", b"")),
+            "on_part_data": on_data("part_data"),
+            "on_part_end": lambda: events.append(("part_end", b"")),
+        },
+    )
+
+    loop = asyncio.get_running_loop()
+    base_path = Path(staging_dir)
+    base_path.mkdir(parents=True, exist_ok=True)
+    max_body = max_files * (max_size + PART_OVERHEAD)
+    received = spooled = 0
+    parts: list[dict] = []
+    current: Optional[dict] = None
+    handle = None
+    headers: dict[bytes, bytes] = {}
+    header_field = header_value = b""
+
+    def close_current() -> None:
+        nonlocal handle
+        if handle is not None:
+            handle.close()
+            handle = None
+
+    try:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > max_body:
+                raise RequestTooLargeError("Request body too large")
+            parser.write(chunk)
+
+            for kind, data in events:
+                if kind == "part_begin":
+                    headers, current = {}, None
+                    header_field = header_value = b""
+                elif kind == "header_field":
+                    header_field += data
+                elif kind == "header_value":
+                    header_value += data
+                elif kind == "header_end":
+                    headers[header_field.lower()] = header_value
+                    header_field = header_value = b""
+                elif kind == "headers_finished":
+                    _, options = parse_options_header(headers.get(b"content-disposition", b""))
+                    filename = options.get(b"filename")
+                    if options.get(b"name") != field_name.encode() or filename is None:
+                        continue
+                    if len(parts) >= max_files:
+                        raise MultipartError(f"At most {max_files} files per request")
+
+                    temp_path = base_path / f"{uuid.uuid4()}.tmp"
+                    if not check_symlinks(temp_path, base_path):
+                        raise MultipartError("Invalid staging directory")
+                    current = {
+                        "filename": _part_filename(filename),
+                        "temp_path": temp_path,
+                        "size": 0,
+                        "error": None,
+                    }
+                    parts.append(current)
+                    handle = await loop.run_in_executor(None, open, temp_path, "wb")
+                elif kind == "part_data" and current is not None and current["error"] is None:
+                    spooled += len(data)
+                    if max_total is not None and spooled > max_total:
+                        raise QuotaExceededError()
+                    current["size"] += len(data)
+                    if current["size"] > max_size:
+                        # Keep parsing for per-file results but stop storing this part
+                        close_current()
+                        current["temp_path"].unlink(missing_ok=True)
+                        current["temp_path"] = None
+                        current["error"] = "file_too_large"
+                    else:
+                        await loop.run_in_executor(None, handle.write, data)
+                elif kind == "part_end" and current is not None:
+                    await loop.run_in_executor(None, close_current)
+                    current = None
+            events.clear()
+
+        parser.finalize()
+        if current is not None:
+            raise MultipartError("Multipart body ended inside a part")
+    except BaseException:
+        close_current()
+        for part in parts:
+            if part["temp_path"] is not None:
+                part["temp_path"].unlink(missing_ok=True)
+        raise
+
+    return parts
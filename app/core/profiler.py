@@ -0,0 +1,154 @@
+"""
+On-demand statistical profiler.
+A sampler thread reads the current stack of every thread at a fixed interval
+and counts identical stacks, producing the collapsed format consumed by
+flame graph tools. Stacks of the event loop thread are rooted at the task
+that was running. No thread or hook exists while no profile is running.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Optional
+
+# Upper bound on one profile, in seconds
+MAX_PROFILE_SECONDS = 60.0
+DEFAULT_INTERVAL = 0.005
+# Deeper stacks are truncated at the root end
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    """Label of a frame: qualified function name and where it is defined."""
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame: Optional[FrameType]) -> list[str]:
+    """Frame labels from the outermost call to the innermost."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class ProfileInProgressError(RuntimeError):
+    """Raised when a profile is requested while another one runs."""
+
+
+class StackSampler:
+    """Samples the stacks of all threads of the process."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        """
+        Initialize sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being taken."""
+        return self._lock.locked()
+
+    def sample(
+        self,
+        stacks: Counter,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread: Optional[int] = None,
+    ) -> None:
+        """
+        Add one sample of every other thread to the stack counts.
+
+        Args:
+            stacks: Collapsed stack counts to update
+            loop: Event loop whose running task labels its thread's stacks
+            loop_thread: Ident of the thread running the loop
+        """
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            root = [f"thread:{names.get(ident, ident)}"]
+            if loop is not None and ident == loop_thread:
+                task = asyncio.current_task(loop)
+                root.append(f"task:{task.get_name()}" if task is not None else "task:<idle>")
+            stacks[";".join(root + _collapse(frame))] += 1
+
+    def profile(
+        self,
+        seconds: float,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        loop_thread: Optional[int] = None,
+    ) -> tuple[Counter, int]:
+        """
+        Sample all threads for a while; blocks the calling thread.
+
+        Args:
+            seconds: Duration, capped at MAX_PROFILE_SECONDS
+            loop: Event loop whose running task labels its thread's stacks
+            loop_thread: Ident of the thread running the loop
+
+        Returns:
+            Tuple of (collapsed stack counts, number of samples taken)
+
+        Raises:
+            ProfileInProgressError: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfileInProgressError("A profile is already running")
+        try:
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.monotonic() + min(seconds, MAX_PROFILE_SECONDS)
+            while time.monotonic() < deadline:
+                self.sample(stacks, loop, loop_thread)
+                samples += 1
+                time.sleep(self.interval)
+            return stacks, samples
+        finally:
+            self._lock.release()
+
+    async def profile_async(self, seconds: float) -> tuple[Counter, int]:
+        """
+        Profile from the event loop without blocking it.
+
+        The sampler runs in a separate thread; the caller's loop is labelled
+        with its running tasks.
+
+        Args:
+            seconds: Duration, capped at MAX_PROFILE_SECONDS
+
+        Returns:
+            Tuple of (collapsed stack counts, number of samples taken)
+
+        Raises:
+            ProfileInProgressError: If another profile is running
+        """
+        loop = asyncio.get_running_loop()
+        if self.running:
+            raise ProfileInProgressError("A profile is already running")
+        return await asyncio.to_thread(self.profile, seconds, loop, threading.get_ident())
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """
+    Render stack counts in the collapsed format, most frequent first.
+
+    Each line is the frames joined by semicolons, a space and the count, as
+    read by flamegraph.pl, speedscope and inferno.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+profiler = StackSampler()
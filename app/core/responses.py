@@ -0,0 +1,154 @@
+"""
+HTTP helpers for serving stored files.
+Adds single byte-range support and ETag matching on top of Starlette's
+FileResponse.
+"""
+
+import os
+from typing import Optional, Tuple
+
+import anyio
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Raised when a syntactically valid range lies outside the file."""
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header.
+
+    Multiple ranges and malformed headers are ignored (RFC 9110 allows serving
+    the full representation instead).
+
+    Args:
+        header: Range header value
+        size: File size in bytes
+
+    Returns:
+        Inclusive (start, end) offsets, or None to serve the whole file
+
+    Raises:
+        RangeNotSatisfiableError: If the range does not overlap the file
+    """
+    if not header or not header.strip().lower().startswith("bytes="):
+        return None
+    spec = header.strip()[len("bytes=") :].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    first, _, last = (part.strip() for part in spec.partition("-"))
+    if not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+        return None
+
+    if first == "":
+        if last == "":
+            return None
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiableError(header)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Check an ``If-None-Match`` header against an ETag (weak comparison).
+
+    Args:
+        header: If-None-Match header value
+        etag: Quoted entity tag of the current representation
+
+    Returns:
+        True if the client's cached copy is current
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+class RangeFileResponse(FileResponse):
+    """
+    FileResponse that can send a byte range with 206 Partial Content.
+
+    Only ``http.response.body`` messages are sent: the app's HTTP middleware
+    (BaseHTTPMiddleware) rejects any other message type, so server extensions
+    such as zero-copy send cannot be used. Deployments behind nginx get
+    sendfile through X-Accel-Redirect instead.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        byte_range: Optional[Tuple[int, int]] = None,
+        **kwargs,
+    ) -> None:
+        """
+        Initialize response.
+
+        Args:
+            path: File to send
+            stat_result: Result of os.stat on path
+            byte_range: Inclusive (start, end) offsets, or None for the whole file
+            **kwargs: Passed to FileResponse
+        """
+        size = stat_result.st_size
+        self.offset, end = byte_range if byte_range is not None else (0, size - 1)
+        self.count = max(end - self.offset + 1, 0)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers["content-length"] = str(self.count)
+        if byte_range is not None:
+            headers["content-range"] = f"bytes {self.offset}-{end}/{size}"
+            kwargs["status_code"] = 206
+
+        super().__init__(path, headers=headers, stat_result=stat_result, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Send headers and the selected byte range."""
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = self.count
+                while remaining:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": chunk,
+                            "more_body": remaining > 0,
+                        }
+                    )
+                if remaining:
+                    # File shrank underneath us; terminate the body
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        if self.background is not None:
+            await self.background()
@@ -1,5 +1,6 @@
 """Security utilities for authentication and authorization."""
 
+import time
 from datetime import datetime, timedelta
 from typing import Any, Optional
 
@@ -10,6 +11,8 @@ from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.adapters.database import get_db
+from app.core.metrics import PASSWORD_HASH_DURATION
+from app.core.tracing import span
 from app.domain.models import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -18,12 +21,22 @@ security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    started = time.perf_counter()
+    try:
+        with span("password.verify"):
+            return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        PASSWORD_HASH_DURATION.labels("verify").observe(time.perf_counter() - started)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    started = time.perf_counter()
+    try:
+        with span("password.hash"):
+            return pwd_context.hash(password)
+    finally:
+        PASSWORD_HASH_DURATION.labels("hash").observe(time.perf_counter() - started)
 
 
 def create_access_token(data: dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -73,29 +86,31 @@ async def get_current_user(
     """Get the current authenticated user."""
     from app.services.user_service import UserService
 
-    token = credentials.credentials
-    payload = decode_token(token)
-
-    if payload.get("type") != "access":
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type",
-        )
-
-    user_id: str = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-        )
-
-    user_service = UserService(db)
-    user = await user_service.get_by_id(int(user_id))
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    with span("auth.current_user"):
+        token = credentials.credentials
+        with span("auth.decode_token"):
+            payload = decode_token(token)
+
+        if payload.get("type") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type",
+            )
+
+        user_id: str = payload.get("sub")
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+            )
+
+        user_service = UserService(db)
+        user = await user_service.get_by_id(int(user_id))
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
 
     return user
 
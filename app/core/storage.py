@@ -0,0 +1,471 @@
+"""
+Pluggable storage backends for uploaded files.
+Files are addressed by relative keys in the hash-prefix fan-out layout produced
+by app.core.upload.shard_key. The local backend keeps them on disk; the S3
+backend talks to any S3-compatible object store (AWS, MinIO) over httpx.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Mapping, Optional
+from urllib.parse import quote, unquote, urlencode, urlsplit
+from xml.sax.saxutils import escape
+
+import httpx
+
+from app.core.config import settings
+from app.core.upload import (
+    CHUNK_SIZE,
+    check_symlinks,
+    cleanup_uploads,
+    get_files_info,
+    is_safe_path,
+    place_file,
+)
+
+# S3 DeleteObjects accepts at most this many keys per request
+S3_DELETE_BATCH = 1000
+EMPTY_PAYLOAD_HASH = hashlib.sha256(b"").hexdigest()
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*(/[A-Za-z0-9][A-Za-z0-9._-]*)*$")
+
+
+def validate_key(key: str) -> str:
+    """
+    Check that a storage key is a plain relative path.
+
+    Args:
+        key: Storage key such as ``ab/cd/<name>``
+
+    Returns:
+        The key unchanged
+
+    Raises:
+        ValueError: If the key is absolute, empty or contains dot segments
+    """
+    if not _KEY_PATTERN.match(key) or any(part in ("..", ".") for part in key.split("/")):
+        raise ValueError(f"invalid storage key: {key!r}")
+    return key
+
+
+class StorageBackend(ABC):
+    """Interface implemented by upload storage backends."""
+
+    # Local directory where incoming streams are staged before put_file
+    staging_dir: str
+
+    @abstractmethod
+    async def put_file(self, key: str, source: Path, overwrite: bool = False) -> None:
+        """
+        Store a local file under key and remove the source.
+
+        Args:
+            key: Storage key
+            source: Local file to store; it is consumed in every case
+            overwrite: Replace an existing object with the same key
+        """
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether an object is stored under key."""
+
+    @abstractmethod
+    async def stat_many(self, keys: Iterable[str]) -> dict[str, Optional[dict]]:
+        """
+        Look up size and modification time for many keys.
+
+        Args:
+            keys: Storage keys
+
+        Returns:
+            Mapping of each key to {"size", "modified"} or None if missing
+        """
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete many objects.
+
+        Args:
+            keys: Storage keys
+
+        Returns:
+            Number of objects deleted
+        """
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Return the filesystem path of key if the backend stores files locally."""
+        return None
+
+    def url_for(self, key: str, expires: int = 300) -> Optional[str]:
+        """Return a time-limited URL that serves key directly, if supported."""
+        return None
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class LocalShardedStorage(StorageBackend):
+    """Filesystem backend rooted at one directory with a fan-out layout."""
+
+    def __init__(self, root: str):
+        """
+        Initialize local storage.
+
+        Args:
+            root: Base directory; also used as staging directory so moves are atomic
+        """
+        self.root = root
+        self.staging_dir = root
+
+    def _path(self, key: str) -> Path:
+        """Resolve key below the root, refusing anything that escapes it."""
+        path = Path(self.root) / validate_key(key)
+        if not is_safe_path(Path(self.root), path):
+            raise ValueError(f"storage key escapes root: {key!r}")
+        return path
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Return the filesystem path of key."""
+        path = self._path(key)
+        return path if check_symlinks(path, Path(self.root)) else None
+
+    async def put_file(self, key: str, source: Path, overwrite: bool = False) -> None:
+        """Move source into place, keeping an existing file unless overwrite is set."""
+        try:
+            target = self._path(key)
+        except ValueError:
+            source.unlink(missing_ok=True)
+            raise
+        success, reason = await asyncio.get_running_loop().run_in_executor(
+            None, place_file, self.root, source, target, overwrite
+        )
+        if not success:
+            raise OSError(reason)
+
+    async def exists(self, key: str) -> bool:
+        """Check whether a regular file is stored under key."""
+        return (await self.stat_many([key]))[key] is not None
+
+    async def stat_many(self, keys: Iterable[str]) -> dict[str, Optional[dict]]:
+        """Stat files in one executor call, one directory descriptor per shard."""
+        paths = {str(self._path(key)): key for key in keys}
+        infos = await asyncio.get_running_loop().run_in_executor(None, get_files_info, paths)
+        return {
+            key: (
+                {"size": infos[path]["size"], "modified": infos[path]["modified"]}
+                if infos[path] is not None
+                else None
+            )
+            for path, key in paths.items()
+        }
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Unlink files in one executor call, one directory descriptor per shard."""
+        paths = [str(self._path(key)) for key in keys]
+        deleted = await asyncio.get_running_loop().run_in_executor(None, cleanup_uploads, paths)
+        return len(deleted)
+
+
+def _sha256_hex(data: bytes) -> str:
+    """Hex SHA-256 of data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    """HMAC-SHA256 of message."""
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _sigv4_signature(
+    method: str,
+    url: str,
+    headers: Mapping[str, str],
+    payload_hash: str,
+    amz_date: str,
+    secret_key: str,
+    scope: str,
+) -> tuple[str, str]:
+    """Return (signature, signed header list) for a canonical SigV4 request."""
+    parts = urlsplit(url)
+    region, service = scope.split("/")[1:3]
+
+    query = sorted(
+        (quote(unquote(name), safe="-_.~"), quote(unquote(value), safe="-_.~"))
+        for name, _, value in (pair.partition("=") for pair in parts.query.split("&") if pair)
+    )
+    canonical_headers = {name.lower(): " ".join(value.split()) for name, value in headers.items()}
+    signed_headers = ";".join(sorted(canonical_headers))
+    canonical_request = "\n".join(
+        [
+            method,
+            parts.path or "/",
+            "&".join(f"{name}={value}" for name, value in query),
+            "".join(f"{name}:{canonical_headers[name]}\n" for name in sorted(canonical_headers)),
+            signed_headers,
+            payload_hash,
+        ]
+    )
+    string_to_sign = "\n".join(
+        ["AWS4-HMAC-SHA256", amz_date, scope, _sha256_hex(canonical_request.encode("utf-8"))]
+    )
+
+    signing_key = _hmac(f"AWS4{secret_key}".encode("utf-8"), amz_date[:8])
+    for part in (region, service, "aws4_request"):
+        signing_key = _hmac(signing_key, part)
+    signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return signature, signed_headers
+
+
+def sigv4_authorization(
+    method: str,
+    url: str,
+    headers: Mapping[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    service: str = "s3",
+) -> str:
+    """
+    Compute an AWS Signature Version 4 Authorization header.
+
+    Args:
+        method: HTTP method
+        url: Full request URL (path and query already percent-encoded)
+        headers: Headers to sign; must include host and x-amz-date
+        payload_hash: Hex SHA-256 of the body or "UNSIGNED-PAYLOAD"
+        access_key: Access key ID
+        secret_key: Secret access key
+        region: Signing region
+        service: Signing service name
+
+    Returns:
+        Authorization header value
+    """
+    amz_date = headers["x-amz-date"]
+    scope = f"{amz_date[:8]}/{region}/{service}/aws4_request"
+    signature, signed_headers = _sigv4_signature(
+        method, url, headers, payload_hash, amz_date, secret_key, scope
+    )
+    return (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage using path-style addressing.
+
+    Uploads stream the staged file without buffering it; stat_many issues
+    bounded concurrent HEAD requests and delete_many uses DeleteObjects in
+    batches of S3_DELETE_BATCH keys.
+    """
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        staging_dir: Optional[str] = None,
+        concurrency: int = 16,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize S3 storage.
+
+        Args:
+            endpoint_url: Service endpoint, e.g. https://s3.eu-west-1.amazonaws.com
+            bucket: Bucket name
+            access_key: Access key ID
+            secret_key: Secret access key
+            region: Signing region
+            staging_dir: Local directory for incoming streams
+            concurrency: Maximum simultaneous requests in batched operations
+            client: HTTP client (tests pass one with a mock transport)
+        """
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.staging_dir = staging_dir or settings.upload_dir
+        self.concurrency = concurrency
+        self.client = client or httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0))
+
+    def _url(self, key: str = "", query: str = "") -> str:
+        """Build the path-style URL of an object or the bucket."""
+        path = f"/{quote(self.bucket)}"
+        if key:
+            path += "/" + quote(validate_key(key), safe="/-_.~")
+        return f"{self.endpoint_url}{path}" + (f"?{query}" if query else "")
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        content: Optional[object] = None,
+        payload_hash: str = EMPTY_PAYLOAD_HASH,
+        headers: Optional[dict[str, str]] = None,
+    ) -> httpx.Response:
+        """Sign and send a request."""
+        signed = {
+            "host": urlsplit(url).netloc,
+            "x-amz-date": time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()),
+            "x-amz-content-sha256": payload_hash,
+            **(headers or {}),
+        }
+        signed["Authorization"] = sigv4_authorization(
+            method, url, signed, payload_hash, self.access_key, self.secret_key, self.region
+        )
+        return await self.client.request(method, url, content=content, headers=signed)
+
+    def url_for(self, key: str, expires: int = 300) -> Optional[str]:
+        """Build a presigned GET URL (SigV4 query-string authentication)."""
+        amz_date = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        scope = f"{amz_date[:8]}/{self.region}/s3/aws4_request"
+        query = urlencode(
+            {
+                "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+                "X-Amz-Credential": f"{self.access_key}/{scope}",
+                "X-Amz-Date": amz_date,
+                "X-Amz-Expires": str(expires),
+                "X-Amz-SignedHeaders": "host",
+            },
+            quote_via=quote,
+        )
+        url = self._url(key, query)
+        signature, _ = _sigv4_signature(
+            "GET",
+            url,
+            {"host": urlsplit(url).netloc},
+            "UNSIGNED-PAYLOAD",
+            amz_date,
+            self.secret_key,
+            scope,
+        )
+        return f"{url}&X-Amz-Signature={signature}"
+
+    async def put_file(self, key: str, source: Path, overwrite: bool = False) -> None:
+        """Upload source with a streaming PUT and remove it afterwards."""
+        try:
+            if not overwrite and await self.exists(key):
+                return
+
+            loop = asyncio.get_running_loop()
+            size = (await loop.run_in_executor(None, source.stat)).st_size
+
+            async def body() -> AsyncIterator[bytes]:
+                with open(source, "rb") as handle:
+                    while chunk := await loop.run_in_executor(None, handle.read, CHUNK_SIZE):
+                        yield chunk
+
+            response = await self._request(
+                "PUT",
+                self._url(key),
+                content=body(),
+                payload_hash="UNSIGNED-PAYLOAD",
+                headers={"content-length": str(size)},
+            )
+            response.raise_for_status()
+        finally:
+            source.unlink(missing_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        """Check whether an object is stored under key."""
+        return (await self.stat_many([key]))[key] is not None
+
+    async def stat_many(self, keys: Iterable[str]) -> dict[str, Optional[dict]]:
+        """HEAD every key with bounded concurrency."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def head(key: str) -> Optional[dict]:
+            async with semaphore:
+                response = await self._request("HEAD", self._url(key))
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            last_modified = response.headers.get("last-modified")
+            return {
+                "size": int(response.headers.get("content-length", 0)),
+                "modified": (
+                    parsedate_to_datetime(last_modified).timestamp()
+                    if last_modified
+                    else datetime.now(timezone.utc).timestamp()
+                ),
+            }
+
+        unique = list(dict.fromkeys(keys))
+        results = await asyncio.gather(*(head(key) for key in unique))
+        return dict(zip(unique, results))
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """
+        Delete keys with DeleteObjects, S3_DELETE_BATCH keys per request.
+
+        S3 reports missing keys as deleted, so they are included in the count.
+        """
+        unique = [validate_key(key) for key in dict.fromkeys(keys)]
+
+        deleted = 0
+        for start in range(0, len(unique), S3_DELETE_BATCH):
+            batch = unique[start : start + S3_DELETE_BATCH]
+            payload = (
+                '<?xml version="1.0" encoding="UTF-8"?><Delete><Quiet>true</Quiet>'
+                + "".join(f"<Object><Key>{escape(key)}</Key></Object>" for key in batch)
+                + "</Delete>"
+            ).encode("utf-8")
+            response = await self._request(
+                "POST",
+                self._url(query="delete="),
+                content=payload,
+                payload_hash=_sha256_hex(payload),
+                headers={
+                    "content-md5": base64.b64encode(
+                        hashlib.md5(payload, usedforsecurity=False).digest()
+                    ).decode(),
+                    "content-type": "application/xml",
+                },
+            )
+            response.raise_for_status()
+            # Quiet mode only reports failures
+            deleted += len(batch) - response.text.count("<Error>")
+        return deleted
+
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        await self.client.aclose()
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """
+    Get the configured storage backend.
+
+    Returns:
+        Shared backend instance selected by settings.storage_backend
+    """
+    if settings.storage_backend == "s3":
+        if not (settings.s3_endpoint_url and settings.s3_access_key and settings.s3_secret_key):
+            raise ValueError("S3 storage requires s3_endpoint_url, s3_access_key, s3_secret_key")
+        return S3Storage(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key,
+            region=settings.s3_region,
+        )
+    if settings.storage_backend != "local":
+        raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+    return LocalShardedStorage(settings.upload_dir)
@@ -0,0 +1,99 @@
+"""
+Thumbnail rendering for uploaded cover images.
+Runs inside process-pool workers, so it only depends on Pillow and the upload
+validation helpers and exchanges plain paths with the parent process.
+"""
+
+import io
+import uuid
+from pathlib import Path
+from typing import Iterable
+
+from PIL import Image, ImageOps
+
+from app.core.upload import ALLOWED_MIME_TYPES, MAX_FILE_SIZE, shard_key, sniff_image_type
+
+THUMBNAIL_CONTENT_TYPE = "image/jpeg"
+# Refuse to decode sources larger than this (decompression bomb guard)
+MAX_SOURCE_PIXELS = 40_000_000
+_PIL_FORMATS = ["PNG", "JPEG"]
+
+
+def thumbnail_key(digest: str, width: int) -> str:
+    """
+    Get the storage key of a thumbnail, in the same shard as its original.
+
+    Args:
+        digest: Hex SHA-256 of the original blob
+        width: Thumbnail width in pixels
+
+    Returns:
+        Storage key ``ab/cd/<digest>.w<width>.jpg``
+    """
+    return shard_key(f"{digest}.w{width}.jpg")
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Convert to RGB, compositing transparency onto white."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render_thumbnails(
+    source_path: str, staging_dir: str, widths: Iterable[int], quality: int = 80
+) -> dict[int, str]:
+    """
+    Render JPEG thumbnails of a stored image.
+
+    The source is re-checked with sniff_image_type and decoded only as PNG or
+    JPEG. Widths at or above the source width are skipped (no upscaling), and
+    each thumbnail is downscaled from the next larger one.
+
+    Args:
+        source_path: Stored original image
+        staging_dir: Directory for the rendered temporary files
+        widths: Target widths in pixels
+        quality: JPEG quality
+
+    Returns:
+        Mapping of width to temporary file path; the caller moves or deletes them
+
+    Raises:
+        ValueError: If the source is not an allowed, reasonably sized image
+    """
+    with open(source_path, "rb") as handle:
+        data = handle.read(MAX_FILE_SIZE + 1)
+    if len(data) > MAX_FILE_SIZE or sniff_image_type(data) not in ALLOWED_MIME_TYPES:
+        raise ValueError("invalid_file_type")
+
+    rendered: dict[int, str] = {}
+    try:
+        with Image.open(io.BytesIO(data), formats=_PIL_FORMATS) as opened:
+            source_width, source_height = opened.size
+            if source_width * source_height > MAX_SOURCE_PIXELS:
+                raise ValueError("image_too_large")
+
+            targets = sorted((w for w in set(widths) if 0 < w < source_width), reverse=True)
+            if not targets:
+                return rendered
+
+            # Let the JPEG decoder downscale by a power of two while decoding
+            opened.draft("RGB", (targets[0], max(1, source_height * targets[0] // source_width)))
+            image = _flatten(ImageOps.exif_transpose(opened))
+
+            for width in targets:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+                temp_path = Path(staging_dir) / f"{uuid.uuid4()}.tmp"
+                image.save(temp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+                rendered[width] = str(temp_path)
+    except Exception:
+        for temp_path in rendered.values():
+            Path(temp_path).unlink(missing_ok=True)
+        raise
+
+    return rendered
@@ -0,0 +1,400 @@
+"""
+Lightweight request tracing.
+Spans are context managers kept in a context variable, so nested spans form a
+tree per request without passing anything through the code. The trace id is
+the request_id, and traces are sampled when the request starts: an unsampled
+request costs a context variable lookup per instrumented call.
+Finished traces are exported from a background thread, as JSON lines or as
+OTLP/HTTP JSON to a collector.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def _new_span_id() -> str:
+    """Random 64-bit span id in hex."""
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str]) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value pair to the span."""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        """Record the end time."""
+        self.end_ns = time.time_ns()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize the finished span."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded outside sampled traces."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore the attribute."""
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans recorded for one sampled request."""
+
+    __slots__ = ("trace_id", "request_id", "root", "spans")
+
+    def __init__(self, request_id: str, name: str) -> None:
+        self.request_id = request_id
+        # A UUID request_id is exactly an OTLP trace id once the dashes are gone
+        self.trace_id = request_id.replace("-", "")
+        self.root = Span(name, self.trace_id, None)
+        self.spans: list[Span] = [self.root]
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def start_trace(request_id: str, name: str) -> Optional[Trace]:
+    """
+    Start a trace for the current context if it is sampled.
+
+    Args:
+        request_id: Request id, used as the trace id
+        name: Name of the root span
+
+    Returns:
+        The trace, or None when tracing is off or the request was not sampled
+    """
+    if not settings.tracing_enabled or random.random() >= settings.tracing_sample_rate:
+        _current_trace.set(None)
+        return None
+    trace = Trace(request_id, name)
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    return trace
+
+
+def finish_trace(trace: Trace, name: Optional[str] = None, **attributes: Any) -> None:
+    """
+    End the root span and hand the trace to the exporter.
+
+    Args:
+        trace: Trace returned by start_trace
+        name: Final root span name, e.g. once the route is known
+        **attributes: Attributes added to the root span
+    """
+    root = trace.root
+    if name:
+        root.name = name
+    root.attributes.update(attributes)
+    root.end()
+    span_exporter.submit(trace)
+
+
+def current_trace() -> Optional[Trace]:
+    """Get the trace of the current context, if it is sampled."""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a block as a child of the current span.
+
+    Args:
+        name: Span name
+        **attributes: Initial attributes
+
+    Yields:
+        The span, or a no-op stand-in when the trace is not sampled
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(name, trace.trace_id, parent.span_id if parent else None)
+    current.attributes.update(attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+        trace.spans.append(current)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Decorate a coroutine function to run in a span.
+
+    Args:
+        name: Span name, defaults to the function's qualified name
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current_trace.get() is None:
+                return await func(*args, **kwargs)
+            with span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class JsonlSpanExporter:
+    """Append spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        """
+        Initialize exporter.
+
+        Args:
+            path: File to append to
+        """
+        self.path = path
+
+    def export(self, traces: list[Trace]) -> None:
+        """Write the spans of a batch of traces."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            for trace in traces:
+                for recorded in trace.spans:
+                    record = recorded.to_dict()
+                    record["request_id"] = trace.request_id
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def close(self) -> None:
+        """Nothing to release; the file is opened per batch."""
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Convert an attribute value to an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(traces: list[Trace], service_name: str) -> dict[str, Any]:
+    """
+    Build an OTLP/HTTP JSON export request.
+
+    Args:
+        traces: Finished traces
+        service_name: Value of the service.name resource attribute
+
+    Returns:
+        ExportTraceServiceRequest as a JSON-ready dictionary
+    """
+    spans = []
+    for trace in traces:
+        for recorded in trace.spans:
+            attributes = {"request_id": trace.request_id, **recorded.attributes}
+            spans.append(
+                {
+                    "traceId": recorded.trace_id,
+                    "spanId": recorded.span_id,
+                    "parentSpanId": recorded.parent_id or "",
+                    "name": recorded.name,
+                    # SPAN_KIND_SERVER for the root, SPAN_KIND_INTERNAL otherwise
+                    "kind": 2 if recorded.parent_id is None else 1,
+                    "startTimeUnixNano": str(recorded.start_ns),
+                    "endTimeUnixNano": str(recorded.end_ns),
+                    "attributes": [
+                        {"key": key, "value": _otlp_value(value)}
+                        for key, value in attributes.items()
+                    ],
+                    "status": (
+                        {"code": 2, "message": recorded.error} if recorded.error else {"code": 1}
+                    ),
+                }
+            )
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]
+                },
+                "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class OtlpSpanExporter:
+    """POST spans as OTLP/HTTP JSON to a collector."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        """
+        Initialize exporter.
+
+        Args:
+            endpoint: Collector traces URL, e.g. http://collector:4318/v1/traces
+            service_name: Value of the service.name resource attribute
+            timeout: Request timeout in seconds
+        """
+        self.endpoint = endpoint
+        self.service_name = service_name
+        # The collector is operator configuration, so the outbound URL policy
+        # of SecureHTTPClient does not apply; this runs in the export thread
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, traces: list[Trace]) -> None:
+        """Send a batch of traces."""
+        response = self._client.post(self.endpoint, json=to_otlp(traces, self.service_name))
+        response.raise_for_status()
+
+    def close(self) -> None:
+        """Close the HTTP connection pool."""
+        self._client.close()
+
+
+class SpanExportWorker:
+    """
+    Bounded queue of finished traces drained by a background thread.
+
+    Traces are dropped and counted when the queue is full, so exporting
+    never slows requests down.
+    """
+
+    def __init__(self, exporter: Any, queue_size: int = 1000, batch_size: int = 64):
+        """
+        Initialize worker.
+
+        Args:
+            exporter: Object with export(traces) and close()
+            queue_size: Maximum traces waiting for export
+            batch_size: Maximum traces per export call
+        """
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.queue: queue.Queue[Optional[Trace]] = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.failed = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, trace: Trace) -> None:
+        """Queue a finished trace, dropping it when the queue is full."""
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        """Start the export thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Export queued traces and stop the thread."""
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self.exporter.close()
+
+    def _run(self) -> None:
+        """Export traces in batches until stopped."""
+        while True:
+            first = self.queue.get()
+            batch = [first] if first is not None else []
+            while first is not None and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    first = None
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.warning(f"Span export failed: {e}")
+            if first is None:
+                return
+
+
+def create_exporter() -> Any:
+    """Create the exporter selected in the settings."""
+    if settings.tracing_exporter == "otlp":
+        return OtlpSpanExporter(settings.tracing_otlp_endpoint, settings.app_name)
+    return JsonlSpanExporter(settings.tracing_jsonl_path)
+
+
+span_exporter = SpanExportWorker(create_exporter(), settings.tracing_queue_size)
@@ -4,12 +4,18 @@ Implements security measures for file uploads including magic bytes validation,
 path canonicalization, and symlink protection.
 """
 
+import asyncio
+import hashlib
+import os
+import stat
 import uuid
+from collections import defaultdict
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Tuple
 
 # Security constants
 MAX_FILE_SIZE = 5_000_000  # 5MB
+CHUNK_SIZE = 64 * 1024  # Streaming read/write unit
 ALLOWED_MIME_TYPES = {"image/png", "image/jpeg"}
 ALLOWED_EXTENSIONS = {".png", ".jpg", ".jpeg"}
 
@@ -126,6 +132,58 @@ def check_symlinks(path: Path, base_path: Optional[Path] = None) -> bool:
         return False
 
 
+def shard_key(name: str) -> str:
+    """
+    Place a file name into the two-level hash-prefix fan-out layout.
+
+    Names start with hex characters (UUIDs or SHA-256 digests), so the first two
+    pairs spread files evenly over 65536 directories and keep each one small.
+
+    Args:
+        name: File name starting with at least four hex characters
+
+    Returns:
+        Relative key of the form ``ab/cd/<name>``
+    """
+    return f"{name[:2]}/{name[2:4]}/{name}"
+
+
+def _prepare_target(base_dir: str, detected_type: str) -> Tuple[Optional[Path], str]:
+    """
+    Build a safe, UUID-named target path for a validated upload.
+
+    Args:
+        base_dir: Base directory for uploads
+        detected_type: MIME type detected from magic bytes
+
+    Returns:
+        Tuple of (target path or None, reason when rejected)
+    """
+    # Create base directory if it doesn't exist
+    base_path = Path(base_dir)
+    base_path.mkdir(parents=True, exist_ok=True)
+
+    # Generate secure filename with UUID
+    file_extension = ".png" if detected_type == "image/png" else ".jpg"
+    secure_filename = f"{uuid.uuid4()}{file_extension}"
+
+    # Create target path inside its fan-out directory
+    target_path = base_path / shard_key(secure_filename)
+
+    # Validate path safety
+    if not is_safe_path(base_path, target_path):
+        return None, "path_traversal_detected"
+
+    # Check for symlinks in parent directories (only within base_path)
+    if not check_symlinks(target_path, base_path):
+        return None, "symlink_in_path"
+
+    # Ensure target directory exists
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+
+    return target_path, ""
+
+
 def secure_save(base_dir: str, filename_hint: str, data: bytes) -> Tuple[bool, str]:
     """
     Securely save uploaded file with comprehensive security checks.
@@ -152,42 +210,333 @@ def secure_save(base_dir: str, filename_hint: str, data: bytes) -> Tuple[bool, s
         if not detected_type:
             return False, "unable_to_detect_type"
 
-        # Create base directory if it doesn't exist
+        target_path, reason = _prepare_target(base_dir, detected_type)
+        if target_path is None:
+            return False, reason
+
+        # Write file atomically
+        temp_path = target_path.with_suffix(target_path.suffix + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+
+        # Atomic move to final location
+        temp_path.replace(target_path)
+
+        return True, str(target_path)
+
+    except OSError as e:
+        return False, f"filesystem_error: {str(e)}"
+    except Exception as e:
+        return False, f"unexpected_error: {str(e)}"
+
+
+async def iter_upload_chunks(upload: Any, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Read an upload in fixed-size chunks.
+
+    Args:
+        upload: Object with an async read(size) method, e.g. Starlette UploadFile
+        chunk_size: Maximum chunk size in bytes
+
+    Yields:
+        File content chunks
+    """
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _sniff_stream_head(head: bytes) -> Optional[str]:
+    """
+    Detect image type from the first bytes of a stream.
+
+    JPEG detection is provisional: the EOI marker is verified once the stream ends.
+
+    Args:
+        head: Leading bytes of the file
+
+    Returns:
+        MIME type if the prefix matches, None otherwise
+    """
+    if head.startswith(PNG_MAGIC):
+        return "image/png"
+    if head.startswith(JPEG_SOI):
+        return "image/jpeg"
+    return None
+
+
+def content_path(base_dir: str, digest: str, extension: str) -> Path:
+    """
+    Get the location of a content-addressed blob.
+
+    Args:
+        base_dir: Base directory for uploads
+        digest: Hex SHA-256 of the blob content
+        extension: File extension including the dot
+
+    Returns:
+        Path of the blob inside its two-level shard directory
+    """
+    if len(digest) != 64 or any(ch not in "0123456789abcdef" for ch in digest):
+        raise ValueError("digest must be a lowercase hex SHA-256")
+    return Path(base_dir) / shard_key(f"{digest}{extension}")
+
+
+async def receive_stream(
+    base_dir: str,
+    chunks: AsyncIterable[bytes],
+    max_size: int = MAX_FILE_SIZE,
+) -> Tuple[bool, str, Optional[dict]]:
+    """
+    Validate an upload stream into a temporary file while hashing it.
+
+    Magic bytes are sniffed from the first chunk, the size limit is enforced
+    while reading, the JPEG EOI marker is checked on a rolling tail buffer and
+    the SHA-256 digest is updated chunk by chunk. Disk writes run in the default
+    thread-pool executor. Peak memory is one chunk.
+
+    Args:
+        base_dir: Base directory for uploads (the temporary file is created here)
+        chunks: Async iterable of file content chunks
+        max_size: Maximum accepted size in bytes
+
+    Returns:
+        Tuple of (success, reason, info). On success info holds temp_path, sha256,
+        size, content_type and extension; the caller must move or delete temp_path.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    temp_path: Optional[Path] = None
+    handle = None
+
+    try:
+        # Collect just enough leading bytes to recognise the magic number
+        head = b""
+        while len(head) < len(PNG_MAGIC):
+            try:
+                head += await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+
+        detected_type = _sniff_stream_head(head)
+        if not head or detected_type not in ALLOWED_MIME_TYPES:
+            return False, "invalid_file_type", None
+
+        if len(head) > max_size:
+            return False, "file_too_large", None
+
         base_path = Path(base_dir)
         base_path.mkdir(parents=True, exist_ok=True)
+        candidate = base_path / f"{uuid.uuid4()}.tmp"
+        if not check_symlinks(candidate, base_path):
+            return False, "symlink_in_path", None
+        temp_path = candidate
+        handle = await loop.run_in_executor(None, open, temp_path, "wb")
+
+        digest = hashlib.sha256(head)
+        size = len(head)
+        tail = head[-len(JPEG_EOI) :]
+        await loop.run_in_executor(None, handle.write, head)
+
+        async for chunk in iterator:
+            if not chunk:
+                continue
+            size += len(chunk)
+            if size > max_size:
+                return False, "file_too_large", None
+            digest.update(chunk)
+            tail = (tail + chunk)[-len(JPEG_EOI) :]
+            await loop.run_in_executor(None, handle.write, chunk)
+
+        if detected_type == "image/jpeg" and tail != JPEG_EOI:
+            return False, "invalid_file_type", None
+
+        await loop.run_in_executor(None, handle.close)
+        handle = None
+
+        info = {
+            "temp_path": temp_path,
+            "sha256": digest.hexdigest(),
+            "size": size,
+            "content_type": detected_type,
+            "extension": ".png" if detected_type == "image/png" else ".jpg",
+        }
+        temp_path = None
+        return True, "", info
 
-        # Generate secure filename with UUID
-        file_extension = ".png" if detected_type == "image/png" else ".jpg"
-        secure_filename = f"{uuid.uuid4()}{file_extension}"
+    except OSError as e:
+        return False, f"filesystem_error: {str(e)}", None
+    except Exception as e:
+        return False, f"unexpected_error: {str(e)}", None
+    finally:
+        if handle is not None:
+            handle.close()
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+
+
+def inspect_file(
+    file_path: Path, max_size: int = MAX_FILE_SIZE
+) -> Tuple[bool, str, Optional[dict]]:
+    """
+    Validate and hash an already spooled file in place.
+
+    Applies the same checks as receive_stream (magic bytes, size limit, JPEG
+    EOI marker) while reading the file one chunk at a time. Blocking; run it
+    in an executor. Peak memory is one chunk.
 
-        # Create target path
-        target_path = base_path / secure_filename
+    Args:
+        file_path: Temporary file to inspect
+        max_size: Maximum accepted size in bytes
+
+    Returns:
+        Tuple of (success, reason, info). On success info holds temp_path, sha256,
+        size, content_type and extension, as returned by receive_stream.
+    """
+    try:
+        if os.lstat(file_path).st_size > max_size:
+            return False, "file_too_large", None
+
+        with open(file_path, "rb") as handle:
+            head = handle.read(CHUNK_SIZE)
+            detected_type = _sniff_stream_head(head)
+            if not head or detected_type not in ALLOWED_MIME_TYPES:
+                return False, "invalid_file_type", None
+
+            digest = hashlib.sha256(head)
+            size = len(head)
+            tail = head[-len(JPEG_EOI) :]
+            while chunk := handle.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    return False, "file_too_large", None
+                digest.update(chunk)
+                tail = (tail + chunk)[-len(JPEG_EOI) :]
+
+        if detected_type == "image/jpeg" and tail != JPEG_EOI:
+            return False, "invalid_file_type", None
+
+        return (
+            True,
+            "",
+            {
+                "temp_path": Path(file_path),
+                "sha256": digest.hexdigest(),
+                "size": size,
+                "content_type": detected_type,
+                "extension": ".png" if detected_type == "image/png" else ".jpg",
+            },
+        )
+    except OSError as e:
+        return False, f"filesystem_error: {str(e)}", None
 
-        # Validate path safety
+
+async def secure_save_stream(
+    base_dir: str,
+    filename_hint: str,
+    chunks: AsyncIterable[bytes],
+    max_size: int = MAX_FILE_SIZE,
+) -> Tuple[bool, str]:
+    """
+    Securely save an upload from an async chunk stream.
+
+    Applies the same checks as secure_save without buffering the file; see
+    receive_stream for how the stream is validated.
+
+    Args:
+        base_dir: Base directory for uploads
+        filename_hint: Original filename (for logging only)
+        chunks: Async iterable of file content chunks
+        max_size: Maximum accepted size in bytes
+
+    Returns:
+        Tuple of (success, path_or_reason)
+    """
+    success, reason, info = await receive_stream(base_dir, chunks, max_size)
+    if not success:
+        return False, reason
+
+    temp_path = info["temp_path"]
+    try:
+        target_path, reason = _prepare_target(base_dir, info["content_type"])
+        if target_path is None:
+            return False, reason
+
+        # Atomic move to final location
+        await asyncio.get_running_loop().run_in_executor(None, temp_path.replace, target_path)
+        return True, str(target_path)
+
+    except OSError as e:
+        return False, f"filesystem_error: {str(e)}"
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def commit_content_addressed(
+    base_dir: str, temp_path: Path, digest: str, extension: str, overwrite: bool = False
+) -> Tuple[bool, str]:
+    """
+    Move a received temporary file to its content-addressed location.
+
+    When a blob with the same digest is already stored the temporary file is
+    discarded instead of rewriting identical bytes.
+
+    Args:
+        base_dir: Base directory for uploads
+        temp_path: Temporary file produced by receive_stream
+        digest: Hex SHA-256 of the content
+        extension: File extension including the dot
+        overwrite: Replace an existing blob (used when its file may be missing
+            or about to be removed concurrently)
+
+    Returns:
+        Tuple of (success, path_or_reason)
+    """
+    try:
+        target_path = content_path(base_dir, digest, extension)
+    except ValueError as e:
+        temp_path.unlink(missing_ok=True)
+        return False, f"invalid_digest: {str(e)}"
+    return place_file(base_dir, temp_path, target_path, overwrite)
+
+
+def place_file(
+    base_dir: str, temp_path: Path, target_path: Path, overwrite: bool = False
+) -> Tuple[bool, str]:
+    """
+    Atomically move a temporary file to a checked location below base_dir.
+
+    Args:
+        base_dir: Base directory for uploads
+        temp_path: File to move; it is removed in every case
+        target_path: Destination path
+        overwrite: Replace the destination if it already exists
+
+    Returns:
+        Tuple of (success, path_or_reason)
+    """
+    try:
+        base_path = Path(base_dir)
         if not is_safe_path(base_path, target_path):
             return False, "path_traversal_detected"
 
-        # Check for symlinks in parent directories (only within base_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
         if not check_symlinks(target_path, base_path):
             return False, "symlink_in_path"
 
-        # Ensure target directory exists
-        target_path.parent.mkdir(parents=True, exist_ok=True)
+        if target_path.exists() and not overwrite:
+            return True, str(target_path)
 
-        # Write file atomically
-        temp_path = target_path.with_suffix(target_path.suffix + ".tmp")
-        with open(temp_path, "wb") as f:
-            f.write(data)
-
-        # Atomic move to final location
+        # Atomic move; identical content makes a concurrent replace harmless
         temp_path.replace(target_path)
-
         return True, str(target_path)
 
     except OSError as e:
         return False, f"filesystem_error: {str(e)}"
-    except Exception as e:
-        return False, f"unexpected_error: {str(e)}"
+    finally:
+        temp_path.unlink(missing_ok=True)
 
 
 def get_file_info(file_path: str) -> Optional[dict]:
@@ -235,3 +584,170 @@ def cleanup_upload(file_path: str) -> bool:
         return False
     except (OSError, ValueError):
         return False
+
+
+def _group_by_directory(file_paths: Iterable[str]) -> dict[str, list[tuple[str, str]]]:
+    """Group paths by parent directory as (original path, file name) pairs."""
+    groups: dict[str, list[tuple[str, str]]] = defaultdict(list)
+    for file_path in file_paths:
+        path = Path(file_path)
+        groups[str(path.parent)].append((file_path, path.name))
+    return groups
+
+
+def get_files_info(file_paths: Iterable[str]) -> dict[str, Optional[dict]]:
+    """
+    Get file information for many uploaded files.
+
+    Each directory is opened once and its files are stat'ed relative to the
+    directory descriptor, so bulk jobs avoid resolving the full path per file.
+
+    Args:
+        file_paths: Paths to uploaded files
+
+    Returns:
+        Mapping of each path to its info dictionary (as get_file_info), or None
+    """
+    info: dict[str, Optional[dict]] = {}
+    for directory, members in _group_by_directory(file_paths).items():
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            info.update((file_path, None) for file_path, _ in members)
+            continue
+
+        try:
+            for file_path, name in members:
+                try:
+                    result = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+                except OSError:
+                    info[file_path] = None
+                    continue
+                if not stat.S_ISREG(result.st_mode):
+                    info[file_path] = None
+                    continue
+                info[file_path] = {
+                    "filename": name,
+                    "size": result.st_size,
+                    "created": result.st_ctime,
+                    "modified": result.st_mtime,
+                    "extension": Path(name).suffix.lower(),
+                }
+        finally:
+            os.close(dir_fd)
+    return info
+
+
+def cleanup_uploads(file_paths: Iterable[str]) -> list[str]:
+    """
+    Securely delete many uploaded files.
+
+    Files are unlinked relative to one descriptor per directory; symlinks and
+    missing files are skipped.
+
+    Args:
+        file_paths: Paths to files to delete
+
+    Returns:
+        Paths that were deleted
+    """
+    deleted: list[str] = []
+    for directory, members in _group_by_directory(file_paths).items():
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            continue
+
+        try:
+            for file_path, name in members:
+                try:
+                    if not stat.S_ISREG(
+                        os.stat(name, dir_fd=dir_fd, follow_symlinks=False).st_mode
+                    ):
+                        continue
+                    os.unlink(name, dir_fd=dir_fd)
+                    deleted.append(file_path)
+                except OSError:
+                    continue
+        finally:
+            os.close(dir_fd)
+    return deleted
+
+
+def remove_if_unchanged(file_path: str, modified: float) -> bool:
+    """
+    Delete an uploaded file only if it was not modified since it was scanned.
+
+    Args:
+        file_path: Path to the file
+        modified: Modification time seen by the scan
+
+    Returns:
+        True if the file was deleted; False if it changed, vanished or is not
+        a regular file
+    """
+    path = Path(file_path)
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    except OSError:
+        return False
+
+    try:
+        result = os.stat(path.name, dir_fd=dir_fd, follow_symlinks=False)
+        if not stat.S_ISREG(result.st_mode) or result.st_mtime != modified:
+            return False
+        os.unlink(path.name, dir_fd=dir_fd)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(dir_fd)
+
+
+def iter_upload_files(base_dir: str, batch_size: int = 1000) -> Iterator[list[dict]]:
+    """
+    Walk the upload tree with os.scandir, yielding regular files in batches.
+
+    Directory entries carry their own stat data, so no per-file path lookups
+    are made; symlinks are neither followed nor reported.
+
+    Args:
+        base_dir: Base directory for uploads
+        batch_size: Maximum number of files per batch
+
+    Yields:
+        Lists of dictionaries with key (path relative to base_dir), path, size
+        and modified
+    """
+    base_path = Path(base_dir)
+    pending = [base_dir]
+    batch: list[dict] = []
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    try:
+                        result = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    batch.append(
+                        {
+                            "key": Path(entry.path).relative_to(base_path).as_posix(),
+                            "path": entry.path,
+                            "size": result.st_size,
+                            "modified": result.st_mtime,
+                        }
+                    )
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+        except OSError:
+            continue
+    if batch:
+        yield batch
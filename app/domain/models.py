@@ -4,7 +4,17 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -66,16 +76,27 @@ class Entry(Base):
     """Entry model for reading list items."""
 
     __tablename__ = "entries"
+    __table_args__ = (Index("ix_entries_owner_id_link_hash", "owner_id", "link_hash"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     kind: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
     link: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Truncated SHA-256 of the canonical link, see app.core.links
+    link_hash: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
+    # MinHash signature of the normalized title, see app.core.minhash
+    title_minhash: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
     status: Mapped[str] = mapped_column(
         String(20), default=EntryStatus.TO_READ.value, nullable=False, index=True
     )
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     owner_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    # Link metadata filled in asynchronously by the enrichment worker
+    link_title: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    link_description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    link_image: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    reading_time_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    enriched_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -85,3 +106,81 @@ class Entry(Base):
         onupdate=func.now(),
         nullable=False,
     )
+
+
+class LinkEnrichmentJob(Base):
+    """Pending link metadata fetch, kept so enrichment survives restarts."""
+
+    __tablename__ = "link_enrichment_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    entry_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class LinkCheck(Base):
+    """Result of the latest liveness check for a distinct entry link."""
+
+    __tablename__ = "link_checks"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    url: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    is_alive: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    redirect_target: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    checked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+
+
+class UploadBlob(Base):
+    """Content-addressed stored file, shared by every upload with the same bytes."""
+
+    __tablename__ = "upload_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Storage key in the fan-out layout, see app.core.storage
+    path: Mapped[str] = mapped_column(Text, nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Number of uploads pointing at this blob; the file is deleted at zero
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class Upload(Base):
+    """A user's reference to an uploaded blob."""
+
+    __tablename__ = "uploads"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    owner_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class UserStorageUsage(Base):
+    """Running total of upload bytes held by one user, maintained with each upload."""
+
+    __tablename__ = "user_storage_usage"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    # Indexed so the largest consumers are read from the end of the index
+    bytes_used: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False, index=True)
+    file_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
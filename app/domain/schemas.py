@@ -2,6 +2,7 @@
 
 import re
 from datetime import datetime
+from enum import Enum
 from ipaddress import ip_address, ip_network
 from typing import Optional
 
@@ -103,6 +104,14 @@ class RefreshRequest(BaseModel):
 
 
 # Entry schemas
+class DuplicateLinkPolicy(str, Enum):
+    """How entry creation treats links the owner has already saved."""
+
+    ALLOW = "allow"
+    REPORT = "report"
+    REJECT = "reject"
+
+
 class EntryBase(BaseModel):
     """Base entry schema."""
 
@@ -212,6 +221,11 @@ class EntryResponse(EntryBase):
 
     id: int
     owner_id: int
+    link_title: Optional[str] = None
+    link_description: Optional[str] = None
+    link_image: Optional[str] = None
+    reading_time_minutes: Optional[int] = None
+    enriched_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -225,3 +239,18 @@ class EntryListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+
+
+class DuplicateGroup(BaseModel):
+    """Group of entries with near-identical titles."""
+
+    entry_ids: list[int]
+    titles: list[str]
+    similarity: float
+
+
+class DuplicateGroupListResponse(BaseModel):
+    """Near-duplicate title groups response schema."""
+
+    groups: list[DuplicateGroup]
+    total: int
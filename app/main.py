@@ -1,16 +1,24 @@
 """Main FastAPI application."""
 
 import logging
+import secrets
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.adapters.database import close_db, init_db
-from app.api.v1 import auth, entries
+from app.api.v1 import admin, auth, entries, uploads
 from app.core.config import settings
-from app.core.logging import add_request_id, setup_logging
+from app.core.logging import add_request_id, setup_logging, start_logging, stop_logging
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from app.core.metrics import registry
+from app.core.tracing import span_exporter
+from app.services.link_checker import link_checker
+from app.services.link_enrichment import link_enricher
+from app.services.thumbnails import thumbnail_generator
 
 # Setup logging
 setup_logging()
@@ -78,6 +86,7 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
                 "details": None,
             }
         },
+        headers=exc.headers,
     )
 
 
@@ -100,8 +109,17 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
 @app.on_event("startup")
 async def startup_event() -> None:
     """Initialize application on startup."""
+    start_logging()
     logger.info("Starting application...")
+    if settings.tracing_enabled:
+        span_exporter.start()
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
     await init_db()
+    if settings.link_enrichment_enabled:
+        await link_enricher.start()
+    if settings.thumbnails_enabled:
+        thumbnail_generator.start()
     logger.info("Application started successfully")
 
 
@@ -109,8 +127,14 @@ async def startup_event() -> None:
 async def shutdown_event() -> None:
     """Cleanup on shutdown."""
     logger.info("Shutting down application...")
+    await link_checker.stop()
+    await link_enricher.stop()
+    await thumbnail_generator.stop()
     await close_db()
+    await loop_monitor.stop()
+    span_exporter.stop()
     logger.info("Application shut down successfully")
+    stop_logging()
 
 
 @app.get("/health")
@@ -123,6 +147,29 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request) -> Response:
+    """
+    Metrics endpoint in the Prometheus text format.
+
+    Disabled unless ``metrics_enabled`` is set; when ``metrics_token`` is
+    configured the scraper must send it as a bearer token.
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.metrics_token:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(
+            credentials.encode(), settings.metrics_token.encode()
+        ):
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid metrics token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/")
 async def root() -> dict[str, str]:
     """
@@ -140,3 +187,5 @@ async def root() -> dict[str, str]:
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(entries.router, prefix="/api/v1")
+app.include_router(uploads.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
@@ -4,10 +4,13 @@ import logging
 from typing import Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.models import Entry, User
+from app.core.links import link_hash
+from app.core.minhash import find_duplicate_groups, title_signature
+from app.core.tracing import traced
+from app.domain.models import Entry, LinkEnrichmentJob, User
 from app.domain.schemas import EntryCreate, EntryUpdate
 
 logger = logging.getLogger(__name__)
@@ -20,12 +23,16 @@ class EntryService:
         """Initialize entry service."""
         self.db = db
 
+    @traced()
     async def create_entry(self, entry_data: EntryCreate, owner: User) -> Entry:
         """Create a new entry."""
+        link = str(entry_data.link) if entry_data.link else None
         entry = Entry(
             title=entry_data.title,
             kind=(entry_data.kind.value if hasattr(entry_data.kind, "value") else entry_data.kind),
-            link=str(entry_data.link) if entry_data.link else None,
+            link=link,
+            link_hash=link_hash(link),
+            title_minhash=title_signature(entry_data.title),
             status=(
                 entry_data.status.value
                 if hasattr(entry_data.status, "value")
@@ -39,9 +46,87 @@ class EntryService:
         await self.db.flush()
         await self.db.refresh(entry)
 
+        if entry.link:
+            self.db.add(LinkEnrichmentJob(entry_id=entry.id, url=entry.link))
+            await self.db.flush()
+
         logger.info(f"Entry created: {entry.title} (ID: {entry.id}) by user {owner.id}")
         return entry
 
+    @traced()
+    async def find_duplicate_link(self, owner: User, link: Optional[str]) -> Optional[int]:
+        """Return the ID of an owner's entry with the same canonical link, if any."""
+        digest = link_hash(link)
+        if digest is None:
+            return None
+
+        result = await self.db.execute(
+            select(Entry.id)
+            .where(Entry.owner_id == owner.id, Entry.link_hash == digest)
+            .order_by(Entry.id)
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @traced()
+    async def backfill_link_hashes(self, after_id: int = 0, batch_size: int = 1000) -> int:
+        """
+        Fill link_hash for one batch of entries with ID greater than after_id.
+
+        Returns the last processed ID, or 0 when no rows are left.
+        """
+        result = await self.db.execute(
+            select(Entry.id, Entry.link)
+            .where(Entry.id > after_id, Entry.link.is_not(None), Entry.link_hash.is_(None))
+            .order_by(Entry.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+
+        await self.db.execute(
+            update(Entry),
+            [{"id": entry_id, "link_hash": link_hash(link)} for entry_id, link in rows],
+        )
+        return rows[-1][0]
+
+    @traced()
+    async def find_title_duplicates(
+        self, owner: User, threshold: float = 0.5
+    ) -> list[tuple[list[int], list[str], float]]:
+        """
+        Group the owner's entries whose titles are near-duplicates.
+
+        Signatures missing on older rows are computed and stored on the fly.
+        Returns (entry IDs, titles, similarity) per group.
+        """
+        result = await self.db.execute(
+            select(Entry.id, Entry.title, Entry.title_minhash)
+            .where(Entry.owner_id == owner.id)
+            .order_by(Entry.id)
+        )
+        rows = result.all()
+
+        titles = {entry_id: title for entry_id, title, _ in rows}
+        signatures = [signature for _, _, signature in rows]
+        missing = [
+            {"id": entry_id, "title_minhash": title_signature(title)}
+            for entry_id, title, signature in rows
+            if signature is None
+        ]
+        if missing:
+            await self.db.execute(update(Entry), missing)
+            computed = iter(item["title_minhash"] for item in missing)
+            signatures = [signature or next(computed) for signature in signatures]
+
+        groups = find_duplicate_groups(titles.keys(), signatures, threshold)
+        return [
+            (entry_ids, [titles[entry_id] for entry_id in entry_ids], similarity)
+            for entry_ids, similarity in groups
+        ]
+
+    @traced()
     async def get_entry(self, entry_id: int, user: User) -> Entry:
         """Get an entry by ID."""
         result = await self.db.execute(select(Entry).where(Entry.id == entry_id))
@@ -62,6 +147,7 @@ class EntryService:
 
         return entry
 
+    @traced()
     async def list_entries(
         self,
         user: User,
@@ -96,10 +182,14 @@ class EntryService:
 
         return entries, total
 
+    @traced()
     async def update_entry(self, entry_id: int, entry_data: EntryUpdate, user: User) -> Entry:
         """Update an entry."""
         entry = await self.get_entry(entry_id, user)
 
+        previous_link = entry.link
+        previous_title = entry.title
+
         # Update fields if provided
         update_data = entry_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -110,17 +200,34 @@ class EntryService:
                     value = str(value)
                 setattr(entry, field, value)
 
+        if entry.title != previous_title:
+            entry.title_minhash = title_signature(entry.title)
+
+        if entry.link != previous_link:
+            entry.link_hash = link_hash(entry.link)
+            # Metadata describes the old link; refetch it for the new one
+            entry.link_title = None
+            entry.link_description = None
+            entry.link_image = None
+            entry.reading_time_minutes = None
+            entry.enriched_at = None
+            self.db.add(LinkEnrichmentJob(entry_id=entry.id, url=entry.link))
+
         await self.db.flush()
         await self.db.refresh(entry)
 
         logger.info(f"Entry updated: {entry.id} by user {user.id}")
         return entry
 
+    @traced()
     async def delete_entry(self, entry_id: int, user: User) -> None:
         """Delete an entry."""
         entry = await self.get_entry(entry_id, user)
 
         await self.db.delete(entry)
+        await self.db.execute(
+            delete(LinkEnrichmentJob).where(LinkEnrichmentJob.entry_id == entry_id)
+        )
         await self.db.flush()
 
         logger.info(f"Entry deleted: {entry_id} by user {user.id}")
@@ -0,0 +1,239 @@
+"""Batch liveness checking for links stored on entries."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Optional
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.database import AsyncSessionLocal
+from app.core.http_client import SecureHTTPClient, original_url
+from app.domain.models import Entry, LinkCheck
+
+logger = logging.getLogger(__name__)
+
+# Servers that reject HEAD outright are retried with GET
+_HEAD_UNSUPPORTED = {403, 405, 501}
+
+ProgressHook = Callable[[dict[str, Any]], None]
+
+
+class LinkChecker:
+    """
+    Scan entry links in keyset-ordered chunks and record their liveness.
+
+    Each distinct URL is checked at most once per run, with bounded
+    concurrency. URLs checked within ``recheck_after`` are skipped.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        http_client: Optional[SecureHTTPClient] = None,
+        concurrency: int = 20,
+        chunk_size: int = 500,
+        recheck_after: timedelta = timedelta(hours=24),
+        progress_hook: Optional[ProgressHook] = None,
+    ):
+        """
+        Initialize link checker.
+
+        Args:
+            session_factory: Factory for database sessions
+            http_client: Client used for HEAD/GET probes
+            concurrency: Maximum number of simultaneous probes
+            chunk_size: Number of entries read per keyset page
+            recheck_after: Minimum age of a stored result before it is rechecked
+            progress_hook: Callback receiving progress after every chunk
+        """
+        self.session_factory = session_factory
+        self.http_client = http_client or SecureHTTPClient(
+            timeout=15.0, connect_timeout=5.0, max_retries=1, retry_delay=0.5
+        )
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.recheck_after = recheck_after
+        self.progress_hook = progress_hook
+        self.progress: dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a background scan is in progress."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """
+        Start a scan in the background.
+
+        Returns:
+            False if a scan is already running
+        """
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.run())
+        self._task.add_done_callback(self._on_done)
+        return True
+
+    async def stop(self) -> None:
+        """Cancel a running background scan and wait for it to unwind."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """Record a crashed background scan instead of dropping its exception."""
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is None:
+            return
+        logger.error("Link check failed", exc_info=exc)
+        self.progress["running"] = False
+        self.progress["error"] = f"{type(exc).__name__}: {exc}"[:1000]
+
+    async def probe(self, url: str) -> dict[str, Any]:
+        """
+        Check a single URL with HEAD, falling back to GET.
+
+        Args:
+            url: URL to check
+
+        Returns:
+            Dictionary with status_code, is_alive, redirect_target and error
+        """
+        try:
+            try:
+                response = await self.http_client.head(url)
+                if response.status_code in _HEAD_UNSUPPORTED:
+                    response = await self.http_client.get(url)
+            except httpx.HTTPError:
+                response = await self.http_client.get(url)
+        except (httpx.HTTPError, ValueError) as e:
+            return {
+                "status_code": None,
+                "is_alive": False,
+                "redirect_target": None,
+                "error": str(e)[:1000],
+            }
+
+        redirect_target = original_url(response.request) if response.history else None
+        return {
+            "status_code": response.status_code,
+            "is_alive": response.status_code < 400,
+            "redirect_target": redirect_target,
+            "error": None,
+        }
+
+    async def _iter_link_chunks(self) -> AsyncIterator[list[str]]:
+        """Yield entry links page by page, ordered by entry id."""
+        last_id = 0
+        while True:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(Entry.id, Entry.link)
+                    .where(Entry.id > last_id, Entry.link.is_not(None))
+                    .order_by(Entry.id)
+                    .limit(self.chunk_size)
+                )
+                rows = result.all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [link for _, link in rows]
+
+    async def _recently_checked(self, urls: list[str], cutoff: datetime) -> set[str]:
+        """Return URLs from the batch whose stored result is newer than cutoff."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(LinkCheck.url).where(LinkCheck.url.in_(urls), LinkCheck.checked_at >= cutoff)
+            )
+            return set(result.scalars().all())
+
+    async def _store(self, results: dict[str, dict[str, Any]], checked_at: datetime) -> None:
+        """Insert or update stored results for a batch of URLs."""
+        async with self.session_factory() as db:
+            existing = await db.execute(select(LinkCheck).where(LinkCheck.url.in_(results)))
+            rows = {row.url: row for row in existing.scalars().all()}
+            for url, outcome in results.items():
+                row = rows.get(url)
+                if row is None:
+                    row = LinkCheck(url=url)
+                    db.add(row)
+                for field, value in outcome.items():
+                    setattr(row, field, value)
+                row.checked_at = checked_at
+            await db.commit()
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Scan all stored links once.
+
+        Returns:
+            Final progress report
+        """
+        started = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - self.recheck_after
+        semaphore = asyncio.Semaphore(self.concurrency)
+        seen: set[str] = set()
+        self.progress = {
+            "running": True,
+            "checked": 0,
+            "skipped": 0,
+            "alive": 0,
+            "dead": 0,
+            "urls_per_second": 0.0,
+            "error": None,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+        async def bounded_probe(url: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.probe(url)
+
+        try:
+            async for links in self._iter_link_chunks():
+                batch = [url for url in dict.fromkeys(links) if url not in seen]
+                seen.update(batch)
+                if not batch:
+                    continue
+
+                fresh = await self._recently_checked(batch, cutoff)
+                to_check = [url for url in batch if url not in fresh]
+                self.progress["skipped"] += len(fresh)
+
+                if to_check:
+                    outcomes = await asyncio.gather(*(bounded_probe(url) for url in to_check))
+                    results = dict(zip(to_check, outcomes))
+                    await self._store(results, datetime.now(timezone.utc))
+                    alive = sum(1 for outcome in outcomes if outcome["is_alive"])
+                    self.progress["checked"] += len(to_check)
+                    self.progress["alive"] += alive
+                    self.progress["dead"] += len(to_check) - alive
+
+                elapsed = time.monotonic() - started
+                self.progress["urls_per_second"] = round(
+                    self.progress["checked"] / elapsed if elapsed else 0.0, 2
+                )
+                if self.progress_hook is not None:
+                    self.progress_hook(dict(self.progress))
+        finally:
+            self.progress["running"] = False
+            self.progress["elapsed_seconds"] = round(time.monotonic() - started, 3)
+
+        logger.info(
+            f"Link check finished: {self.progress['checked']} checked, "
+            f"{self.progress['skipped']} skipped, {self.progress['dead']} dead "
+            f"({self.progress['urls_per_second']} URLs/s)"
+        )
+        return dict(self.progress)
+
+
+# Global checker used by the admin endpoint
+link_checker = LinkChecker()
@@ -0,0 +1,331 @@
+"""Background link metadata enrichment for reading list entries."""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from typing import Any, Callable, Optional
+from urllib.parse import urljoin, urlparse
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.database import AsyncSessionLocal
+from app.core.config import settings
+from app.core.http_client import SecureHTTPClient
+from app.domain.models import Entry, LinkEnrichmentJob
+
+logger = logging.getLogger(__name__)
+
+WORDS_PER_MINUTE = 200
+MAX_ATTEMPTS = 3
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+
+class _MetadataParser(HTMLParser):
+    """Collect title, description, Open Graph image and visible word count."""
+
+    def __init__(self) -> None:
+        """Initialize parser state."""
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None
+        self.meta: dict[str, str] = {}
+        self.word_count = 0
+        self._in_title = False
+        self._title_parts: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        """Track title/skipped sections and record meta tags."""
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            attributes = {name.lower(): (value or "") for name, value in attrs}
+            key = (attributes.get("property") or attributes.get("name") or "").lower()
+            content = attributes.get("content", "").strip()
+            if key and content and key not in self.meta:
+                self.meta[key] = content
+
+    def handle_endtag(self, tag: str) -> None:
+        """Close title/skipped sections."""
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            if self.title is None:
+                self.title = " ".join("".join(self._title_parts).split())
+
+    def handle_data(self, data: str) -> None:
+        """Accumulate title text and count visible words."""
+        if self._in_title:
+            self._title_parts.append(data)
+        elif not self._skip_depth:
+            self.word_count += len(data.split())
+
+
+def parse_link_metadata(html: str, base_url: str) -> dict[str, Any]:
+    """
+    Extract entry metadata from an HTML document.
+
+    Args:
+        html: Document markup
+        base_url: URL the document was fetched from (for relative image URLs)
+
+    Returns:
+        Dictionary with link_title, link_description, link_image, reading_time_minutes
+    """
+    parser = _MetadataParser()
+    parser.feed(html)
+    parser.close()
+
+    title = parser.meta.get("og:title") or parser.title
+    description = parser.meta.get("og:description") or parser.meta.get("description")
+
+    image = parser.meta.get("og:image") or parser.meta.get("og:image:url")
+    if image:
+        image = urljoin(base_url, image)
+        if urlparse(image).scheme != "https":
+            image = None
+
+    reading_time = None
+    if parser.word_count:
+        reading_time = max(1, math.ceil(parser.word_count / WORDS_PER_MINUTE))
+
+    return {
+        "link_title": title[:500] if title else None,
+        "link_description": description[:5000] if description else None,
+        "link_image": image[:2048] if image else None,
+        "reading_time_minutes": reading_time,
+    }
+
+
+class LinkEnricher:
+    """
+    In-process worker pool that enriches entries with link metadata.
+
+    URLs are queued in a bounded asyncio queue; entries sharing a URL that is
+    already queued or being fetched piggyback on the same fetch. Fetches to one
+    host are spaced by a minimum interval. Every job is also persisted in
+    link_enrichment_jobs, so pending work resumes after a restart.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        http_client: Optional[SecureHTTPClient] = None,
+        workers: int = 4,
+        queue_size: int = 1000,
+        host_interval: float = 1.0,
+    ):
+        """
+        Initialize link enricher.
+
+        Args:
+            session_factory: Factory for database sessions used by workers
+            http_client: Client used to fetch pages
+            workers: Number of concurrent worker tasks
+            queue_size: Maximum number of queued URLs
+            host_interval: Minimum seconds between fetches to the same host
+        """
+        self.session_factory = session_factory
+        self.http_client = http_client or SecureHTTPClient(
+            timeout=10.0,
+            connect_timeout=5.0,
+            max_response_size=2 * 1024 * 1024,
+            max_retries=1,
+        )
+        self.workers = workers
+        self.queue_size = queue_size
+        self.host_interval = host_interval
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._pending: dict[str, set[int]] = {}
+        self._host_next_slot: dict[str, float] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether worker tasks are active."""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start workers and resume jobs persisted by a previous run."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self.resume_pending()))
+        logger.info(f"Link enricher started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel workers; unfinished jobs stay in the database."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        logger.info("Link enricher stopped")
+
+    async def join(self) -> None:
+        """Wait until every queued URL has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def submit(self, entry_id: int, url: str) -> bool:
+        """
+        Queue an entry for enrichment without blocking.
+
+        Args:
+            entry_id: Entry to enrich
+            url: Entry link
+
+        Returns:
+            True if the entry is queued or attached to an in-flight fetch. False
+            means the queue is full or stopped; the persisted job is retried later.
+        """
+        if self._queue is None:
+            return False
+
+        waiting = self._pending.get(url)
+        if waiting is not None:
+            waiting.add(entry_id)
+            return True
+
+        try:
+            self._queue.put_nowait(url)
+        except asyncio.QueueFull:
+            logger.warning("Link enrichment queue full, deferring to next resume")
+            return False
+
+        self._pending[url] = {entry_id}
+        return True
+
+    async def resume_pending(self, batch_size: int = 500) -> int:
+        """
+        Enqueue persisted jobs, blocking on the queue for back-pressure.
+
+        Args:
+            batch_size: Number of job rows loaded per query
+
+        Returns:
+            Number of jobs resumed
+        """
+        resumed = 0
+        last_id = 0
+        while self._queue is not None:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(LinkEnrichmentJob.id, LinkEnrichmentJob.entry_id, LinkEnrichmentJob.url)
+                    .where(LinkEnrichmentJob.id > last_id)
+                    .order_by(LinkEnrichmentJob.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+            if not rows:
+                break
+
+            for job_id, entry_id, url in rows:
+                last_id = job_id
+                waiting = self._pending.get(url)
+                if waiting is not None:
+                    waiting.add(entry_id)
+                else:
+                    self._pending[url] = {entry_id}
+                    await self._queue.put(url)
+                resumed += 1
+
+        if resumed:
+            logger.info(f"Resumed {resumed} pending link enrichment jobs")
+        return resumed
+
+    async def _wait_for_host(self, host: str) -> None:
+        """Sleep until the per-host rate limit allows another fetch."""
+        now = time.monotonic()
+        slot = max(now, self._host_next_slot.get(host, now))
+        self._host_next_slot[host] = slot + self.host_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _worker(self) -> None:
+        """Process queued URLs until cancelled."""
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            url = await queue.get()
+            try:
+                await self._process(url)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Link enrichment worker failed")
+            finally:
+                self._pending.pop(url, None)
+                queue.task_done()
+
+    async def _fetch(self, url: str) -> dict[str, Any]:
+        """Fetch url and parse its metadata."""
+        await self._wait_for_host(urlparse(url).hostname or "")
+        response = await self.http_client.get(url, headers={"Accept": "text/html"})
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type:
+            return {
+                "link_title": None,
+                "link_description": None,
+                "link_image": None,
+                "reading_time_minutes": None,
+            }
+        return parse_link_metadata(response.text, url)
+
+    async def _process(self, url: str) -> None:
+        """Fetch metadata for url and store it on all waiting entries."""
+        try:
+            metadata = await self._fetch(url)
+        except Exception as e:
+            # Late submissions for this URL are included in the same bookkeeping
+            await self._record_failure(set(self._pending.get(url, ())), str(e))
+            return
+
+        entry_ids = set(self._pending.get(url, ()))
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Entry)
+                .where(Entry.id.in_(entry_ids), Entry.link == url)
+                .values(**metadata, enriched_at=datetime.now(timezone.utc))
+            )
+            await db.execute(
+                delete(LinkEnrichmentJob).where(
+                    LinkEnrichmentJob.entry_id.in_(entry_ids), LinkEnrichmentJob.url == url
+                )
+            )
+            await db.commit()
+
+    async def _record_failure(self, entry_ids: set[int], error: str) -> None:
+        """Count a failed attempt and drop jobs that exhausted their retries."""
+        logger.warning(f"Link enrichment failed for entries {sorted(entry_ids)}: {error}")
+        async with self.session_factory() as db:
+            await db.execute(
+                update(LinkEnrichmentJob)
+                .where(LinkEnrichmentJob.entry_id.in_(entry_ids))
+                .values(attempts=LinkEnrichmentJob.attempts + 1, last_error=error[:1000])
+            )
+            await db.execute(
+                delete(LinkEnrichmentJob).where(
+                    LinkEnrichmentJob.entry_id.in_(entry_ids),
+                    LinkEnrichmentJob.attempts >= MAX_ATTEMPTS,
+                )
+            )
+            await db.commit()
+
+
+# Global enricher, started and stopped with the application
+link_enricher = LinkEnricher(
+    workers=settings.link_enrichment_workers,
+    queue_size=settings.link_enrichment_queue_size,
+    host_interval=settings.link_enrichment_host_interval,
+)
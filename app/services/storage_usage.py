@@ -0,0 +1,211 @@
+"""Per-user upload storage accounting and quota enforcement."""
+
+import logging
+import time
+from typing import Any, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import StorageBackend, get_storage
+from app.domain.models import Upload, UploadBlob, User, UserStorageUsage
+
+logger = logging.getLogger(__name__)
+
+
+class StorageUsageService:
+    """
+    Service for per-user storage counters.
+
+    Counters change in the same transaction as the upload rows they describe.
+    Each upload charges its owner the full blob size, even when the blob is
+    shared through deduplication.
+    """
+
+    def __init__(self, db: AsyncSession, quota: Optional[int] = None):
+        """Initialize storage usage service."""
+        self.db = db
+        self.quota = settings.upload_quota_bytes if quota is None else quota
+
+    async def get_usage(self, user_id: int) -> int:
+        """Get the bytes currently charged to a user."""
+        result = await self.db.execute(
+            select(UserStorageUsage.bytes_used).where(UserStorageUsage.user_id == user_id)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def remaining(self, user_id: int) -> Optional[int]:
+        """Get the bytes a user may still store, or None without a quota."""
+        if not self.quota:
+            return None
+        return max(0, self.quota - await self.get_usage(user_id))
+
+    async def charge(self, user_id: int, size: int) -> bool:
+        """
+        Add a file to a user's usage if it fits the quota.
+
+        The quota check and the increment are one conditional UPDATE, so
+        concurrent uploads cannot overshoot the limit together.
+
+        Returns:
+            False if the file would exceed the quota
+        """
+        if self.quota and size > self.quota:
+            return False
+
+        stmt = (
+            update(UserStorageUsage)
+            .where(UserStorageUsage.user_id == user_id)
+            .values(
+                bytes_used=UserStorageUsage.bytes_used + size,
+                file_count=UserStorageUsage.file_count + 1,
+            )
+            .returning(UserStorageUsage.bytes_used)
+        )
+        if self.quota:
+            stmt = stmt.where(UserStorageUsage.bytes_used + size <= self.quota)
+        if (await self.db.execute(stmt)).scalar_one_or_none() is not None:
+            return True
+        if await self.db.get(UserStorageUsage, user_id) is not None:
+            return False
+
+        try:
+            async with self.db.begin_nested():
+                self.db.add(UserStorageUsage(user_id=user_id, bytes_used=size, file_count=1))
+            return True
+        except IntegrityError:
+            # Created by a concurrent upload; charge the existing row
+            return (await self.db.execute(stmt)).scalar_one_or_none() is not None
+
+    async def credit(self, user_id: int, size: int) -> None:
+        """Remove a released file from a user's usage."""
+        await self.db.execute(
+            update(UserStorageUsage)
+            .where(UserStorageUsage.user_id == user_id)
+            .values(
+                bytes_used=UserStorageUsage.bytes_used - size,
+                file_count=UserStorageUsage.file_count - 1,
+            )
+        )
+
+    async def top(self, limit: int = 10) -> list[dict[str, Any]]:
+        """Get the largest consumers, read in order from the bytes_used index."""
+        result = await self.db.execute(
+            select(UserStorageUsage, User.username)
+            .outerjoin(User, User.id == UserStorageUsage.user_id)
+            .where(UserStorageUsage.bytes_used > 0)
+            .order_by(UserStorageUsage.bytes_used.desc())
+            .limit(limit)
+        )
+        return [
+            {
+                "user_id": usage.user_id,
+                "username": username,
+                "bytes_used": usage.bytes_used,
+                "file_count": usage.file_count,
+            }
+            for usage, username in result.all()
+        ]
+
+    async def reconcile(
+        self, storage: Optional[StorageBackend] = None, chunk_size: int = 1000
+    ) -> dict[str, Any]:
+        """
+        Recompute every user's usage from the stored files.
+
+        Each user is reconciled in its own transaction: the usage row is
+        locked with SELECT ... FOR UPDATE before that user's uploads are
+        scanned, and the recomputed totals are written under the same lock.
+        Uploads charge and credit that row before touching their upload rows,
+        so a concurrent upload or delete either finishes before the scan sees
+        the uploads or waits and applies its delta on top of the new total.
+        Commits after every user.
+
+        Uploads are read in keyset-ordered chunks and each chunk's blobs are
+        stat'ed with one batched call (one directory descriptor per shard on
+        local storage). Missing files count as zero bytes.
+
+        Args:
+            storage: Backend holding the blobs (default: configured one)
+            chunk_size: Number of uploads read per chunk
+
+        Returns:
+            Report with users, files, bytes, missing and corrected counts
+        """
+        storage = storage or get_storage()
+        started = time.monotonic()
+        owners = await self.db.execute(select(Upload.owner_id).distinct())
+        counters = await self.db.execute(select(UserStorageUsage.user_id))
+        user_ids = sorted(set(owners.scalars().all()) | set(counters.scalars().all()))
+        await self.db.commit()
+
+        report = {"users": 0, "files": 0, "bytes": 0, "missing": 0, "corrected": 0}
+        for user_id in user_ids:
+            usage = await self._lock_usage(user_id)
+            bytes_used, file_count, missing = await self._scan_user(storage, user_id, chunk_size)
+            if usage.bytes_used != bytes_used or usage.file_count != file_count:
+                usage.bytes_used = bytes_used
+                usage.file_count = file_count
+                report["corrected"] += 1
+            await self.db.commit()
+
+            report["users"] += 1 if file_count else 0
+            report["files"] += file_count
+            report["bytes"] += bytes_used
+            report["missing"] += missing
+
+        report["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        logger.info(
+            f"Storage usage reconciled: {report['users']} users, {report['files']} files, "
+            f"{report['corrected']} corrected, {report['missing']} missing"
+        )
+        return report
+
+    async def _lock_usage(self, user_id: int) -> UserStorageUsage:
+        """Lock a user's usage row for the current transaction, creating it if needed."""
+        stmt = (
+            select(UserStorageUsage)
+            .where(UserStorageUsage.user_id == user_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        usage = (await self.db.execute(stmt)).scalar_one_or_none()
+        if usage is not None:
+            return usage
+        try:
+            async with self.db.begin_nested():
+                usage = UserStorageUsage(user_id=user_id, bytes_used=0, file_count=0)
+                self.db.add(usage)
+            return usage
+        except IntegrityError:
+            # Created by a concurrent upload; lock that row instead
+            return (await self.db.execute(stmt)).scalar_one()
+
+    async def _scan_user(
+        self, storage: StorageBackend, user_id: int, chunk_size: int
+    ) -> tuple[int, int, int]:
+        """Sum the on-disk sizes of a user's uploads; returns (bytes, files, missing)."""
+        bytes_used = file_count = missing = 0
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(Upload.id, UploadBlob.path)
+                .join(UploadBlob, UploadBlob.sha256 == Upload.sha256)
+                .where(Upload.owner_id == user_id, Upload.id > last_id)
+                .order_by(Upload.id)
+                .limit(chunk_size)
+            )
+            rows = result.all()
+            if not rows:
+                return bytes_used, file_count, missing
+            last_id = rows[-1].id
+
+            stats = await storage.stat_many({row.path for row in rows})
+            for row in rows:
+                info = stats.get(row.path)
+                if info is None:
+                    missing += 1
+                bytes_used += info["size"] if info else 0
+                file_count += 1
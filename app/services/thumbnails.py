@@ -0,0 +1,182 @@
+"""Background thumbnail generation for uploaded covers."""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.core.storage import StorageBackend, get_storage
+from app.core.thumbnails import render_thumbnails, thumbnail_key
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailGenerator:
+    """
+    Render thumbnails in a process pool fed by a bounded queue.
+
+    Jobs are keyed by blob digest: a digest that is queued or being rendered
+    is not queued again, and widths whose thumbnail already exists are skipped,
+    so popular covers are rendered once no matter how often they are uploaded.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[StorageBackend] = None,
+        workers: int = 2,
+        queue_size: int = 100,
+        widths: Optional[list[int]] = None,
+        quality: int = 80,
+        executor: Optional[Executor] = None,
+    ):
+        """
+        Initialize thumbnail generator.
+
+        Args:
+            storage: Backend holding originals and thumbnails (default: configured one)
+            workers: Number of worker processes
+            queue_size: Maximum number of queued blobs
+            widths: Thumbnail widths in pixels
+            quality: JPEG quality
+            executor: Executor to render in (default: a spawned process pool)
+        """
+        self._storage = storage
+        self.workers = workers
+        self.queue_size = queue_size
+        self.widths = sorted(widths or [160, 320, 640])
+        self.quality = quality
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: Optional[asyncio.Queue[tuple[str, str]]] = None
+        self._pending: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+        self.rendered = 0
+
+    @property
+    def storage(self) -> StorageBackend:
+        """Storage backend, resolved lazily from settings."""
+        if self._storage is None:
+            self._storage = get_storage()
+        return self._storage
+
+    @property
+    def running(self) -> bool:
+        """Whether worker tasks are active."""
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start the process pool and the tasks feeding it."""
+        if self.running:
+            return
+        if self._executor is None:
+            # Spawned workers do not inherit the event loop or open connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Thumbnail generator started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel queued work and shut the pool down."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        logger.info("Thumbnail generator stopped")
+
+    async def join(self) -> None:
+        """Wait until every queued blob has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def submit(self, digest: str, key: str) -> bool:
+        """
+        Queue a blob without blocking.
+
+        Args:
+            digest: Hex SHA-256 of the blob
+            key: Storage key of the original
+
+        Returns:
+            True if the blob is queued or already pending. False means the queue
+            is full or stopped; the original is served until a later submit.
+        """
+        if self._queue is None:
+            return False
+        if digest in self._pending:
+            return True
+        try:
+            self._queue.put_nowait((digest, key))
+        except asyncio.QueueFull:
+            logger.warning("Thumbnail queue full, skipping blob for now")
+            return False
+        self._pending.add(digest)
+        return True
+
+    async def enqueue(self, digest: str, key: str) -> None:
+        """Queue a blob, waiting for room in the queue (back-pressure for bulk jobs)."""
+        if self._queue is None:
+            raise RuntimeError("Thumbnail generator is not running")
+        if digest in self._pending:
+            return
+        self._pending.add(digest)
+        await self._queue.put((digest, key))
+
+    async def _worker(self) -> None:
+        """Process queued blobs until cancelled."""
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            digest, key = await queue.get()
+            try:
+                await self._process(digest, key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Thumbnail generation failed for blob {digest[:12]}: {e}")
+            finally:
+                self._pending.discard(digest)
+                queue.task_done()
+
+    async def _process(self, digest: str, key: str) -> None:
+        """Render the missing thumbnails of one blob and store them."""
+        keys = {width: thumbnail_key(digest, width) for width in self.widths}
+        existing = await self.storage.stat_many(keys.values())
+        missing = [width for width, thumb_key in keys.items() if existing[thumb_key] is None]
+        if not missing:
+            return
+
+        source = self.storage.local_path(key)
+        if source is None:
+            logger.debug(f"No local copy of blob {digest[:12]}, thumbnails skipped")
+            return
+
+        rendered = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            render_thumbnails,
+            str(source),
+            self.storage.staging_dir,
+            missing,
+            self.quality,
+        )
+        for width, temp_path in rendered.items():
+            await self.storage.put_file(keys[width], Path(temp_path), overwrite=True)
+        self.rendered += len(rendered)
+
+
+# Global generator, started and stopped with the application
+thumbnail_generator = ThumbnailGenerator(
+    workers=settings.thumbnail_workers,
+    queue_size=settings.thumbnail_queue_size,
+    widths=settings.thumbnail_widths,
+    quality=settings.thumbnail_quality,
+)
@@ -0,0 +1,209 @@
+"""Garbage collection of orphaned files in the local upload tree."""
+
+import asyncio
+import logging
+import re
+import time
+from datetime import timedelta
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.database import AsyncSessionLocal
+from app.core.config import settings
+from app.core.upload import iter_upload_files, remove_if_unchanged
+from app.domain.models import UploadBlob
+
+logger = logging.getLogger(__name__)
+
+# Originals are "<sha256><ext>", thumbnails "<sha256>.w<width>.jpg"
+_BLOB_NAME = re.compile(r"^([0-9a-f]{64})(?:\.w\d+)?\.[a-z]+$")
+_TEMP_SUFFIX = ".tmp"
+
+ProgressHook = Callable[[dict[str, Any]], None]
+
+
+def blob_digest(name: str) -> Optional[str]:
+    """
+    Get the blob digest a stored file belongs to.
+
+    Args:
+        name: File name of an original or a thumbnail
+
+    Returns:
+        Hex SHA-256, or None for files outside the content-addressed layout
+        (such as UUID-named files written by secure_save)
+    """
+    match = _BLOB_NAME.match(name)
+    return match.group(1) if match else None
+
+
+class UploadGarbageCollector:
+    """
+    Remove upload files that no blob references, and stale temporary files.
+
+    The tree is scanned with os.scandir in batches; each batch costs one
+    ``IN`` query against upload_blobs instead of one lookup per file. Files
+    younger than the grace period are never touched, which covers uploads
+    whose blob row is not committed yet. Right before each unlink the blob
+    row and the file's mtime are checked again, so a reference committed or
+    a file rewritten after the batch query keeps its file.
+    """
+
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        grace_period: timedelta = timedelta(hours=24),
+        temp_grace_period: timedelta = timedelta(hours=1),
+        batch_size: int = 1000,
+        max_files_per_second: float = 5000.0,
+        dry_run: bool = False,
+        progress_hook: Optional[ProgressHook] = None,
+    ):
+        """
+        Initialize garbage collector.
+
+        Args:
+            base_dir: Root of the local upload tree (default: settings.upload_dir)
+            session_factory: Factory for database sessions
+            grace_period: Minimum age of an unreferenced file before it is removed
+            temp_grace_period: Minimum age of a ``.tmp`` file before it is removed
+            batch_size: Number of files scanned and checked per batch
+            max_files_per_second: Scan rate limit, so serving I/O is not starved
+                (0 disables the limit)
+            dry_run: Report what would be removed without deleting anything
+            progress_hook: Callback receiving progress after every batch
+        """
+        self.base_dir = base_dir or settings.upload_dir
+        self.session_factory = session_factory
+        self.grace_period = grace_period
+        self.temp_grace_period = temp_grace_period
+        self.batch_size = batch_size
+        self.max_files_per_second = max_files_per_second
+        self.dry_run = dry_run
+        self.progress_hook = progress_hook
+        self.progress: dict[str, Any] = {}
+
+    async def _referenced(self, digests: set[str]) -> set[str]:
+        """Return the digests of the batch that have a blob row."""
+        if not digests:
+            return set()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(UploadBlob.sha256).where(UploadBlob.sha256.in_(digests))
+            )
+            return set(result.scalars().all())
+
+    async def _next_batch(self, batches: Iterator[list[dict]]) -> Optional[list[dict]]:
+        """Advance the directory scan in a worker thread."""
+        return await asyncio.get_running_loop().run_in_executor(None, next, batches, None)
+
+    async def collect_batch(self, files: list[dict], now: float) -> list[dict]:
+        """
+        Pick the removable files of one scanned batch.
+
+        Args:
+            files: Scanned files (key, path, size, modified)
+            now: Current time as a Unix timestamp
+
+        Returns:
+            Files that are orphaned or stale temporary files past their grace period
+        """
+        orphan_cutoff = now - self.grace_period.total_seconds()
+        temp_cutoff = now - self.temp_grace_period.total_seconds()
+
+        candidates: list[tuple[dict, Optional[str]]] = []
+        for item in files:
+            name = item["key"].rsplit("/", 1)[-1]
+            if name.endswith(_TEMP_SUFFIX):
+                if item["modified"] < temp_cutoff:
+                    candidates.append((item, None))
+            elif item["modified"] < orphan_cutoff:
+                candidates.append((item, blob_digest(name)))
+
+        referenced = await self._referenced({digest for _, digest in candidates if digest})
+        return [item for item, digest in candidates if digest is None or digest not in referenced]
+
+    async def delete_orphans(self, orphans: list[dict]) -> list[dict]:
+        """
+        Delete orphans that are still unreferenced and unchanged.
+
+        Args:
+            orphans: Files picked by collect_batch
+
+        Returns:
+            Files that were deleted
+        """
+        loop = asyncio.get_running_loop()
+        deleted = []
+        async with self.session_factory() as db:
+            for item in orphans:
+                digest = blob_digest(item["key"].rsplit("/", 1)[-1])
+                if digest is not None:
+                    referenced = await db.scalar(
+                        select(UploadBlob.sha256).where(UploadBlob.sha256 == digest)
+                    )
+                    # End the read so the next check sees newly committed rows
+                    await db.rollback()
+                    if referenced is not None:
+                        continue
+                if await loop.run_in_executor(
+                    None, remove_if_unchanged, item["path"], item["modified"]
+                ):
+                    deleted.append(item)
+        return deleted
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Scan the upload tree once and remove orphans.
+
+        Returns:
+            Final progress report with files and bytes reclaimed
+        """
+        started = time.monotonic()
+        self.progress = {
+            "running": True,
+            "scanned": 0,
+            "orphans": 0,
+            "deleted": 0,
+            "bytes_reclaimed": 0,
+            "dry_run": self.dry_run,
+        }
+        batches = iter_upload_files(self.base_dir, self.batch_size)
+
+        try:
+            while (files := await self._next_batch(batches)) is not None:
+                batch_started = time.monotonic()
+                orphans = await self.collect_batch(files, time.time())
+                self.progress["scanned"] += len(files)
+                self.progress["orphans"] += len(orphans)
+
+                if orphans and not self.dry_run:
+                    deleted = await self.delete_orphans(orphans)
+                    self.progress["deleted"] += len(deleted)
+                    self.progress["bytes_reclaimed"] += sum(item["size"] for item in deleted)
+                elif self.dry_run:
+                    self.progress["bytes_reclaimed"] += sum(item["size"] for item in orphans)
+
+                if self.progress_hook is not None:
+                    self.progress_hook(dict(self.progress))
+
+                # Spread the scan out instead of saturating the disk
+                if self.max_files_per_second > 0:
+                    budget = len(files) / self.max_files_per_second
+                    remaining = budget - (time.monotonic() - batch_started)
+                    if remaining > 0:
+                        await asyncio.sleep(remaining)
+        finally:
+            batches.close()
+            self.progress["running"] = False
+            self.progress["elapsed_seconds"] = round(time.monotonic() - started, 3)
+
+        logger.info(
+            f"Upload GC finished: {self.progress['scanned']} scanned, "
+            f"{self.progress['orphans']} orphaned, {self.progress['deleted']} deleted, "
+            f"{self.progress['bytes_reclaimed']} bytes reclaimed"
+        )
+        return dict(self.progress)
@@ -0,0 +1,323 @@
+"""Upload service for content-addressed, reference-counted file storage."""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterable, Optional
+
+import httpx
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import StorageBackend, get_storage
+from app.core.thumbnails import thumbnail_key
+from app.core.upload import MAX_FILE_SIZE, inspect_file, receive_stream, shard_key
+from app.domain.models import Upload, UploadBlob, User
+from app.services.storage_usage import StorageUsageService
+from app.services.thumbnails import ThumbnailGenerator, thumbnail_generator
+
+logger = logging.getLogger(__name__)
+
+# Rejection reasons from receive_stream that map to a specific status code
+_REJECTION_STATUS = {
+    "file_too_large": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    "storage_quota_exceeded": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    "invalid_file_type": status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+}
+
+# Bounds concurrent batch validation, and with it memory (one chunk per worker)
+_validation_executor = ThreadPoolExecutor(
+    max_workers=settings.upload_validation_concurrency, thread_name_prefix="upload-validate"
+)
+
+
+class UploadService:
+    """
+    Service for upload operations.
+
+    Files are stored once per distinct SHA-256 in upload_blobs; every upload
+    row references a blob and bumps its ref_count. Blob rows are locked by the
+    ref_count update, so a release that drops the last reference and a
+    concurrent store of the same content are serialized by the database.
+    Each upload is charged to its owner's storage quota before the blob is
+    written.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        storage: Optional[StorageBackend] = None,
+        thumbnails: Optional[ThumbnailGenerator] = None,
+        validation_executor: Optional[Executor] = None,
+    ):
+        """Initialize upload service."""
+        self.db = db
+        self.storage = storage or get_storage()
+        self.thumbnails = thumbnails or thumbnail_generator
+        self.validation_executor = validation_executor or _validation_executor
+        self.usage = StorageUsageService(db)
+
+    async def store(
+        self,
+        owner: User,
+        filename_hint: str,
+        chunks: AsyncIterable[bytes],
+        max_size: int = MAX_FILE_SIZE,
+    ) -> Upload:
+        """Validate, hash and store an upload stream, reusing an identical blob."""
+        # Stop reading once the stream cannot fit the remaining quota
+        remaining = await self.usage.remaining(owner.id)
+        quota_bound = remaining is not None and remaining < max_size
+        if quota_bound:
+            if remaining == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="storage_quota_exceeded",
+                )
+            max_size = remaining
+
+        success, reason, info = await receive_stream(self.storage.staging_dir, chunks, max_size)
+        if not success:
+            if quota_bound and reason == "file_too_large":
+                reason = "storage_quota_exceeded"
+            logger.warning(f"Upload rejected for user {owner.id} ({filename_hint!r}): {reason}")
+            raise HTTPException(
+                status_code=_REJECTION_STATUS.get(reason, status.HTTP_400_BAD_REQUEST),
+                detail=reason,
+            )
+
+        upload, ref_count = await self._commit(owner, info)
+
+        # Deduplicated by digest; existing thumbnails are not rendered again
+        self.thumbnails.submit(info["sha256"], info["key"])
+
+        logger.info(
+            f"Upload stored: {upload.id} by user {owner.id} "
+            f"(blob {info['sha256'][:12]}, refs {ref_count})"
+        )
+        return upload
+
+    async def store_batch(
+        self, owner: User, parts: list[dict], max_size: int = MAX_FILE_SIZE
+    ) -> tuple[bool, list[dict]]:
+        """
+        Validate spooled files concurrently, then store all of them or none.
+
+        Validation runs on a bounded thread pool, one chunk in memory per
+        worker. Any rejected file rolls back the whole batch; blob files
+        already placed for it are left to the upload GC, since a concurrent
+        upload of the same content may reference them by then.
+
+        Args:
+            owner: Uploading user
+            parts: Spooled parts from spool_multipart (filename, temp_path, error)
+            max_size: Maximum size of one file in bytes
+
+        Returns:
+            Tuple of (stored, results) with one result per part, in order
+        """
+        loop = asyncio.get_running_loop()
+        results = [
+            {"filename": part["filename"], "status": "rejected", "error": part["error"]}
+            for part in parts
+        ]
+        infos: list[dict] = []
+        try:
+            pending = [index for index, part in enumerate(parts) if part["error"] is None]
+            outcomes = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        self.validation_executor, inspect_file, parts[index]["temp_path"], max_size
+                    )
+                    for index in pending
+                )
+            )
+            for index, (success, reason, info) in zip(pending, outcomes):
+                if not success:
+                    results[index]["error"] = reason
+                    continue
+                infos.append(info)
+                results[index].update(
+                    status="valid",
+                    sha256=info["sha256"],
+                    size=info["size"],
+                    content_type=info["content_type"],
+                )
+
+            remaining = await self.usage.remaining(owner.id)
+            if remaining is not None and sum(info["size"] for info in infos) > remaining:
+                for result in results:
+                    result.update(status="rejected", error="storage_quota_exceeded")
+
+            if any(result["error"] for result in results):
+                for result in results:
+                    if result["status"] == "valid":
+                        result["status"] = "rolled_back"
+                logger.warning(
+                    f"Upload batch rejected for user {owner.id}: "
+                    f"{[result['error'] for result in results if result['error']]}"
+                )
+                return False, results
+
+            async with self.db.begin_nested():
+                stored = [await self._commit(owner, info) for info in infos]
+        finally:
+            for part in parts:
+                if part["temp_path"] is not None:
+                    part["temp_path"].unlink(missing_ok=True)
+
+        for result, info, (upload, _) in zip(results, infos, stored):
+            result.update(status="stored", upload_id=upload.id)
+            self.thumbnails.submit(info["sha256"], info["key"])
+
+        logger.info(f"Upload batch stored: {len(stored)} files by user {owner.id}")
+        return True, results
+
+    async def _commit(self, owner: User, info: dict) -> tuple[Upload, int]:
+        """Charge, reference and place a validated file, returning its upload and ref_count."""
+        temp_path = info["temp_path"]
+        info["key"] = shard_key(f"{info['sha256']}{info['extension']}")
+        try:
+            if not await self.usage.charge(owner.id, info["size"]):
+                # A concurrent upload used up the room seen before streaming
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="storage_quota_exceeded",
+                )
+            ref_count = await self._acquire_blob(info)
+            # A new blob row means no live reference protects an existing file
+            # (it may belong to a release in flight), so it is rewritten.
+            await self.storage.put_file(info["key"], temp_path, overwrite=ref_count == 1)
+        except (OSError, httpx.HTTPError) as e:
+            logger.error(f"Failed to store blob {info['sha256']}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to store upload",
+            )
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+        upload = Upload(owner_id=owner.id, sha256=info["sha256"])
+        self.db.add(upload)
+        await self.db.flush()
+        await self.db.refresh(upload)
+        return upload, ref_count
+
+    async def _increment_blob(self, digest: str) -> Optional[int]:
+        """Add a reference to an existing blob and return its new ref_count."""
+        result = await self.db.execute(
+            update(UploadBlob)
+            .where(UploadBlob.sha256 == digest)
+            .values(ref_count=UploadBlob.ref_count + 1)
+            .returning(UploadBlob.ref_count)
+        )
+        return result.scalar_one_or_none()
+
+    async def _acquire_blob(self, info: dict) -> int:
+        """Reference the blob for info, creating its row on first use."""
+        ref_count = await self._increment_blob(info["sha256"])
+        if ref_count is not None:
+            return ref_count
+
+        try:
+            async with self.db.begin_nested():
+                self.db.add(
+                    UploadBlob(
+                        sha256=info["sha256"],
+                        path=info["key"],
+                        size=info["size"],
+                        content_type=info["content_type"],
+                        ref_count=1,
+                    )
+                )
+            return 1
+        except IntegrityError:
+            # Another request created the row first; reference it instead
+            ref_count = await self._increment_blob(info["sha256"])
+            if ref_count is None:
+                raise
+            return ref_count
+
+    async def get_upload(self, upload_id: int, user: User) -> Upload:
+        """Get an upload by ID."""
+        result = await self.db.execute(select(Upload).where(Upload.id == upload_id))
+        upload = result.scalar_one_or_none()
+
+        if not upload:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found",
+            )
+
+        # Check ownership or admin
+        if upload.owner_id != user.id and user.role != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions to access this upload",
+            )
+
+        return upload
+
+    async def get_blob(self, digest: str) -> UploadBlob:
+        """Get the stored blob for a digest."""
+        blob = await self.db.get(UploadBlob, digest)
+        if not blob:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Upload not found",
+            )
+        return blob
+
+    async def release(self, upload_id: int, user: User) -> list[str]:
+        """
+        Delete an upload and drop its blob row when no references remain.
+
+        Files are not touched here: the caller deletes the returned keys once
+        the transaction has committed, so a rollback never leaves a blob row
+        pointing at a removed file. Keys missed that way are reclaimed by the
+        upload GC.
+
+        Returns:
+            Storage keys of the blob and its thumbnails if this was the last
+            reference, otherwise an empty list
+        """
+        upload = await self.get_upload(upload_id, user)
+        digest = upload.sha256
+
+        await self.db.delete(upload)
+        result = await self.db.execute(
+            update(UploadBlob)
+            .where(UploadBlob.sha256 == digest)
+            .values(ref_count=UploadBlob.ref_count - 1)
+            .returning(UploadBlob.ref_count, UploadBlob.path, UploadBlob.size)
+        )
+        row = result.one_or_none()
+        if row is not None:
+            await self.usage.credit(upload.owner_id, row.size)
+
+        keys: list[str] = []
+        if row is not None and row.ref_count <= 0:
+            deleted = await self.db.execute(
+                delete(UploadBlob).where(UploadBlob.sha256 == digest, UploadBlob.ref_count <= 0)
+            )
+            if deleted.rowcount:
+                keys = [row.path, *(thumbnail_key(digest, w) for w in self.thumbnails.widths)]
+
+        await self.db.flush()
+        logger.info(f"Upload deleted: {upload_id} by user {user.id}")
+        return keys
+
+    async def delete_files(self, keys: list[str]) -> None:
+        """Remove the files of a released blob; call only after the release committed."""
+        if not keys:
+            return
+        try:
+            await self.storage.delete_many(keys)
+        except (OSError, httpx.HTTPError) as e:
+            # The blob row is gone, so the upload GC reclaims the files later
+            logger.error(f"Failed to delete released blob files {keys[0]}: {e}")
+            return
+        logger.info(f"Blob removed: {keys[0]}")
@@ -8,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_password_hash, verify_password
+from app.core.tracing import traced
 from app.domain.models import User
 from app.domain.schemas import UserCreate
 
@@ -21,21 +22,25 @@ class UserService:
         """Initialize user service."""
         self.db = db
 
+    @traced()
     async def get_by_id(self, user_id: int) -> Optional[User]:
         """Get user by ID."""
         result = await self.db.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
 
+    @traced()
     async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email."""
         result = await self.db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
+    @traced()
     async def get_by_username(self, username: str) -> Optional[User]:
         """Get user by username."""
         result = await self.db.execute(select(User).where(User.username == username))
         return result.scalar_one_or_none()
 
+    @traced()
     async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user."""
         # Check if user already exists
@@ -68,6 +73,7 @@ class UserService:
         logger.info(f"User created: {user.username} (ID: {user.id})")
         return user
 
+    @traced()
     async def authenticate(self, username: str, password: str) -> Optional[User]:
         """Authenticate a user."""
         user = await self.get_by_username(username)
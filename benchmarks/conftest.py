@@ -0,0 +1,48 @@
+"""
+Microbenchmarks of hot functions, run with pytest-benchmark.
+
+Run them separately from the tests, offline:
+
+    pytest benchmarks --benchmark-only --benchmark-json=benchmark.json
+
+Compare against a saved baseline and fail on regressions:
+
+    pytest benchmarks --benchmark-only --benchmark-autosave
+    pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=min:20%
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.models import Entry
+
+
+def make_entries(count: int) -> list[Entry]:
+    """Unsaved entries with every column the response schema reads filled in."""
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        Entry(
+            id=index,
+            title=f"Entry number {index}",
+            kind="article" if index % 2 else "book",
+            link=f"https://example.com/articles/{index}",
+            status="to_read",
+            description="A reasonably short description of the entry." if index % 3 else None,
+            owner_id=index % 50 + 1,
+            link_title=f"Article {index}",
+            link_description=None,
+            link_image=None,
+            reading_time_minutes=index % 30,
+            enriched_at=now if index % 2 else None,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+@pytest.fixture(params=[100, 1_000, 10_000], ids=lambda count: f"{count}rows")
+def entry_rows(request) -> list[Entry]:
+    """Entries as loaded from the database, in three page sizes."""
+    return make_entries(request.param)
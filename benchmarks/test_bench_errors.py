@@ -0,0 +1,32 @@
+"""Benchmarks of error response building and sensitive data masking."""
+
+import pytest
+
+from app.core.errors import mask_sensitive_data, problem
+
+SHORT_MESSAGE = "Entry not found"
+SENSITIVE_MESSAGE = (
+    "Login failed for user@example.com with password=hunter2 and api_key=abc123; "
+    "card 4111 1111 1111 1111, callback 555-123-4567. "
+) * 10
+
+
+@pytest.mark.benchmark(group="mask")
+@pytest.mark.parametrize("message", [SHORT_MESSAGE, SENSITIVE_MESSAGE], ids=["short", "sensitive"])
+def test_mask_sensitive_data(benchmark, message):
+    """Mask a plain message and a long one full of secrets."""
+    masked = benchmark(mask_sensitive_data, message)
+    assert "hunter2" not in masked
+
+
+@pytest.mark.benchmark(group="problem")
+def test_problem(benchmark):
+    """Build an RFC 7807 response with extras."""
+    response = benchmark(
+        problem,
+        404,
+        "Not Found",
+        SENSITIVE_MESSAGE,
+        extras={"resource": "entry", "contact": "admin@example.com"},
+    )
+    assert response.status_code == 404
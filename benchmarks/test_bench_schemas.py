@@ -0,0 +1,36 @@
+"""Benchmarks of request validation and response serialization of entries."""
+
+import pytest
+
+from app.domain.schemas import EntryCreate, EntryResponse
+
+ENTRY_PAYLOADS = {
+    "no_link": {"title": "Dune", "kind": "book"},
+    "hostname_link": {
+        "title": "Designing Data-Intensive Applications",
+        "kind": "book",
+        "link": "https://dataintensive.net/chapters/replication?utm_source=feed",
+        "status": "in_progress",
+        "description": "Replication, partitioning and consistency.",
+    },
+    "ip_link": {"title": "Status page", "kind": "article", "link": "https://93.184.216.34/"},
+}
+
+
+@pytest.mark.benchmark(group="entry-create")
+@pytest.mark.parametrize("payload", list(ENTRY_PAYLOADS))
+def test_entry_create_validation(benchmark, payload):
+    """Validate an entry creation body, including the link policy."""
+    entry = benchmark(EntryCreate.model_validate, ENTRY_PAYLOADS[payload])
+    assert entry.title
+
+
+@pytest.mark.benchmark(group="entry-response")
+def test_entry_response_from_rows(benchmark, entry_rows):
+    """Serialize a page of ORM rows as the list endpoint does."""
+
+    def serialize():
+        return [EntryResponse.model_validate(row).model_dump(mode="json") for row in entry_rows]
+
+    items = benchmark(serialize)
+    assert len(items) == len(entry_rows)
@@ -0,0 +1,30 @@
+"""Benchmarks of token and password handling done on every authenticated request."""
+
+import pytest
+
+from app.core.security import create_access_token, decode_token, get_password_hash, verify_password
+
+PASSWORD = "Secur3Pass!45"
+
+
+@pytest.mark.benchmark(group="jwt")
+def test_create_access_token(benchmark):
+    """Sign an access token."""
+    token = benchmark(create_access_token, {"sub": "42"})
+    assert token.count(".") == 2
+
+
+@pytest.mark.benchmark(group="jwt")
+def test_decode_token(benchmark):
+    """Verify and decode an access token."""
+    token = create_access_token({"sub": "42"})
+    payload = benchmark(decode_token, token)
+    assert payload["sub"] == "42"
+
+
+@pytest.mark.benchmark(group="password")
+def test_verify_password(benchmark):
+    """Check a password against its bcrypt hash; slow by design, so few rounds."""
+    hashed = get_password_hash(PASSWORD)
+    result = benchmark.pedantic(verify_password, args=(PASSWORD, hashed), rounds=5, iterations=1)
+    assert result is True
@@ -0,0 +1,20 @@
+"""Benchmarks of upload content sniffing."""
+
+import pytest
+
+from app.core.upload import JPEG_EOI, JPEG_SOI, PNG_MAGIC, sniff_image_type
+
+PAYLOAD_SIZE = 5 * 1024 * 1024
+SAMPLES = {
+    "png": PNG_MAGIC + b"\x00" * PAYLOAD_SIZE,
+    "jpeg": JPEG_SOI + b"\x00" * PAYLOAD_SIZE + JPEG_EOI,
+    "unknown": b"GIF89a" + b"\x00" * PAYLOAD_SIZE,
+}
+EXPECTED = {"png": "image/png", "jpeg": "image/jpeg", "unknown": None}
+
+
+@pytest.mark.benchmark(group="sniff")
+@pytest.mark.parametrize("kind", list(SAMPLES))
+def test_sniff_image_type(benchmark, kind):
+    """Detect the type of a 5 MB upload from its magic bytes."""
+    assert benchmark(sniff_image_type, SAMPLES[kind]) == EXPECTED[kind]
@@ -0,0 +1,35 @@
+"""Fill entries.link_hash for rows created before duplicate detection."""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.adapters.database import AsyncSessionLocal
+from app.services.entry_service import EntryService
+
+
+async def backfill(batch_size: int) -> None:
+    """Backfill link hashes in batches, committing after each batch."""
+    print("Backfilling link hashes...")
+    last_id = 0
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            next_id = await EntryService(db).backfill_link_hashes(last_id, batch_size)
+            await db.commit()
+        if not next_id:
+            break
+        total += 1
+        last_id = next_id
+        print(f"Processed batch {total} (up to entry {last_id})")
+    print("Link hash backfill complete!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows updated per batch")
+    asyncio.run(backfill(parser.parse_args().batch_size))
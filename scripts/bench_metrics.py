@@ -0,0 +1,53 @@
+"""Measure the per-request cost of recording metrics."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.metrics import REQUESTS_IN_FLIGHT, observe_request, registry
+
+BUDGET_US = 5.0
+ROUTES = [
+    ("GET", "/api/v1/entries", 200),
+    ("GET", "/api/v1/entries/{entry_id}", 200),
+    ("POST", "/api/v1/entries", 201),
+    ("GET", "/api/v1/entries/{entry_id}", 404),
+    ("GET", "/api/v1/uploads/{upload_id}", 206),
+]
+
+
+def run(requests: int) -> float:
+    """Record what the middleware records per request; return microseconds per request."""
+    durations = [0.0005 * (index % 4000) for index in range(1000)]
+    started = time.perf_counter()
+    for index in range(requests):
+        method, route, status_code = ROUTES[index % len(ROUTES)]
+        REQUESTS_IN_FLIGHT.inc()
+        REQUESTS_IN_FLIGHT.dec()
+        observe_request(method, route, status_code, durations[index % 1000])
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main(requests: int, repeat: int) -> int:
+    """Run the benchmark and compare the best run against the budget."""
+    best = min(run(requests) for _ in range(repeat))
+    started = time.perf_counter()
+    text = registry.render()
+    render_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{requests} requests x {repeat} runs")
+    print(f"recording: {best:.2f} us/request (budget {BUDGET_US} us)")
+    print(f"render: {render_ms:.2f} ms for {len(text.splitlines())} lines")
+    return 0 if best < BUDGET_US else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200_000, help="Requests per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs")
+    args = parser.parse_args()
+    sys.exit(main(args.requests, args.repeat))
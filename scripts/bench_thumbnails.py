@@ -0,0 +1,74 @@
+"""Measure thumbnail rendering throughput in images per second per core."""
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageFilter
+
+from app.core.config import settings
+from app.core.thumbnails import render_thumbnails
+
+
+def _make_sources(directory: Path, count: int, width: int, height: int) -> list[str]:
+    """Write distinct JPEG covers with photo-like noise."""
+    paths = []
+    for index in range(count):
+        image = Image.effect_noise((width, height), 40 + index % 20).convert("RGB")
+        image = image.filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=90)
+        path = directory / f"source-{index}.jpg"
+        path.write_bytes(buffer.getvalue())
+        paths.append(str(path))
+    return paths
+
+
+def _run(sources: list[str], staging: str, workers: int, widths: list[int]) -> float:
+    """Render every source once and return elapsed seconds."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        # Warm the workers so process start-up is not measured
+        list(pool.map(render_thumbnails, sources[:workers], [staging] * workers, [[]] * workers))
+        started = time.perf_counter()
+        futures = [pool.submit(render_thumbnails, source, staging, widths) for source in sources]
+        for future in futures:
+            for temp_path in future.result().values():
+                os.unlink(temp_path)
+        return time.perf_counter() - started
+
+
+def main(count: int, width: int, height: int, max_workers: int) -> None:
+    """Benchmark rendering with 1..max_workers processes."""
+    widths = settings.thumbnail_widths
+    with tempfile.TemporaryDirectory() as temp_dir:
+        sources = _make_sources(Path(temp_dir), count, width, height)
+        print(f"{count} JPEG sources of {width}x{height}, widths {widths}")
+        print(f"{'workers':>8}{'images/s':>12}{'per core':>12}")
+        workers = 1
+        while workers <= max_workers:
+            elapsed = _run(sources, temp_dir, workers, widths)
+            rate = count / elapsed
+            print(f"{workers:>8}{rate:>12.1f}{rate / workers:>12.1f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=40, help="Number of source images")
+    parser.add_argument("--width", type=int, default=1600, help="Source width")
+    parser.add_argument("--height", type=int, default=2400, help="Source height")
+    parser.add_argument(
+        "--max-workers", type=int, default=os.cpu_count() or 1, help="Largest pool size"
+    )
+    args = parser.parse_args()
+    main(args.count, args.width, args.height, args.max_workers)
@@ -0,0 +1,92 @@
+"""Compare disk usage and throughput of UUID-named and content-addressed uploads."""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.upload import (
+    CHUNK_SIZE,
+    PNG_MAGIC,
+    commit_content_addressed,
+    receive_stream,
+    secure_save_stream,
+)
+
+
+async def _chunks(data: bytes) -> AsyncIterator[bytes]:
+    """Yield data in upload-sized chunks."""
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start : start + CHUNK_SIZE]
+
+
+def _disk_usage(base_dir: str) -> tuple[int, int]:
+    """Return (file count, allocated bytes) below base_dir."""
+    files = 0
+    allocated = 0
+    for root, _, names in os.walk(base_dir):
+        for name in names:
+            files += 1
+            allocated += os.stat(os.path.join(root, name)).st_blocks * 512
+    return files, allocated
+
+
+async def _store_uuid(base_dir: str, data: bytes) -> None:
+    """Store with a fresh UUID name per upload."""
+    success, reason = await secure_save_stream(base_dir, "bench.png", _chunks(data))
+    if not success:
+        raise RuntimeError(reason)
+
+
+async def _store_content_addressed(base_dir: str, data: bytes) -> None:
+    """Store under the SHA-256 of the content, skipping known blobs."""
+    success, reason, info = await receive_stream(base_dir, _chunks(data))
+    if not success:
+        raise RuntimeError(reason)
+    success, reason = commit_content_addressed(
+        base_dir, info["temp_path"], info["sha256"], info["extension"]
+    )
+    if not success:
+        raise RuntimeError(reason)
+
+
+async def run(uploads: int, distinct: int, size: int, seed: int) -> None:
+    """Store the same workload with both layouts and print a comparison."""
+    rng = random.Random(seed)
+    payloads = [PNG_MAGIC + rng.randbytes(size - len(PNG_MAGIC)) for _ in range(distinct)]
+    # Skewed popularity: a few covers account for most uploads
+    workload = rng.choices(payloads, weights=[1 / (i + 1) for i in range(distinct)], k=uploads)
+    total_bytes = uploads * size
+
+    print(f"{uploads} uploads of {size} bytes, {distinct} distinct files")
+    print(f"{'layout':<20}{'files':>8}{'disk MB':>10}{'MB/s':>10}{'uploads/s':>12}")
+    for label, store in (("uuid", _store_uuid), ("content-addressed", _store_content_addressed)):
+        with tempfile.TemporaryDirectory() as base_dir:
+            started = time.perf_counter()
+            for data in workload:
+                await store(base_dir, data)
+            elapsed = time.perf_counter() - started
+            files, allocated = _disk_usage(base_dir)
+
+        print(
+            f"{label:<20}{files:>8}{allocated / 1e6:>10.1f}"
+            f"{total_bytes / 1e6 / elapsed:>10.1f}{uploads / elapsed:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=2000, help="Number of uploads to store")
+    parser.add_argument("--distinct", type=int, default=200, help="Number of distinct files")
+    parser.add_argument("--size", type=int, default=200_000, help="Bytes per file")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    asyncio.run(run(args.uploads, args.distinct, args.size, args.seed))
@@ -0,0 +1,47 @@
+"""Check liveness of all links stored on entries."""
+
+import argparse
+import asyncio
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.link_checker import LinkChecker
+
+
+def print_progress(progress: dict) -> None:
+    """Print a one-line progress report."""
+    print(
+        f"checked={progress['checked']} skipped={progress['skipped']} "
+        f"alive={progress['alive']} dead={progress['dead']} "
+        f"rate={progress['urls_per_second']} URLs/s"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run a single link check pass."""
+    checker = LinkChecker(
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        recheck_after=timedelta(hours=args.recheck_hours),
+        progress_hook=print_progress,
+    )
+    print("Checking entry links...")
+    report = await checker.run()
+    print(f"Done in {report['elapsed_seconds']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=20, help="Simultaneous probes")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Entries read per batch")
+    parser.add_argument(
+        "--recheck-hours",
+        type=float,
+        default=24.0,
+        help="Skip URLs checked within this many hours",
+    )
+    asyncio.run(main(parser.parse_args()))
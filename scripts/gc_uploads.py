@@ -0,0 +1,76 @@
+"""Remove orphaned upload files and stale temporary files."""
+
+import argparse
+import asyncio
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.upload_gc import UploadGarbageCollector
+
+
+def print_progress(progress: dict) -> None:
+    """Print a one-line progress report."""
+    print(
+        f"scanned={progress['scanned']} orphans={progress['orphans']} "
+        f"deleted={progress['deleted']} bytes={progress['bytes_reclaimed']}"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run a single garbage collection pass."""
+    if settings.storage_backend != "local":
+        print("Upload GC only applies to local storage; use a bucket lifecycle rule for S3")
+        return
+
+    collector = UploadGarbageCollector(
+        base_dir=args.upload_dir,
+        grace_period=timedelta(hours=args.grace_hours),
+        temp_grace_period=timedelta(hours=args.temp_grace_hours),
+        batch_size=args.batch_size,
+        max_files_per_second=args.rate,
+        dry_run=args.dry_run,
+        progress_hook=print_progress,
+    )
+    print(f"Collecting orphaned files in {collector.base_dir}...")
+    report = await collector.run()
+    action = "Would reclaim" if report["dry_run"] else "Reclaimed"
+    print(
+        f"{action} {report['orphans'] if report['dry_run'] else report['deleted']} files, "
+        f"{report['bytes_reclaimed']} bytes in {report['elapsed_seconds']}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--upload-dir", default=settings.upload_dir, help="Upload tree root")
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=settings.upload_gc_grace_hours,
+        help="Keep unreferenced files younger than this",
+    )
+    parser.add_argument(
+        "--temp-grace-hours",
+        type=float,
+        default=settings.upload_gc_temp_grace_hours,
+        help="Keep .tmp files younger than this",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.upload_gc_batch_size,
+        help="Files scanned and checked per batch",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.upload_gc_max_files_per_second,
+        help="Maximum files scanned per second (0 for unlimited)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report without deleting")
+    asyncio.run(main(parser.parse_args()))
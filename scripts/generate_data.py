@@ -0,0 +1,346 @@
+"""
+Generate a large synthetic dataset for performance work.
+
+Users get skewed library sizes (a few heavy readers, a long tail of light
+ones), entries get a realistic mix of kinds, statuses, links and description
+lengths, and popular titles and links are shared across users. The same seed
+always produces the same data.
+
+Rows are generated column-wise with numpy and bulk-loaded with COPY on
+Postgres and batched executemany on SQLite. All users share one precomputed
+password hash, title signatures are computed once per distinct title, and
+secondary indexes of an empty entries table are built after the load.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.links import LINK_HASH_LENGTH, canonicalize_link
+from app.core.minhash import title_signature
+from app.core.security import get_password_hash
+from app.domain.models import Base, Entry, EntryKind, EntryStatus, User, UserRole
+
+DEFAULT_PASSWORD = "Synth3tic!Pass"
+
+STATUS_WEIGHTS = {
+    EntryStatus.TO_READ.value: 55,
+    EntryStatus.IN_PROGRESS.value: 15,
+    EntryStatus.COMPLETED.value: 25,
+    EntryStatus.ARCHIVED.value: 5,
+}
+KIND_WEIGHTS = {
+    EntryKind.BOOK.value: 40,
+    EntryKind.ARTICLE.value: 35,
+    EntryKind.VIDEO.value: 15,
+    EntryKind.PODCAST.value: 10,
+}
+# Share of entries with a link, by kind
+LINK_SHARE = {"book": 0.6, "article": 0.95, "video": 0.9, "podcast": 0.8}
+DESCRIPTION_SHARE = 0.7
+DOMAINS = {
+    "book": ["www.goodreads.com", "openlibrary.org", "www.amazon.com", "books.google.com"],
+    "article": ["medium.com", "dev.to", "news.ycombinator.com", "lwn.net", "martinfowler.com"],
+    "video": ["www.youtube.com", "vimeo.com", "www.infoq.com"],
+    "podcast": ["changelog.com", "talkpython.fm", "open.spotify.com"],
+}
+WORDS = (
+    "data system design python async distributed cache query index latency scale "
+    "clean code pattern secure network protocol storage stream event model graph "
+    "history science mind habit deep work future practical guide art modern "
+    "introduction advanced handbook notes lessons field theory engine craft"
+).split()
+
+HISTORY_DAYS = 730
+MICROSECONDS_PER_DAY = 86_400 * 1_000_000
+
+
+def zipf_probabilities(size: int, exponent: float) -> np.ndarray:
+    """Probabilities of a Zipf distribution over ranks 1..size."""
+    weights = 1.0 / np.arange(1, size + 1, dtype=np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def normalized(weights: dict[str, int]) -> tuple[list[str], np.ndarray]:
+    """Split a weight table into its values and their probabilities."""
+    probabilities = np.array(list(weights.values()), dtype=np.float64)
+    return list(weights), probabilities / probabilities.sum()
+
+
+class SyntheticDataGenerator:
+    """Deterministic generator of user and entry rows."""
+
+    def __init__(
+        self,
+        seed: int,
+        users: int,
+        entries: int,
+        prefix: Optional[str] = None,
+        title_pool: int = 10_000,
+        link_pool: int = 50_000,
+        now: Optional[datetime] = None,
+    ):
+        """
+        Initialize generator.
+
+        Args:
+            seed: Random seed; equal seeds give equal data
+            users: Number of users
+            entries: Number of entries
+            prefix: Username prefix (default: derived from the seed)
+            title_pool: Most distinct titles entries draw from
+            link_pool: Most distinct links per kind entries draw from
+            now: Newest creation time (default: fixed so runs are reproducible)
+        """
+        self.rng = np.random.default_rng(seed)
+        self.users = users
+        self.entries = entries
+        self.prefix = prefix or f"synth{seed}_"
+        now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.now = np.datetime64(now.astimezone(timezone.utc).replace(tzinfo=None), "us")
+
+        self.titles = self._make_titles(min(title_pool, max(entries // 50, 1)))
+        self.links = self._make_links(min(link_pool, max(entries // 2, 1)))
+        # Lorem text descriptions are sliced from
+        self.corpus = " ".join(np.array(WORDS)[self.rng.integers(len(WORDS), size=4000)])
+        self._signatures: list[Optional[bytes]] = [None] * len(self.titles)
+
+    def _make_titles(self, count: int) -> list[str]:
+        """Distinct titles of two to eight capitalized words."""
+        words = [word.capitalize() for word in WORDS]
+        titles: set[str] = set()
+        while len(titles) < count:
+            length = int(self.rng.integers(2, 9))
+            titles.add(" ".join(words[i] for i in self.rng.integers(len(words), size=length)))
+        return sorted(titles)
+
+    def _make_links(self, count: int) -> dict[str, tuple[list[str], list[str]]]:
+        """Distinct links and their hashes per kind, slugged from the titles."""
+        links = {}
+        for kind, domains in DOMAINS.items():
+            slugs = self.rng.integers(len(self.titles), size=count)
+            urls = [
+                f"https://{domains[index % len(domains)]}/{kind}s/"
+                f"{self.titles[slug].lower().replace(' ', '-')}-{index}"
+                for index, slug in enumerate(slugs.tolist())
+            ]
+            # Generated links are already canonical, so this equals link_hash(url)
+            if canonicalize_link(urls[0]) != urls[0]:
+                raise ValueError(f"Generated link is not canonical: {urls[0]}")
+            hashes = [
+                hashlib.sha256(url.encode("utf-8")).hexdigest()[:LINK_HASH_LENGTH] for url in urls
+            ]
+            links[kind] = (urls, hashes)
+        return links
+
+    def signature(self, title: int) -> bytes:
+        """MinHash signature of a pooled title, computed once."""
+        signature = self._signatures[title]
+        if signature is None:
+            signature = self._signatures[title] = title_signature(self.titles[title])
+        return signature
+
+    def timestamps(self, count: int, days: int) -> np.ndarray:
+        """Uniform timestamps within the given number of days before now."""
+        return self.now - self.rng.integers(days * MICROSECONDS_PER_DAY, size=count)
+
+    def user_columns(self, password_hash: str) -> dict[str, list]:
+        """Columns of the users table."""
+        names = [f"{self.prefix}{index}" for index in range(self.users)]
+        created = self.timestamps(self.users, 1000)
+        return {
+            "email": [f"{name}@example.com" for name in names],
+            "username": names,
+            "hashed_password": [password_hash] * self.users,
+            "role": [UserRole.USER.value] * self.users,
+            "is_active": [True] * self.users,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def entry_batches(self, owner_ids: list[int], batch_size: int) -> Iterator[dict[str, list]]:
+        """
+        Yield batches of columns of the entries table.
+
+        Args:
+            owner_ids: Ids of the generated users, in generation order
+            batch_size: Rows per batch
+        """
+        rng = self.rng
+        owners = np.asarray(owner_ids)
+        # Log-normal library sizes: most users save little, a few save a lot
+        owner_p = rng.lognormal(0.0, 1.5, size=len(owners))
+        owner_p /= owner_p.sum()
+        kinds, kind_p = normalized(KIND_WEIGHTS)
+        statuses, status_p = normalized(STATUS_WEIGHTS)
+        link_share = np.array([LINK_SHARE[kind] for kind in kinds])
+        title_p = zipf_probabilities(len(self.titles), 1.1)
+        link_p = zipf_probabilities(len(self.links[kinds[0]][0]), 1.0)
+        corpus = self.corpus
+        to_read = statuses.index(EntryStatus.TO_READ.value)
+
+        for start in range(0, self.entries, batch_size):
+            count = min(batch_size, self.entries - start)
+            kind_ids = rng.choice(len(kinds), size=count, p=kind_p)
+            status_ids = rng.choice(len(statuses), size=count, p=status_p)
+            titles = rng.choice(len(title_p), size=count, p=title_p)
+            links = np.where(
+                rng.random(count) < link_share[kind_ids],
+                rng.choice(len(link_p), size=count, p=link_p),
+                -1,
+            )
+            # Median around 120 characters with a long tail, capped by the schema
+            lengths = np.minimum(rng.lognormal(4.8, 1.0, size=count), 5000).astype(np.int64)
+            lengths[rng.random(count) >= DESCRIPTION_SHARE] = -1
+            offsets = rng.integers(len(corpus) - 5000, size=count)
+            created = self.timestamps(count, HISTORY_DAYS)
+            edited = rng.integers(30 * MICROSECONDS_PER_DAY, size=count)
+            edited[status_ids == to_read] = 0
+
+            kind_names = [kinds[i] for i in kind_ids.tolist()]
+            link_urls, link_hashes = [], []
+            for kind, link in zip(kind_names, links.tolist()):
+                if link < 0:
+                    link_urls.append(None)
+                    link_hashes.append(None)
+                else:
+                    urls, hashes = self.links[kind]
+                    link_urls.append(urls[link])
+                    link_hashes.append(hashes[link])
+            title_ids = titles.tolist()
+            yield {
+                "title": [self.titles[i] for i in title_ids],
+                "kind": kind_names,
+                "link": link_urls,
+                "link_hash": link_hashes,
+                "title_minhash": [self.signature(i) for i in title_ids],
+                "status": [statuses[i] for i in status_ids.tolist()],
+                "description": [
+                    corpus[offset : offset + length] if length >= 0 else None
+                    for offset, length in zip(offsets.tolist(), lengths.tolist())
+                ],
+                "owner_id": owners[rng.choice(len(owners), size=count, p=owner_p)].tolist(),
+                "created_at": created,
+                "updated_at": created + edited,
+            }
+
+
+def to_records(conn: AsyncConnection, columns: dict[str, list]) -> list[tuple]:
+    """Convert generated columns into rows for the connection's driver."""
+    values = []
+    for column in columns.values():
+        if isinstance(column, np.ndarray):
+            if conn.dialect.name == "postgresql":
+                column = [value.replace(tzinfo=timezone.utc) for value in column.tolist()]
+            else:
+                # The text format SQLAlchemy's SQLite dialect stores datetimes in
+                column = np.char.replace(np.datetime_as_string(column, unit="us"), "T", " ")
+                column = column.tolist()
+        values.append(column)
+    return list(zip(*values))
+
+
+async def copy_rows(
+    conn: AsyncConnection, table: str, columns: list[str], records: list[tuple]
+) -> None:
+    """Bulk-load rows with COPY (Postgres) or batched executemany (SQLite)."""
+    if conn.dialect.name == "postgresql":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table, records=records, columns=columns)
+        return
+
+    placeholders = ", ".join("?" for _ in columns)
+    await conn.exec_driver_sql(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", records
+    )
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Generate and load the dataset, reporting the load rate."""
+    generator = SyntheticDataGenerator(args.seed, args.users, args.entries, args.prefix)
+    engine = create_async_engine(args.database_url)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        if args.create_tables:
+            await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "sqlite":
+            # Safe for a throwaway benchmark database only
+            await conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        existing = await conn.scalar(select(User.id).where(User.username == f"{generator.prefix}0"))
+        if existing is not None:
+            print(f"Users with prefix {generator.prefix!r} already exist; use another --prefix")
+            return 1
+
+        password_hash = get_password_hash(args.password)
+        users = generator.user_columns(password_hash)
+        await copy_rows(conn, User.__tablename__, list(users), to_records(conn, users))
+        result = await conn.execute(
+            select(User.username, User.id).where(User.username.startswith(generator.prefix))
+        )
+        ids = dict(result.all())
+        owner_ids = [ids[f"{generator.prefix}{index}"] for index in range(args.users)]
+        print(f"Loaded {len(owner_ids)} users")
+
+        # Building indexes once is much cheaper than maintaining them per row
+        deferred = []
+        if not await conn.scalar(select(func.count()).select_from(Entry)):
+            deferred = [index for index in Entry.__table__.indexes if not index.unique]
+            for index in deferred:
+                await conn.run_sync(index.drop, checkfirst=True)
+
+        # The driver inserts one batch while the next one is generated
+        loaded, pending = 0, None
+        for columns in generator.entry_batches(owner_ids, args.batch_size):
+            records = to_records(conn, columns)
+            if pending is not None:
+                await pending
+            pending = asyncio.create_task(
+                copy_rows(conn, Entry.__tablename__, list(columns), records)
+            )
+            await asyncio.sleep(0)
+            loaded += len(records)
+            rate = loaded / (time.perf_counter() - started)
+            print(f"  {loaded}/{args.entries} entries ({rate:,.0f} rows/s)", end="\r")
+        if pending is not None:
+            await pending
+
+        for index in deferred:
+            await conn.run_sync(index.create, checkfirst=True)
+
+    await engine.dispose()
+    elapsed = time.perf_counter() - started
+    total = args.users + args.entries
+    print(f"\nLoaded {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"Users log in as {generator.prefix}<n> with password {args.password!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10_000, help="Number of users")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Number of entries")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--prefix", help="Username prefix (default: synth<seed>_)")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per insert batch")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every user")
+    parser.add_argument("--database-url", default=settings.database_url, help="Target database URL")
+    parser.add_argument(
+        "--create-tables", action="store_true", help="Create missing tables before loading"
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
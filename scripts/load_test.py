@@ -0,0 +1,377 @@
+"""
+Drive API scenarios at a constant arrival rate and report latency percentiles.
+
+Requests are started on a fixed schedule whether or not earlier ones have
+finished (an open model), and latency is measured from the scheduled start,
+so a stalled server shows up as latency instead of as a lower request rate.
+
+By default the app runs in-process through httpx.ASGITransport against a
+throwaway SQLite database; pass --database-url for a local Postgres or --url
+to load a running server.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PASSWORD = "LoadTest!Pass42"
+SETUP_CONCURRENCY = 20
+
+Context = dict[str, Any]
+Call = Callable[[httpx.AsyncClient, Context, int], Awaitable[httpx.Response]]
+Setup = Callable[[httpx.AsyncClient, int], Awaitable[Context]]
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list; 0 when empty."""
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+async def register_user(client: httpx.AsyncClient, name: str) -> dict[str, Any]:
+    """Register a user; returns its credentials."""
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": f"{name}@example.com", "username": name, "password": PASSWORD},
+    )
+    response.raise_for_status()
+    return {"username": name, "password": PASSWORD}
+
+
+async def login_headers(client: httpx.AsyncClient, user: dict[str, Any]) -> dict[str, str]:
+    """Log a user in; returns its authorization header."""
+    response = await client.post("/api/v1/auth/login", json=user)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_entries(
+    client: httpx.AsyncClient, headers: dict[str, str], count: int
+) -> list[int]:
+    """Create entries a few at a time; returns their ids."""
+    ids: list[int] = []
+    for start in range(0, count, SETUP_CONCURRENCY):
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    "/api/v1/entries",
+                    json={"title": f"Load entry {index}", "kind": "article"},
+                    headers=headers,
+                )
+                for index in range(start, min(start + SETUP_CONCURRENCY, count))
+            )
+        )
+        for response in responses:
+            response.raise_for_status()
+            ids.append(response.json()["id"])
+    return ids
+
+
+async def owner(client: httpx.AsyncClient) -> Context:
+    """A fresh user and its authorization header."""
+    user = await register_user(client, f"load_{uuid.uuid4().hex[:12]}")
+    return {"headers": await login_headers(client, user)}
+
+
+async def setup_register(client: httpx.AsyncClient, count: int) -> Context:
+    """A run id keeping usernames unique across runs."""
+    return {"run": uuid.uuid4().hex[:12]}
+
+
+async def call_register(client: httpx.AsyncClient, ctx: Context, index: int) -> httpx.Response:
+    """Register a new user."""
+    name = f"load_{ctx['run']}_{index}"
+    return await client.post(
+        "/api/v1/auth/register",
+        json={"email": f"{name}@example.com", "username": name, "password": PASSWORD},
+    )
+
+
+async def setup_login(client: httpx.AsyncClient, count: int) -> Context:
+    """A small pool of registered users."""
+    run = uuid.uuid4().hex[:12]
+    users = [await register_user(client, f"load_{run}_{index}") for index in range(10)]
+    return {"users": users}
+
+
+async def call_login(client: httpx.AsyncClient, ctx: Context, index: int) -> httpx.Response:
+    """Log in as one of the pooled users."""
+    users = ctx["users"]
+    return await client.post("/api/v1/auth/login", json=users[index % len(users)])
+
+
+async def setup_create(client: httpx.AsyncClient, count: int) -> Context:
+    """A user to own the created entries."""
+    return await owner(client)
+
+
+async def call_create(client: httpx.AsyncClient, ctx: Context, index: int) -> httpx.Response:
+    """Create an entry with a link."""
+    return await client.post(
+        "/api/v1/entries",
+        json={
+            "title": f"Load entry {index}",
+            "kind": "book",
+            "link": f"https://example.com/books/{index}",
+        },
+        headers=ctx["headers"],
+    )
+
+
+async def setup_list(client: httpx.AsyncClient, count: int) -> Context:
+    """A user with a full page of entries."""
+    ctx = await owner(client)
+    await create_entries(client, ctx["headers"], 50)
+    return ctx
+
+
+async def call_list(client: httpx.AsyncClient, ctx: Context, index: int) -> httpx.Response:
+    """List the first page of entries."""
+    return await client.get("/api/v1/entries", params={"limit": 50}, headers=ctx["headers"])
+
+
+async def setup_patch(client: httpx.AsyncClient, count: int) -> Context:
+    """A user with entries to rename."""
+    ctx = await owner(client)
+    ctx["ids"] = await create_entries(client, ctx["headers"], 20)
+    return ctx
+
+
+async def call_patch(client: httpx.AsyncClient, ctx: Context, index: int) -> httpx.Response:
+    """Rename an entry and change its status."""
+    entry_id = ctx["ids"][index % len(ctx["ids"])]
+    return await client.patch(
+        f"/api/v1/entries/{entry_id}",
+        json={"title": f"Renamed {index}", "status": "in_progress"},
+        headers=ctx["headers"],
+    )
+
+
+async def setup_delete(client: httpx.AsyncClient, count: int) -> Context:
+    """A user with one entry per request."""
+    ctx = await owner(client)
+    # Every request deletes a different entry
+    ctx["ids"] = await create_entries(client, ctx["headers"], count)
+    return ctx
+
+
+async def call_delete(client: httpx.AsyncClient, ctx: Context, index: int) -> httpx.Response:
+    """Delete an entry."""
+    return await client.delete(f"/api/v1/entries/{ctx['ids'][index]}", headers=ctx["headers"])
+
+
+SCENARIOS: dict[str, tuple[Setup, Call]] = {
+    "register": (setup_register, call_register),
+    "login": (setup_login, call_login),
+    "create": (setup_create, call_create),
+    "list": (setup_list, call_list),
+    "patch": (setup_patch, call_patch),
+    "delete": (setup_delete, call_delete),
+}
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    rate: float,
+    duration: float,
+    max_in_flight: int = 1000,
+) -> dict[str, Any]:
+    """
+    Run one scenario at a constant arrival rate.
+
+    Args:
+        client: Client bound to the app or server under test
+        name: Scenario name, a key of SCENARIOS
+        rate: Requests started per second
+        duration: Seconds to keep starting requests
+        max_in_flight: Requests due while this many are outstanding are
+            skipped and counted as dropped, bounding the harness itself
+
+    Returns:
+        Summary with latency percentiles in milliseconds, throughput and errors
+    """
+    setup, call = SCENARIOS[name]
+    total = max(1, int(rate * duration))
+    ctx = await setup(client, total)
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    dropped = 0
+    in_flight = 0
+    loop = asyncio.get_running_loop()
+
+    async def one(index: int, scheduled: float) -> None:
+        nonlocal in_flight
+        try:
+            response = await call(client, ctx, index)
+            statuses[response.status_code] += 1
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        finally:
+            latencies.append(loop.time() - scheduled)
+            in_flight -= 1
+
+    tasks = []
+    started = loop.time()
+    for index in range(total):
+        scheduled = started + index / rate
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if in_flight >= max_in_flight:
+            dropped += 1
+            continue
+        in_flight += 1
+        tasks.append(asyncio.create_task(one(index, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+
+    latencies.sort()
+    failed = sum(count for code, count in statuses.items() if code >= 400) + sum(errors.values())
+    return {
+        "scenario": name,
+        "target_rps": rate,
+        "duration_seconds": round(elapsed, 3),
+        "requests": len(tasks),
+        "dropped": dropped,
+        "throughput_rps": round(len(tasks) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(failed / len(tasks), 4) if tasks else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "errors": dict(errors),
+    }
+
+
+def format_report(results: list[dict[str, Any]]) -> str:
+    """Render results as a text table."""
+    header = (
+        f"{'scenario':<10} {'target':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'max ms':>9} {'errors':>7} {'dropped':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result['scenario']:<10} {result['target_rps']:>7g} {result['throughput_rps']:>8.1f} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+            f"{result['max_ms']:>9.1f} {result['error_rate']:>7.1%} {result['dropped']:>7}"
+        )
+    return "\n".join(lines)
+
+
+async def open_asgi_client(database_url: str) -> httpx.AsyncClient:
+    """
+    Import the app against the given database and wrap it in a client.
+
+    Settings are read when the app is imported, so the environment is set first.
+    """
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+    os.environ.setdefault("LINK_ENRICHMENT_ENABLED", "false")
+
+    from app.adapters.database import init_db
+    from app.main import app
+
+    # Per-request log lines would cost more than some of the requests measured
+    logging.getLogger().setLevel(logging.WARNING)
+    await init_db()
+    # Unhandled errors become 500 responses, as they would behind a server
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest")
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Run the selected scenarios one after another."""
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.max_in_flight),
+        )
+    else:
+        database_url = args.database_url or (
+            f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='loadtest-')}/loadtest.db"
+        )
+        client = await open_asgi_client(database_url)
+
+    results = []
+    async with client:
+        for name in args.scenarios:
+            print(f"Running {name} at {args.rate:g} rps for {args.duration:g}s...", file=sys.stderr)
+            started = time.perf_counter()
+            results.append(
+                await run_scenario(client, name, args.rate, args.duration, args.max_in_flight)
+            )
+            print(f"  done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    print(format_report(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.json}")
+
+    over_budget = [
+        result["scenario"]
+        for result in results
+        if args.p95_budget_ms is not None and result["p95_ms"] > args.p95_budget_ms
+    ]
+    failing = [result["scenario"] for result in results if result["error_rate"] > args.max_errors]
+    if over_budget:
+        print(f"p95 over {args.p95_budget_ms}ms: {', '.join(over_budget)}")
+    if failing:
+        print(f"Error rate over {args.max_errors:.1%}: {', '.join(failing)}")
+    return 1 if over_budget or failing else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        default=list(SCENARIOS),
+        help=f"Comma-separated scenarios to run, from: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument("--rate", type=float, default=50.0, help="Requests started per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--url", help="Load a running server instead of the in-process app")
+    parser.add_argument(
+        "--database-url", help="Database for the in-process app (default: temporary SQLite)"
+    )
+    parser.add_argument(
+        "--max-in-flight", type=int, default=1000, help="Outstanding requests before dropping"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument(
+        "--p95-budget-ms", type=float, help="Exit with 1 if any scenario's p95 exceeds this"
+    )
+    parser.add_argument(
+        "--max-errors", type=float, default=0.0, help="Exit with 1 above this error rate"
+    )
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,49 @@
+"""
+Recompute per-user upload storage usage from the stored files.
+
+Safe to run while the API serves uploads on PostgreSQL: each user's counter
+row is locked with SELECT ... FOR UPDATE while that user's uploads are
+scanned and the totals are written, so concurrent uploads and deletes queue
+behind the lock instead of being overwritten.
+
+SQLite has no row locks, so there the script refuses to run unless uploads
+are quiesced (API stopped or read-only) and --uploads-quiesced is passed.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.adapters.database import AsyncSessionLocal, engine
+from app.services.storage_usage import StorageUsageService
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run a single reconciliation pass."""
+    print("Reconciling storage usage...")
+    async with AsyncSessionLocal() as db:
+        report = await StorageUsageService(db).reconcile(chunk_size=args.chunk_size)
+        await db.commit()
+    print(
+        f"{report['users']} users, {report['files']} files, {report['bytes']} bytes; "
+        f"{report['corrected']} counters corrected, {report['missing']} files missing "
+        f"({report['elapsed_seconds']}s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Uploads read per batch")
+    parser.add_argument(
+        "--uploads-quiesced",
+        action="store_true",
+        help="Confirm no uploads or deletes are running (required on SQLite)",
+    )
+    args = parser.parse_args()
+    if engine.dialect.name == "sqlite" and not args.uploads_quiesced:
+        parser.error("SQLite cannot lock usage rows; stop uploads and pass --uploads-quiesced")
+    asyncio.run(main(args))
@@ -0,0 +1,45 @@
+#!/bin/bash
+# Smoke test of upload serving through nginx (X-Accel-Redirect).
+# Run against the compose stack: docker-compose up -d && scripts/smoke_uploads.sh
+
+set -e
+
+BASE_URL="${BASE_URL:-http://localhost:3000}"
+WORK_DIR=$(mktemp -d)
+trap 'rm -rf "$WORK_DIR"' EXIT
+
+USERNAME="smoke$(date +%s)"
+PASSWORD="Smok3Test!Pass"
+
+# A valid 1x1 PNG; random pixel so the blob is new on every run
+python3 - "$WORK_DIR/smoke.png" <<'PY'
+import os, struct, sys, zlib
+
+def chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+header = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+pixels = zlib.compress(b"\x00" + os.urandom(3))
+with open(sys.argv[1], "wb") as f:
+    f.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", pixels) + chunk(b"IEND", b""))
+PY
+
+curl -sf -o /dev/null -H "Content-Type: application/json" \
+    -d "{\"email\": \"$USERNAME@example.com\", \"username\": \"$USERNAME\", \"password\": \"$PASSWORD\"}" \
+    "$BASE_URL/api/v1/auth/register"
+TOKEN=$(curl -sf -H "Content-Type: application/json" \
+    -d "{\"username\": \"$USERNAME\", \"password\": \"$PASSWORD\"}" \
+    "$BASE_URL/api/v1/auth/login" | python3 -c "import json, sys; print(json.load(sys.stdin)['access_token'])")
+
+UPLOAD_ID=$(curl -sf -H "Authorization: Bearer $TOKEN" -F "files=@$WORK_DIR/smoke.png;type=image/png" \
+    "$BASE_URL/api/v1/uploads" | python3 -c "import json, sys; print(json.load(sys.stdin)['files'][0]['upload_id'])")
+
+curl -sf -H "Authorization: Bearer $TOKEN" -D "$WORK_DIR/headers" -o "$WORK_DIR/served.png" \
+    "$BASE_URL/api/v1/uploads/$UPLOAD_ID"
+
+if ! cmp -s "$WORK_DIR/smoke.png" "$WORK_DIR/served.png"; then
+    echo "❌ Upload $UPLOAD_ID was not served with its body"
+    cat "$WORK_DIR/headers"
+    exit 1
+fi
+echo "✅ Upload $UPLOAD_ID served through nginx ($(wc -c < "$WORK_DIR/served.png") bytes)"
@@ -1,11 +1,14 @@
 """Test configuration and fixtures."""
 
 import asyncio
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator, Iterator
+from contextlib import AbstractContextManager, contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.adapters.database import get_db
@@ -128,3 +131,26 @@ async def admin_user(client: AsyncClient, db_session: AsyncSession) -> dict:
         "access_token": tokens["access_token"],
         "refresh_token": tokens["refresh_token"],
     }
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], AbstractContextManager[list[str]]]:
+    """Assert that the code inside the block issues at most N SQL statements."""
+
+    @contextmanager
+    def budget(max_queries: int) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(" ".join(statement.split()))
+
+        event.listen(Engine, "after_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "after_cursor_execute", record)
+        assert (
+            len(statements) <= max_queries
+        ), f"{len(statements)} queries, budget {max_queries}:\n" + "\n".join(statements)
+
+    return budget
@@ -0,0 +1,194 @@
+"""Tests for cached DNS resolution and post-resolution SSRF enforcement."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.http_client import (
+    CachingResolver,
+    SecureHTTPClient,
+    UnsafeAddressError,
+    default_resolver,
+    is_disallowed_address,
+)
+from app.core.metrics import DNS_RESOLUTION_DURATION, observe_dns_resolution, registry
+
+
+class StubResolver(CachingResolver):
+    """Resolver that answers from a static table instead of the network."""
+
+    def __init__(self, table: dict[str, tuple[str, ...]], **kwargs):
+        super().__init__(**kwargs)
+        self.table = table
+        self.lookups = 0
+
+    async def _lookup(self, host: str) -> tuple[str, ...]:
+        self.lookups += 1
+        await asyncio.sleep(0)
+        if host not in self.table:
+            raise OSError(f"unknown host {host}")
+        return self.table[host]
+
+
+class TestDisallowedAddresses:
+    """Verify the address policy shared by the resolver."""
+
+    @pytest.mark.parametrize(
+        "address", ["10.1.2.3", "127.0.0.1", "192.168.0.10", "::1", "::ffff:10.0.0.1"]
+    )
+    def test_private_addresses_are_disallowed(self, address):
+        """Private, loopback and IPv4-mapped private addresses are rejected."""
+        assert is_disallowed_address(address) is True
+
+    def test_public_address_is_allowed(self):
+        """Publicly routable addresses pass the policy."""
+        assert is_disallowed_address("93.184.216.34") is False
+
+
+class TestCachingResolver:
+    """Test TTL cache, de-duplication and metrics reporting."""
+
+    @pytest.mark.asyncio
+    async def test_resolves_each_host_once(self):
+        """Repeated and concurrent lookups share a single resolution."""
+        resolver = StubResolver({"example.com": ("93.184.216.34",)})
+
+        results = await asyncio.gather(*(resolver.resolve("example.com") for _ in range(5)))
+        await resolver.resolve("EXAMPLE.com.")
+
+        assert all(result == ("93.184.216.34",) for result in results)
+        assert resolver.lookups == 1
+        assert resolver.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_first_caller_does_not_cancel_shared_lookup(self):
+        """A waiter still gets the address when the caller that started the lookup is cancelled."""
+        resolver = StubResolver({"example.com": ("93.184.216.34",)})
+
+        first = asyncio.create_task(resolver.resolve("example.com"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(resolver.resolve("example.com"))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == ("93.184.216.34",)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert resolver.lookups == 1
+        assert await resolver.resolve("example.com") == ("93.184.216.34",)
+        assert resolver.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_resolved_again(self):
+        """Entries older than the TTL trigger a fresh lookup."""
+        resolver = StubResolver({"example.com": ("93.184.216.34",)}, ttl=0.0)
+
+        await resolver.resolve("example.com")
+        await resolver.resolve("example.com")
+
+        assert resolver.lookups == 2
+
+    @pytest.mark.asyncio
+    async def test_metrics_hook_reports_hits_and_misses(self):
+        """The metrics hook receives latency and cache-hit information."""
+        events = []
+        resolver = StubResolver(
+            {"example.com": ("93.184.216.34",)},
+            metrics_hook=lambda host, latency, hit: events.append((host, hit, latency >= 0)),
+        )
+
+        await resolver.resolve("example.com")
+        await resolver.resolve("example.com")
+
+        assert events == [("example.com", False, True), ("example.com", True, True)]
+        assert resolver.hit_ratio == 0.5
+
+    @pytest.mark.asyncio
+    async def test_latency_is_exported_to_metrics(self):
+        """The shared resolver reports latency to the dns_resolution_seconds histogram."""
+        assert default_resolver.metrics_hook is observe_dns_resolution
+        resolver = StubResolver(
+            {"example.com": ("93.184.216.34",)}, metrics_hook=observe_dns_resolution
+        )
+        before = {
+            cache: DNS_RESOLUTION_DURATION.labels(cache).counts[:] for cache in ("hit", "miss")
+        }
+
+        await resolver.resolve("example.com")
+        await resolver.resolve("example.com")
+
+        for cache in ("hit", "miss"):
+            child = DNS_RESOLUTION_DURATION.labels(cache)
+            assert sum(child.counts) == sum(before[cache]) + 1
+        assert 'dns_resolution_seconds_count{cache="miss"}' in registry.render()
+
+    @pytest.mark.asyncio
+    async def test_resolve_safe_rejects_any_private_address(self):
+        """A single private address among the results blocks the host."""
+        resolver = StubResolver({"rebind.example": ("93.184.216.34", "10.0.0.5")})
+
+        with pytest.raises(UnsafeAddressError):
+            await resolver.resolve_safe("rebind.example")
+
+
+class TestPinnedRequests:
+    """Test that SecureHTTPClient connects only to vetted addresses."""
+
+    @pytest.mark.asyncio
+    async def test_request_is_pinned_to_vetted_ip(self):
+        """The connection targets the resolved IP while keeping Host and SNI."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["host"] = request.url.host
+            seen["host_header"] = request.headers["Host"]
+            seen["sni"] = request.extensions.get("sni_hostname")
+            return httpx.Response(200, content=b"ok")
+
+        client = SecureHTTPClient(
+            resolver=StubResolver({"example.com": ("93.184.216.34",)}), max_retries=0
+        )
+        response = await client.get(
+            "https://example.com/page", transport=httpx.MockTransport(handler)
+        )
+
+        assert response.status_code == 200
+        assert seen == {
+            "host": "93.184.216.34",
+            "host_header": "example.com",
+            "sni": "example.com",
+        }
+
+    @pytest.mark.asyncio
+    async def test_hostname_resolving_to_private_network_is_blocked(self):
+        """Hostnames that resolve into private ranges never reach the transport."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise AssertionError("request should have been blocked")
+
+        client = SecureHTTPClient(
+            resolver=StubResolver({"internal.example.com": ("10.0.0.7",)}), max_retries=0
+        )
+
+        with pytest.raises(ValueError):
+            await client.get(
+                "https://internal.example.com/admin", transport=httpx.MockTransport(handler)
+            )
+
+    @pytest.mark.asyncio
+    async def test_redirect_targets_are_vetted(self):
+        """Redirects to hosts that resolve privately are blocked as well."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(302, headers={"Location": "https://internal.example.com/"})
+
+        client = SecureHTTPClient(
+            resolver=StubResolver(
+                {"example.com": ("93.184.216.34",), "internal.example.com": ("10.0.0.7",)}
+            ),
+            max_retries=0,
+        )
+
+        with pytest.raises(ValueError):
+            await client.get("https://example.com/", transport=httpx.MockTransport(handler))
@@ -0,0 +1,185 @@
+"""Tests for the batch link liveness checker."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.domain.models import Entry, LinkCheck
+from app.services import link_checker as link_checker_module
+from app.services.link_checker import LinkChecker
+
+
+class StubHTTPClient:
+    """HTTP client double keyed by (method, url)."""
+
+    def __init__(self, responses: dict[tuple[str, str], int]):
+        self.responses = responses
+        self.calls: list[tuple[str, str]] = []
+
+    def _respond(self, method: str, url: str) -> httpx.Response:
+        self.calls.append((method, url))
+        status_code = self.responses.get((method, url))
+        if status_code is None:
+            raise httpx.HTTPError("Connection error")
+        return httpx.Response(status_code, request=httpx.Request(method, url))
+
+    async def head(self, url: str, **kwargs) -> httpx.Response:
+        return self._respond("HEAD", url)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return self._respond("GET", url)
+
+
+async def _add_entries(db_session, links: list[str]) -> None:
+    """Insert entries with the given links for a single owner."""
+    for i, link in enumerate(links):
+        db_session.add(Entry(title=f"Entry {i}", kind="article", link=link, owner_id=1))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_checker_probes_each_distinct_url_once(db_session):
+    """Duplicate links are probed once and HEAD failures fall back to GET."""
+    alive = "https://example.com/alive"
+    no_head = "https://example.com/no-head"
+    dead = "https://example.com/dead"
+    await _add_entries(db_session, [alive, no_head, alive, dead, None, alive])
+    http_client = StubHTTPClient(
+        {("HEAD", alive): 200, ("HEAD", no_head): 405, ("GET", no_head): 200, ("HEAD", dead): 404}
+    )
+    reports = []
+    checker = LinkChecker(
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        http_client=http_client,
+        chunk_size=2,
+        progress_hook=reports.append,
+    )
+
+    report = await checker.run()
+
+    assert sorted(http_client.calls) == [
+        ("GET", no_head),
+        ("HEAD", alive),
+        ("HEAD", dead),
+        ("HEAD", no_head),
+    ]
+    assert report["checked"] == 3
+    assert report["alive"] == 2
+    assert report["dead"] == 1
+    assert reports and "urls_per_second" in reports[-1]
+
+    rows = (await db_session.execute(select(LinkCheck).order_by(LinkCheck.url))).scalars().all()
+    assert [(row.url, row.status_code, row.is_alive) for row in rows] == [
+        (alive, 200, True),
+        (dead, 404, False),
+        (no_head, 200, True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_checker_skips_recently_checked_urls(db_session):
+    """URLs with a fresh stored result are not probed again."""
+    fresh = "https://example.com/fresh"
+    stale = "https://example.com/stale"
+    await _add_entries(db_session, [fresh, stale])
+    now = datetime.now(timezone.utc)
+    db_session.add(LinkCheck(url=fresh, status_code=200, is_alive=True, checked_at=now))
+    db_session.add(
+        LinkCheck(url=stale, status_code=200, is_alive=True, checked_at=now - timedelta(days=3))
+    )
+    await db_session.commit()
+    http_client = StubHTTPClient({})
+    checker = LinkChecker(
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        http_client=http_client,
+    )
+
+    report = await checker.run()
+
+    assert http_client.calls == [("HEAD", stale), ("GET", stale)]
+    assert report["skipped"] == 1
+    assert report["dead"] == 1
+
+
+@pytest.mark.asyncio
+async def test_link_check_endpoints_require_admin(client: AsyncClient, test_user: dict):
+    """Regular users cannot start link checks."""
+    headers = {"Authorization": f"Bearer {test_user['access_token']}"}
+
+    response = await client.post("/api/v1/admin/link-checks", headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_can_start_link_check(client: AsyncClient, admin_user: dict, monkeypatch):
+    """Admins start a scan once; a second start while running conflicts."""
+    started = []
+
+    def fake_start() -> bool:
+        if started:
+            return False
+        started.append(True)
+        return True
+
+    monkeypatch.setattr(link_checker_module.link_checker, "start", fake_start)
+    headers = {"Authorization": f"Bearer {admin_user['access_token']}"}
+
+    response = await client.post("/api/v1/admin/link-checks", headers=headers)
+    assert response.status_code == 202
+
+    response = await client.post("/api/v1/admin/link-checks", headers=headers)
+    assert response.status_code == 409
+
+    response = await client.get("/api/v1/admin/link-checks/status", headers=headers)
+    assert response.status_code == 200
+    assert "running" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_background_failure_is_logged_and_reported(caplog):
+    """A crashed background scan surfaces its error in progress."""
+
+    class BrokenChecker(LinkChecker):
+        async def run(self):
+            self.progress = {"running": True, "error": None}
+            raise RuntimeError("database is gone")
+
+    checker = BrokenChecker(http_client=StubHTTPClient({}))
+
+    assert checker.start() is True
+    with caplog.at_level("ERROR", logger=link_checker_module.__name__):
+        await asyncio.gather(checker._task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    assert checker.running is False
+    assert checker.progress["running"] is False
+    assert checker.progress["error"] == "RuntimeError: database is gone"
+    assert "Link check failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_scan():
+    """stop() cancels an in-flight scan so shutdown does not leave it dangling."""
+    release = asyncio.Event()
+
+    class SlowChecker(LinkChecker):
+        async def run(self):
+            self.progress = {"running": True, "error": None}
+            await release.wait()
+
+    checker = SlowChecker(http_client=StubHTTPClient({}))
+    assert checker.start() is True
+    task = checker._task
+    await asyncio.sleep(0)
+
+    await checker.stop()
+
+    assert task.cancelled()
+    assert checker.running is False
+    assert checker.progress["error"] is None
+    await checker.stop()
@@ -0,0 +1,107 @@
+"""Tests for link canonicalization and duplicate link detection."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.links import canonicalize_link, link_hash
+from app.domain.models import Entry
+from app.services.entry_service import EntryService
+
+
+class TestCanonicalizeLink:
+    """Verify URL variants collapse onto one canonical form."""
+
+    @pytest.mark.parametrize(
+        "variant",
+        [
+            "https://Example.COM/article?id=7",
+            "https://example.com:443/article?id=7#comments",
+            "https://example.com/article?utm_source=news&id=7&fbclid=abc",
+            "https://example.com./article?id=7&utm_campaign=spring",
+        ],
+    )
+    def test_variants_share_canonical_form(self, variant):
+        """Case, default ports, fragments and tracking parameters are ignored."""
+        assert canonicalize_link(variant) == "https://example.com/article?id=7"
+
+    def test_meaningful_differences_are_kept(self):
+        """Different paths, query values and non-default ports stay distinct."""
+        base = link_hash("https://example.com/article?id=7")
+        assert link_hash("https://example.com/article?id=8") != base
+        assert link_hash("https://example.com/other?id=7") != base
+        assert link_hash("https://example.com:8443/article?id=7") != base
+
+    def test_query_order_is_normalized(self):
+        """Query parameter order does not affect the hash."""
+        assert link_hash("https://example.com/?a=1&b=2") == link_hash(
+            "https://example.com/?b=2&a=1"
+        )
+
+    def test_hash_is_compact(self):
+        """Hashes fit the indexed column and empty links have no hash."""
+        assert len(link_hash("https://example.com/")) == 32
+        assert link_hash(None) is None
+
+
+@pytest.mark.asyncio
+async def test_duplicate_link_is_reported(client: AsyncClient, test_user: dict):
+    """The default policy creates the entry and points at the existing one."""
+    headers = {"Authorization": f"Bearer {test_user['access_token']}"}
+    first = await client.post(
+        "/api/v1/entries",
+        json={"title": "Article", "kind": "article", "link": "https://example.com/a?id=1"},
+        headers=headers,
+    )
+    assert first.status_code == 201
+    assert "X-Duplicate-Of" not in first.headers
+
+    second = await client.post(
+        "/api/v1/entries",
+        json={
+            "title": "Article again",
+            "kind": "article",
+            "link": "https://EXAMPLE.com/a?utm_source=feed&id=1#top",
+        },
+        headers=headers,
+    )
+    assert second.status_code == 201
+    assert second.headers["X-Duplicate-Of"] == str(first.json()["id"])
+
+
+@pytest.mark.asyncio
+async def test_duplicate_link_can_be_rejected(client: AsyncClient, test_user: dict):
+    """on_duplicate=reject refuses links the user already saved."""
+    headers = {"Authorization": f"Bearer {test_user['access_token']}"}
+    payload = {"title": "Article", "kind": "article", "link": "https://example.com/a"}
+
+    response = await client.post("/api/v1/entries", json=payload, headers=headers)
+    assert response.status_code == 201
+
+    response = await client.post(
+        "/api/v1/entries", params={"on_duplicate": "reject"}, json=payload, headers=headers
+    )
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_backfill_link_hashes_processes_batches(db_session):
+    """Backfill fills missing hashes batch by batch and stops when done."""
+    for i in range(5):
+        db_session.add(
+            Entry(title=f"Entry {i}", kind="article", link=f"https://example.com/{i}", owner_id=1)
+        )
+    db_session.add(Entry(title="No link", kind="book", owner_id=1))
+    await db_session.commit()
+
+    service = EntryService(db_session)
+    last_id = 0
+    batches = 0
+    while next_id := await service.backfill_link_hashes(last_id, batch_size=2):
+        last_id = next_id
+        batches += 1
+    await db_session.commit()
+
+    hashes = (await db_session.execute(select(Entry.link, Entry.link_hash))).all()
+    assert batches == 3
+    assert all(digest == link_hash(link) for link, digest in hashes)
@@ -0,0 +1,173 @@
+"""Tests for background link metadata enrichment."""
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.domain.models import Entry, EntryKind, LinkEnrichmentJob
+from app.domain.schemas import EntryCreate, UserCreate
+from app.services.entry_service import EntryService
+from app.services.link_enrichment import LinkEnricher, parse_link_metadata
+from app.services.user_service import UserService
+
+ARTICLE_HTML = """
+<html>
+  <head>
+    <title> Fallback   title </title>
+    <meta property="og:title" content="Clean Code">
+    <meta name="description" content="A handbook of agile software craftsmanship.">
+    <meta property="og:image" content="/covers/clean-code.jpg">
+    <script>var ignored = "these words are not counted";</script>
+  </head>
+  <body><p>{body}</p></body>
+</html>
+"""
+
+
+class StubHTTPClient:
+    """HTTP client double that serves canned pages and counts fetches."""
+
+    def __init__(self, pages: dict[str, str], delay: float = 0.0):
+        self.pages = pages
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        self.calls.append(url)
+        await asyncio.sleep(self.delay)
+        if url not in self.pages:
+            raise httpx.HTTPError("Connection error")
+        return httpx.Response(
+            200,
+            text=self.pages[url],
+            headers={"content-type": "text/html; charset=utf-8"},
+            request=httpx.Request("GET", url),
+        )
+
+
+def test_parse_link_metadata_extracts_fields():
+    """Parser prefers Open Graph values and estimates reading time from visible text."""
+    html = ARTICLE_HTML.format(body="word " * 450)
+
+    metadata = parse_link_metadata(html, "https://example.com/articles/1")
+
+    assert metadata == {
+        "link_title": "Clean Code",
+        "link_description": "A handbook of agile software craftsmanship.",
+        "link_image": "https://example.com/covers/clean-code.jpg",
+        "reading_time_minutes": 3,
+    }
+
+
+def test_parse_link_metadata_falls_back_to_title_tag():
+    """Documents without Open Graph tags use <title> and skip insecure images."""
+    html = (
+        "<html><head><title>Plain  page</title>"
+        '<meta property="og:image" content="http://example.com/a.png"></head></html>'
+    )
+
+    metadata = parse_link_metadata(html, "https://example.com/")
+
+    assert metadata["link_title"] == "Plain page"
+    assert metadata["link_image"] is None
+    assert metadata["reading_time_minutes"] is None
+
+
+def _session_factory(db_session) -> async_sessionmaker:
+    """Build a session factory bound to the test database."""
+    return async_sessionmaker(db_session.bind, expire_on_commit=False)
+
+
+async def _create_entries(db_session, links: list[str]) -> list[Entry]:
+    """Create a user with one entry per link and commit them."""
+    owner = await UserService(db_session).create_user(
+        UserCreate(email="reader@example.com", username="reader", password="StrongPass!234")
+    )
+    service = EntryService(db_session)
+    entries = [
+        await service.create_entry(
+            EntryCreate(title=f"Entry {i}", kind=EntryKind.ARTICLE, link=link), owner
+        )
+        for i, link in enumerate(links)
+    ]
+    await db_session.commit()
+    return entries
+
+
+@pytest.mark.asyncio
+async def test_enricher_updates_entries_and_dedupes_urls(db_session):
+    """Entries sharing a URL are enriched from a single fetch and jobs are cleared."""
+    url = "https://example.com/articles/1"
+    entries = await _create_entries(db_session, [url, url])
+    http_client = StubHTTPClient({url: ARTICLE_HTML.format(body="word " * 10)}, delay=0.01)
+    session_factory = _session_factory(db_session)
+    enricher = LinkEnricher(
+        session_factory=session_factory, http_client=http_client, host_interval=0
+    )
+
+    await enricher.start()
+    try:
+        # Both entries were persisted as jobs and are picked up on resume
+        await asyncio.sleep(0)
+        for entry in entries:
+            assert enricher.submit(entry.id, url) is True
+        await enricher.join()
+    finally:
+        await enricher.stop()
+
+    assert http_client.calls == [url]
+    async with session_factory() as db:
+        stored = (await db.execute(select(Entry).order_by(Entry.id))).scalars().all()
+        jobs = (await db.execute(select(LinkEnrichmentJob))).scalars().all()
+    assert [entry.link_title for entry in stored] == ["Clean Code", "Clean Code"]
+    assert all(entry.enriched_at is not None for entry in stored)
+    assert jobs == []
+
+
+@pytest.mark.asyncio
+async def test_enricher_keeps_failed_jobs_for_retry(db_session):
+    """Failed fetches record the error and leave the job for a later resume."""
+    url = "https://unreachable.example.com/"
+    await _create_entries(db_session, [url])
+    session_factory = _session_factory(db_session)
+    enricher = LinkEnricher(
+        session_factory=session_factory,
+        http_client=StubHTTPClient({}, delay=0.01),
+        host_interval=0,
+    )
+
+    await enricher.start()
+    try:
+        await asyncio.sleep(0.05)
+        await enricher.join()
+    finally:
+        await enricher.stop()
+
+    async with session_factory() as db:
+        job = (await db.execute(select(LinkEnrichmentJob))).scalar_one()
+    assert job.attempts == 1
+    assert "Connection error" in job.last_error
+
+
+def test_submit_without_running_workers_is_deferred():
+    """Submitting to a stopped enricher never blocks and reports deferral."""
+    enricher = LinkEnricher(http_client=StubHTTPClient({}))
+
+    assert enricher.submit(1, "https://example.com/") is False
+
+
+@pytest.mark.asyncio
+async def test_host_rate_limit_spaces_fetches():
+    """Consecutive fetches to one host are spaced by the host interval."""
+    enricher = LinkEnricher(http_client=StubHTTPClient({}), host_interval=0.05)
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    await enricher._wait_for_host("example.com")
+    await enricher._wait_for_host("example.com")
+    await enricher._wait_for_host("other.example.com")
+
+    assert loop.time() - started >= 0.05
@@ -0,0 +1,169 @@
+"""Tests for the queue-based logging pipeline and the access log."""
+
+import io
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueListener
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.logging import (
+    BoundedQueueHandler,
+    JSONFormatter,
+    RequestIdFilter,
+    access_logger,
+    set_request_id,
+    should_log_access,
+)
+
+
+@pytest.fixture
+def make_logger():
+    """Isolated logger factory that detaches its handlers afterwards."""
+    loggers = []
+
+    def factory(handler: logging.Handler) -> logging.Logger:
+        logger = logging.getLogger(f"test.logging.{len(loggers)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        loggers.append((logger, handler))
+        return logger
+
+    yield factory
+    for logger, handler in loggers:
+        logger.removeHandler(handler)
+
+
+def test_drop_policy_counts_dropped(make_logger):
+    """A full queue drops records immediately and counts them."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    logger = make_logger(handler)
+
+    for index in range(5):
+        logger.info("record %d", index)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_block_policy_waits_then_drops(make_logger):
+    """With block the caller waits up to the timeout before dropping."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), block=True, timeout=0.05)
+    logger = make_logger(handler)
+
+    logger.info("fits")
+    started = time.monotonic()
+    logger.info("waits")
+
+    assert time.monotonic() - started >= 0.05
+    assert handler.dropped == 1
+
+
+def test_request_id_captured_before_queueing(make_logger):
+    """The request_id of the logging context travels with the record."""
+    handler = BoundedQueueHandler(queue.Queue())
+    handler.addFilter(RequestIdFilter())
+    logger = make_logger(handler)
+
+    set_request_id("req-123")
+    logger.info("hello %s", "world")
+    set_request_id("")
+
+    record = handler.queue.get_nowait()
+    assert record.request_id == "req-123"
+    assert record.getMessage() == "hello world"
+
+
+def test_listener_writes_json(make_logger):
+    """Queued records are written by the listener thread with extra fields."""
+    log_queue: queue.Queue = queue.Queue()
+    handler = BoundedQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    output = io.StringIO()
+    stream_handler = logging.StreamHandler(output)
+    stream_handler.setFormatter(JSONFormatter())
+    listener = QueueListener(log_queue, stream_handler)
+    logger = make_logger(handler)
+
+    listener.start()
+    logger.info("request done", extra={"status": 201, "route": "/api/v1/entries"})
+    listener.stop()
+
+    payload = json.loads(output.getvalue())
+    assert payload["message"] == "request done"
+    assert payload["level"] == "INFO"
+    assert payload["status"] == 201
+    assert payload["route"] == "/api/v1/entries"
+
+
+class _Collector(logging.Handler):
+    """Handler keeping emitted records in a list."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def access_records():
+    """Records emitted by the access logger."""
+    collector = _Collector()
+    access_logger.addHandler(collector)
+    yield collector.records
+    access_logger.removeHandler(collector)
+
+
+class TestAccessLog:
+    """Structured per-request access records."""
+
+    @pytest.mark.asyncio
+    async def test_records_route_timing_and_size(
+        self, client: AsyncClient, test_user, access_records
+    ):
+        """One record per request with the route template, DB time and bytes sent."""
+        access_records.clear()
+        response = await client.get(
+            "/api/v1/entries/999999",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+
+        assert len(access_records) == 1
+        record = access_records[0]
+        assert record.route == "/api/v1/entries/{entry_id}"
+        assert record.status == response.status_code == 404
+        assert record.db_queries >= 1
+        assert record.db_ms > 0
+        assert record.bytes_out == len(response.content)
+        assert record.request_id == response.headers["x-request-id"]
+
+    @pytest.mark.asyncio
+    async def test_sampling(self, client: AsyncClient, access_records):
+        """Sampled-out requests are skipped unless slow or failed."""
+        with patch.object(settings, "access_log_sample_rate", 0.0):
+            await client.get("/health")
+            assert access_records == []
+
+            with patch.object(settings, "access_log_slow_ms", 0.0):
+                await client.get("/health")
+            assert [record.route for record in access_records] == ["/health"]
+
+            await client.get("/api/v1/entries")
+            assert [record.status for record in access_records] == [200, 403]
+
+    def test_errors_always_logged(self):
+        """4xx and 5xx responses bypass sampling."""
+        with patch.object(settings, "access_log_sample_rate", 0.0):
+            assert should_log_access(503, 1.0) is True
+            assert should_log_access(404, 1.0) is True
+            assert should_log_access(401, 1.0) is True
+            assert should_log_access(302, 1.0) is False
+            assert should_log_access(200, 1.0) is False
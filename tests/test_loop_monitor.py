@@ -0,0 +1,61 @@
+"""Tests for the event loop lag monitor and stall detector."""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopMonitor
+from app.core.metrics import EVENT_LOOP_LAG, EVENT_LOOP_STALLS
+
+
+def _block_loop(seconds: float) -> None:
+    """Hold the event loop like a CPU-bound call would."""
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_measures_lag():
+    """Blocking the loop shows up as lag in the monitor and the histogram."""
+    observed = EVENT_LOOP_LAG.labels().counts.copy()
+    monitor = LoopMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    _block_loop(0.1)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert not monitor.running
+    assert monitor.max_lag >= 0.05
+    assert sum(EVENT_LOOP_LAG.labels().counts) > sum(observed)
+
+
+@pytest.mark.asyncio
+async def test_reports_blocking_stack(caplog):
+    """A callback holding the loop past the threshold is logged once with its stack."""
+    stalls = EVENT_LOOP_STALLS.labels().value
+    monitor = LoopMonitor(interval=1.0, stall_threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.1)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        _block_loop(0.4)
+        await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    assert monitor.stalls == 1
+    assert EVENT_LOOP_STALLS.labels().value == stalls + 1
+    assert "Event loop blocked for" in caplog.text
+    assert "in _block_loop" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_no_stall_when_responsive():
+    """A loop that keeps answering pings is never reported."""
+    monitor = LoopMonitor(interval=1.0, stall_threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.2)
+    await monitor.stop()
+
+    assert monitor.stalls == 0
@@ -0,0 +1,106 @@
+"""Tests for tracemalloc snapshots and the admin memory endpoints."""
+
+import tracemalloc
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.memory import MemoryTracer, MemoryTracingError, memory_tracer
+
+_retained: list[bytearray] = []
+
+
+def _allocate() -> None:
+    """Allocate memory that stays referenced, like a leak would."""
+    _retained.extend(bytearray(1024) for _ in range(500))
+
+
+ALLOCATION_SITE = f"test_memory.py:{_allocate.__code__.co_firstlineno + 2}"
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    """Leave tracemalloc off after every test."""
+    yield
+    memory_tracer.stop()
+    tracemalloc.stop()
+    _retained.clear()
+
+
+class TestMemoryTracer:
+    """Snapshots and diffs."""
+
+    def test_diff_finds_growing_line(self):
+        """The line that allocated between snapshots tops the diff."""
+        tracer = MemoryTracer()
+        tracer.start()
+        base = tracer.take_snapshot()
+        _allocate()
+        target = tracer.take_snapshot()
+
+        rows = tracer.diff(base.id, target.id, limit=5)
+        by_file = tracer.diff(base.id, target.id, limit=5, group_by="filename")
+
+        assert rows[0]["site"].endswith(ALLOCATION_SITE)
+        assert rows[0]["size_diff"] >= 500 * 1024
+        assert rows[0]["count_diff"] >= 500
+        assert by_file[0]["site"].endswith("test_memory.py")
+
+    def test_snapshots_are_bounded(self):
+        """Old snapshots are dropped and each keeps at most max_sites lines."""
+        tracer = MemoryTracer(max_snapshots=2, max_sites=10)
+        tracer.start()
+        first = tracer.take_snapshot()
+        for _ in range(2):
+            tracer.take_snapshot()
+
+        assert [item["id"] for item in tracer.status()["snapshots"]] == [2, 3]
+        assert all(item["sites"] <= 10 for item in tracer.status()["snapshots"])
+        with pytest.raises(KeyError):
+            tracer.get(first.id)
+
+    def test_requires_tracing(self):
+        """Snapshots cannot be taken while tracing is off."""
+        with pytest.raises(MemoryTracingError):
+            MemoryTracer().take_snapshot()
+
+
+class TestMemoryEndpoints:
+    """Admin /admin/memory endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_and_diff(self, client: AsyncClient, admin_user):
+        """Admins start tracing, take two snapshots and diff them."""
+        headers = {"Authorization": f"Bearer {admin_user['access_token']}"}
+
+        refused = await client.post("/api/v1/admin/memory/snapshots", headers=headers)
+        started = await client.post("/api/v1/admin/memory/tracing", headers=headers)
+        base = await client.post("/api/v1/admin/memory/snapshots", headers=headers)
+        _allocate()
+        target = await client.post("/api/v1/admin/memory/snapshots", headers=headers)
+        diff = await client.get(
+            "/api/v1/admin/memory/diff",
+            params={"base": base.json()["id"], "target": target.json()["id"]},
+            headers=headers,
+        )
+        missing = await client.get(
+            "/api/v1/admin/memory/diff", params={"base": 999, "target": 1000}, headers=headers
+        )
+        stopped = await client.delete("/api/v1/admin/memory/tracing", headers=headers)
+
+        assert refused.status_code == 409
+        assert started.json()["tracing"] is True
+        assert base.status_code == target.status_code == 201
+        assert any(row["site"].endswith(ALLOCATION_SITE) for row in diff.json())
+        assert missing.status_code == 404
+        assert stopped.json() == {**stopped.json(), "tracing": False, "snapshots": []}
+
+    @pytest.mark.asyncio
+    async def test_admin_only(self, client: AsyncClient, test_user):
+        """Regular users are refused."""
+        response = await client.post(
+            "/api/v1/admin/memory/tracing",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+        assert response.status_code == 403
+        assert not tracemalloc.is_tracing()
@@ -0,0 +1,138 @@
+"""Tests for the metrics registry and the /metrics endpoint."""
+
+import re
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import Settings, settings
+from app.core.metrics import MetricsRegistry
+
+
+def _sample(text: str, name: str) -> float:
+    """Value of one exported sample line, matched by its full name and labels."""
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{name} not exported"
+    return float(match.group(1))
+
+
+class TestRegistry:
+    """Text exposition of the metric types."""
+
+    def test_counter_and_gauge(self):
+        """Counters and gauges export one line per label set."""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs run", ("kind",))
+        gauge = registry.gauge("workers", "Busy workers")
+        counter.labels("thumb").inc()
+        counter.labels("thumb").inc(2)
+        counter.labels('we"ird\n').inc()
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        text = registry.render()
+
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="thumb"} 3' in text
+        assert 'jobs_total{kind="we\\"ird\\n"} 1' in text
+        assert "workers 1" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Bucket counts include every smaller bucket; +Inf equals the count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ("route",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.labels("/x").observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{route="/x",le="1.0"} 3' in text
+        assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{route="/x"} 4' in text
+        assert _sample(text, 'latency_seconds_sum{route="/x"}') == pytest.approx(3.65)
+
+    def test_callback_metric(self):
+        """Callbacks are read at render time, with or without labels."""
+        registry = MetricsRegistry()
+        state = {"depth": 1}
+        registry.callback("queue_depth", "Depth", lambda: state["depth"])
+        registry.callback("hits_total", "Hits", lambda: {("dns",): 7}, ("cache",), "counter")
+        state["depth"] = 5
+
+        text = registry.render()
+
+        assert "queue_depth 5" in text
+        assert "# TYPE hits_total counter" in text
+        assert 'hits_total{cache="dns"} 7' in text
+
+    def test_label_count_checked(self):
+        """Using the wrong number of labels is an error."""
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs run", ("kind",))
+        with pytest.raises(ValueError):
+            counter.labels()
+
+
+class TestMetricsEndpoint:
+    """GET /metrics."""
+
+    @pytest.fixture(autouse=True)
+    def enabled(self):
+        """Metrics are opt-in; enable them without a token unless a test sets one."""
+        with (
+            patch.object(settings, "metrics_enabled", True),
+            patch.object(settings, "metrics_token", None),
+        ):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_exports_request_and_bcrypt_metrics(self, client: AsyncClient, test_user):
+        """Requests are recorded by route template; logins record bcrypt time."""
+        before = (await client.get("/metrics")).text
+        await client.get(
+            "/api/v1/entries/999999",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        name = (
+            "http_request_duration_seconds_count"
+            '{method="GET",route="/api/v1/entries/{entry_id}",status="404"}'
+        )
+        previous = _sample(before, name) if name in before else 0
+        assert _sample(response.text, name) == previous + 1
+        assert _sample(response.text, "http_requests_in_flight") == 1
+        assert _sample(response.text, 'password_hash_duration_seconds_count{operation="hash"}') >= 1
+        assert "db_pool_checked_out" in response.text
+        assert 'cache_hit_ratio{cache="dns"}' in response.text
+
+    @pytest.mark.asyncio
+    async def test_can_be_disabled(self, client: AsyncClient):
+        """The endpoint is hidden when metrics are turned off."""
+        with patch.object(settings, "metrics_enabled", False):
+            response = await client.get("/metrics")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_token_required_when_configured(self, client: AsyncClient):
+        """With metrics_token set, scrapes need the matching bearer token."""
+        with patch.object(settings, "metrics_token", "scrape-secret"):
+            missing = await client.get("/metrics")
+            wrong = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+            ok = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+        assert missing.status_code == 401
+        assert missing.headers["www-authenticate"] == "Bearer"
+        assert wrong.status_code == 401
+        assert ok.status_code == 200
+        assert "http_requests_in_flight" in ok.text
+
+    def test_disabled_by_default(self):
+        """A fresh configuration does not expose /metrics."""
+        assert Settings(_env_file=None).metrics_enabled is False
@@ -0,0 +1,94 @@
+"""Tests for the sampling profiler and its admin endpoint."""
+
+import threading
+from collections import Counter
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.profiler import ProfileInProgressError, StackSampler, format_collapsed, profiler
+
+
+def _spin(stop: threading.Event) -> None:
+    """Burn CPU until stopped."""
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestStackSampler:
+    """Sampling of thread stacks."""
+
+    def test_captures_busy_thread(self):
+        """A thread burning CPU shows up with its call stack, outermost frame first."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            stacks, samples = StackSampler(interval=0.001).profile(0.1)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert samples > 0
+        spinner = [stack for stack in stacks if stack.startswith("thread:spinner;")]
+        assert spinner
+        assert all("_spin (test_profiler.py:" in stack for stack in spinner)
+        assert not any("StackSampler.profile" in stack for stack in stacks)
+
+    def test_one_profile_at_a_time(self):
+        """A second profile is refused while one runs."""
+        sampler = StackSampler()
+        with sampler._lock:
+            assert sampler.running
+            with pytest.raises(ProfileInProgressError):
+                sampler.profile(0.01)
+
+    def test_collapsed_format(self):
+        """One line per stack with its count, most frequent first."""
+        text = format_collapsed(Counter({"thread:a;f": 1, "thread:a;f;g": 3}))
+        assert text == "thread:a;f;g 3\nthread:a;f 1\n"
+
+
+class TestProfileEndpoint:
+    """POST /admin/profile."""
+
+    @pytest.mark.asyncio
+    async def test_returns_collapsed_stacks(self, client: AsyncClient, admin_user):
+        """Stacks include the event loop thread labelled with its running task."""
+        response = await client.post(
+            "/api/v1/admin/profile",
+            params={"seconds": 0.1},
+            headers={"Authorization": f"Bearer {admin_user['access_token']}"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        lines = response.text.splitlines()
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any(";task:" in line for line in lines)
+
+    @pytest.mark.asyncio
+    async def test_guard_rails(self, client: AsyncClient, admin_user):
+        """Overlong and concurrent profiles are refused."""
+        headers = {"Authorization": f"Bearer {admin_user['access_token']}"}
+        too_long = await client.post(
+            "/api/v1/admin/profile", params={"seconds": 3600}, headers=headers
+        )
+        with profiler._lock:
+            busy = await client.post(
+                "/api/v1/admin/profile", params={"seconds": 0.1}, headers=headers
+            )
+
+        assert too_long.status_code == 422
+        assert busy.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_admin_only(self, client: AsyncClient, test_user):
+        """Regular users are refused."""
+        response = await client.post(
+            "/api/v1/admin/profile",
+            params={"seconds": 0.1},
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+        assert response.status_code == 403
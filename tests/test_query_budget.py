@@ -0,0 +1,119 @@
+"""Query budgets per endpoint and per-request query instrumentation."""
+
+import logging
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.query_stats import track_queries
+from app.core.config import settings
+
+
+@pytest.fixture
+def auth(test_user) -> dict:
+    """Authorization header of the test user."""
+    return {"Authorization": f"Bearer {test_user['access_token']}"}
+
+
+@pytest.fixture
+async def entry_id(client: AsyncClient, auth) -> int:
+    """An entry owned by the test user."""
+    response = await client.post(
+        "/api/v1/entries", json={"title": "Dune", "kind": "book"}, headers=auth
+    )
+    return response.json()["id"]
+
+
+class TestQueryBudgets:
+    """Statements issued per endpoint; raise a budget only on purpose."""
+
+    @pytest.mark.asyncio
+    async def test_create_entry(self, client: AsyncClient, auth, query_budget):
+        """User lookup, insert, refresh."""
+        with query_budget(3):
+            response = await client.post(
+                "/api/v1/entries", json={"title": "Dune", "kind": "book"}, headers=auth
+            )
+        assert response.status_code == 201
+
+    @pytest.mark.asyncio
+    async def test_list_entries(self, client: AsyncClient, auth, entry_id, query_budget):
+        """User lookup, page, total count."""
+        with query_budget(3):
+            response = await client.get("/api/v1/entries", headers=auth)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_get_entry(self, client: AsyncClient, auth, entry_id, query_budget):
+        """User lookup and entry."""
+        with query_budget(2):
+            response = await client.get(f"/api/v1/entries/{entry_id}", headers=auth)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_update_entry(self, client: AsyncClient, auth, entry_id, query_budget):
+        """User lookup, entry, update, refresh."""
+        with query_budget(4):
+            response = await client.patch(
+                f"/api/v1/entries/{entry_id}", json={"title": "Dune II"}, headers=auth
+            )
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_delete_entry(self, client: AsyncClient, auth, entry_id, query_budget):
+        """User lookup, entry, enrichment jobs, delete."""
+        with query_budget(4):
+            response = await client.delete(f"/api/v1/entries/{entry_id}", headers=auth)
+        assert response.status_code == 204
+
+    @pytest.mark.asyncio
+    async def test_login(self, client: AsyncClient, test_user, query_budget):
+        """A single user lookup."""
+        with query_budget(1):
+            response = await client.post(
+                "/api/v1/auth/login", json={"username": "testuser", "password": "Secur3Pass!45"}
+            )
+        assert response.status_code == 200
+
+
+class TestQueryInstrumentation:
+    """Request-scoped statement counting."""
+
+    @pytest.mark.asyncio
+    async def test_counts_repeated_statements(self, db_session: AsyncSession):
+        """Statements are counted per text, exposing per-row query loops."""
+        stats = track_queries()
+        for value in range(3):
+            await db_session.execute(text("SELECT :value"), {"value": value})
+        await db_session.execute(text("SELECT 1"))
+
+        assert stats.count == 4
+        assert stats.duration > 0
+        assert stats.most_repeated() == ("SELECT ?", 3)
+
+    @pytest.mark.asyncio
+    async def test_debug_headers(self, client: AsyncClient, auth, entry_id):
+        """Debug mode reports the query count and DB time in response headers."""
+        with patch.object(settings, "debug", True):
+            response = await client.get(f"/api/v1/entries/{entry_id}", headers=auth)
+
+        assert response.headers["x-db-queries"] == "2"
+        assert response.headers["server-timing"].startswith("db;dur=")
+
+    @pytest.mark.asyncio
+    async def test_no_debug_headers_by_default(self, client: AsyncClient, auth, entry_id):
+        """Query details are not exposed outside debug mode."""
+        response = await client.get(f"/api/v1/entries/{entry_id}", headers=auth)
+        assert "x-db-queries" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_warns_about_n_plus_one(self, client: AsyncClient, auth, entry_id, caplog):
+        """A statement repeated past the threshold is reported with its route."""
+        with patch.object(settings, "db_n_plus_one_threshold", 1):
+            with caplog.at_level(logging.WARNING, logger="app.core.logging"):
+                await client.get(f"/api/v1/entries/{entry_id}", headers=auth)
+
+        assert "Possible N+1 query in GET /api/v1/entries/{entry_id}" in caplog.text
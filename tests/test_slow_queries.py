@@ -0,0 +1,112 @@
+"""Tests for statement fingerprints and the slow query log."""
+
+import logging
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.adapters.slow_queries import StatementTable, fingerprint, statement_table
+from app.core.config import settings
+
+
+class TestFingerprint:
+    """Normalization of statement text."""
+
+    def test_strips_literals_and_placeholders(self):
+        """Values, driver placeholders and whitespace do not split fingerprints."""
+        statement = (
+            "SELECT t1.id FROM entries\n  WHERE title = 'it''s' AND owner_id = $1"
+            " AND rating > 4.5 AND kind::text = :kind_1 LIMIT ?"
+        )
+        assert fingerprint(statement) == (
+            "SELECT t1.id FROM entries WHERE title = ? AND owner_id = ?"
+            " AND rating > ? AND kind::text = ? LIMIT ?"
+        )
+
+    def test_collapses_value_lists(self):
+        """IN lists of any length share one fingerprint."""
+        short = fingerprint("SELECT id FROM uploads WHERE id IN (1, 2)")
+        long = fingerprint("SELECT id FROM uploads WHERE id IN ($1, $2, $3, $4)")
+        assert short == long == "SELECT id FROM uploads WHERE id IN (?+)"
+
+
+class TestStatementTable:
+    """Aggregation per fingerprint."""
+
+    def test_aggregates_and_orders(self):
+        """Counts, percentiles and maxima are reported in milliseconds."""
+        table = StatementTable(max_size=10)
+        for duration in range(1, 101):
+            table.record("SELECT ?", duration / 1000)
+        table.record("UPDATE t SET x = ?", 0.5)
+
+        by_total, by_max = table.top(10), table.top(1, "max")
+
+        assert by_total[0] == {
+            "fingerprint": "SELECT ?",
+            "count": 100,
+            "total_ms": 5050.0,
+            "p50_ms": 50.0,
+            "p95_ms": 95.0,
+            "max_ms": 100.0,
+        }
+        assert [row["fingerprint"] for row in by_max] == ["UPDATE t SET x = ?"]
+
+    def test_bounded(self):
+        """The least recently executed fingerprint is evicted when full."""
+        table = StatementTable(max_size=2)
+        table.record("a", 0.001)
+        table.record("b", 0.001)
+        table.record("a", 0.001)
+        table.record("c", 0.001)
+
+        assert len(table) == 2
+        assert table.evicted == 1
+        assert {row["fingerprint"] for row in table.top(10)} == {"a", "c"}
+
+
+class TestSlowQueryLog:
+    """Threshold logging and the admin endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_logs_slow_statement_with_request_id(
+        self, client: AsyncClient, test_user, caplog
+    ):
+        """Statements over the threshold are logged with the request's id."""
+        with patch.object(settings, "slow_query_threshold_ms", 0.0):
+            with caplog.at_level(logging.WARNING, logger="app.adapters.slow_queries"):
+                response = await client.get(
+                    "/api/v1/entries",
+                    headers={"Authorization": f"Bearer {test_user['access_token']}"},
+                )
+
+        request_id = response.headers["x-request-id"]
+        assert f"request_id={request_id}" in caplog.text
+        assert "FROM entries" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_admin_endpoint(self, client: AsyncClient, admin_user):
+        """Admins see the table sorted by the requested column."""
+        statement_table.clear()
+        await client.get("/health")
+        response = await client.get(
+            "/api/v1/admin/db/statements",
+            params={"limit": 5, "order_by": "count"},
+            headers={"Authorization": f"Bearer {admin_user['access_token']}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        counts = [row["count"] for row in body["statements"]]
+        assert counts == sorted(counts, reverse=True)
+        assert body["tracked"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_admin_only(self, client: AsyncClient, test_user):
+        """Regular users are refused."""
+        response = await client.get(
+            "/api/v1/admin/db/statements",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+        assert response.status_code == 403
@@ -0,0 +1,204 @@
+"""Tests for per-user storage accounting and quotas."""
+
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import LocalShardedStorage
+from app.domain.models import User, UserStorageUsage
+from app.services.storage_usage import StorageUsageService
+from app.services.upload_service import UploadService
+
+
+def _png(fill: bytes, size: int = 1000) -> bytes:
+    """PNG-signed payload of the given total size."""
+    header = b"\x89PNG\r\n\x1a\n"
+    return header + fill * (size - len(header))
+
+
+async def _chunks(data: bytes) -> AsyncIterator[bytes]:
+    """Yield data in two chunks."""
+    yield data[:100]
+    yield data[100:]
+
+
+@pytest.fixture
+def storage():
+    """Local storage in a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield LocalShardedStorage(temp_dir)
+
+
+@pytest.fixture
+async def owner(db_session: AsyncSession) -> User:
+    """A user created without going through the API."""
+    user = User(email="quota@example.com", username="quota", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    return user
+
+
+def _service(db_session: AsyncSession, storage: LocalShardedStorage, quota: int) -> UploadService:
+    """Upload service with the given per-user quota."""
+    with patch.object(settings, "upload_quota_bytes", quota):
+        return UploadService(db_session, storage)
+
+
+class TestQuotaAccounting:
+    """Counters maintained by store and release."""
+
+    @pytest.mark.asyncio
+    async def test_store_and_release_update_usage(self, db_session, storage, owner):
+        """Every upload is charged its blob size, including deduplicated ones."""
+        service = _service(db_session, storage, 10_000)
+        first = await service.store(owner, "a.png", _chunks(_png(b"a")))
+        await service.store(owner, "b.png", _chunks(_png(b"a")))
+
+        usage = await db_session.get(UserStorageUsage, owner.id)
+        assert (usage.bytes_used, usage.file_count) == (2000, 2)
+
+        await service.release(first.id, owner)
+        await db_session.refresh(usage)
+        assert (usage.bytes_used, usage.file_count) == (1000, 1)
+
+    @pytest.mark.asyncio
+    async def test_quota_rejects_before_writing(self, db_session, storage, owner):
+        """An upload that does not fit is refused and leaves nothing behind."""
+        service = _service(db_session, storage, 1500)
+        await service.store(owner, "a.png", _chunks(_png(b"a")))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.store(owner, "b.png", _chunks(_png(b"b")))
+
+        assert exc_info.value.status_code == 413
+        assert exc_info.value.detail == "storage_quota_exceeded"
+        assert len([p for p in Path(storage.root).rglob("*") if p.is_file()]) == 1
+        assert await StorageUsageService(db_session).get_usage(owner.id) == 1000
+
+    @pytest.mark.asyncio
+    async def test_full_quota_rejects_without_reading(self, db_session, storage, owner):
+        """With no room left the stream is never consumed."""
+        db_session.add(UserStorageUsage(user_id=owner.id, bytes_used=1000, file_count=1))
+        await db_session.flush()
+
+        async def never_read() -> AsyncIterator[bytes]:
+            raise AssertionError("stream was read")
+            yield b""
+
+        with pytest.raises(HTTPException) as exc_info:
+            await _service(db_session, storage, 1000).store(owner, "a.png", never_read())
+        assert exc_info.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_charge_is_conditional(self, db_session, owner):
+        """The quota check and increment happen in one statement."""
+        usage = StorageUsageService(db_session, quota=1000)
+
+        assert await usage.charge(owner.id, 600) is True
+        assert await usage.charge(owner.id, 600) is False
+        assert await usage.charge(owner.id, 400) is True
+        assert await usage.get_usage(owner.id) == 1000
+
+
+class TestReconciliation:
+    """Bulk recomputation from stored files."""
+
+    @pytest.mark.asyncio
+    async def test_reconcile_repairs_drift(self, db_session, storage, owner):
+        """Counters are reset to the sizes found on disk."""
+        service = _service(db_session, storage, 0)
+        await service.store(owner, "a.png", _chunks(_png(b"a")))
+        await service.store(owner, "b.png", _chunks(_png(b"b", 500)))
+        usage = await db_session.get(UserStorageUsage, owner.id)
+        usage.bytes_used = 99
+        db_session.add(UserStorageUsage(user_id=owner.id + 1000, bytes_used=5, file_count=1))
+        await db_session.flush()
+
+        report = await StorageUsageService(db_session).reconcile(storage, chunk_size=1)
+
+        assert report["files"] == 2
+        assert report["bytes"] == 1500
+        assert report["corrected"] == 2
+        await db_session.refresh(usage)
+        assert (usage.bytes_used, usage.file_count) == (1500, 2)
+        assert await StorageUsageService(db_session).get_usage(owner.id + 1000) == 0
+
+    @pytest.mark.asyncio
+    async def test_reconcile_locks_each_counter_before_scanning(self, db_session, storage, owner):
+        """Every user's row is locked FOR UPDATE and committed around its own scan."""
+        service = _service(db_session, storage, 0)
+        await service.store(owner, "a.png", _chunks(_png(b"a")))
+        db_session.add(UserStorageUsage(user_id=owner.id + 1000, bytes_used=5, file_count=1))
+        await db_session.commit()
+
+        events = []
+        execute, commit = db_session.execute, db_session.commit
+
+        async def recording_execute(statement, *args, **kwargs):
+            sql = str(statement.compile(dialect=postgresql.dialect()))
+            if "FOR UPDATE" in sql:
+                events.append("lock")
+            elif "FROM uploads JOIN" in sql and events[-1] != "scan":
+                events.append("scan")
+            return await execute(statement, *args, **kwargs)
+
+        async def recording_commit():
+            events.append("commit")
+            await commit()
+
+        with (
+            patch.object(db_session, "execute", recording_execute),
+            patch.object(db_session, "commit", recording_commit),
+        ):
+            await StorageUsageService(db_session).reconcile(storage)
+
+        assert events == ["commit"] + ["lock", "scan", "commit"] * 2
+
+
+class TestTopConsumers:
+    """GET /api/v1/admin/storage/top."""
+
+    @pytest.mark.asyncio
+    async def test_lists_largest_first(
+        self, client: AsyncClient, db_session: AsyncSession, admin_user, test_user
+    ):
+        """Admins see users ordered by bytes used."""
+        db_session.add_all(
+            [
+                UserStorageUsage(user_id=test_user["user"]["id"], bytes_used=500, file_count=2),
+                UserStorageUsage(user_id=admin_user["user"]["id"], bytes_used=900, file_count=1),
+            ]
+        )
+        await db_session.commit()
+
+        response = await client.get(
+            "/api/v1/admin/storage/top?limit=1",
+            headers={"Authorization": f"Bearer {admin_user['access_token']}"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "user_id": admin_user["user"]["id"],
+                "username": "admin",
+                "bytes_used": 900,
+                "file_count": 1,
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_requires_admin(self, client: AsyncClient, test_user):
+        """Regular users are refused."""
+        response = await client.get(
+            "/api/v1/admin/storage/top",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+        assert response.status_code == 403
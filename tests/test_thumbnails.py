@@ -0,0 +1,199 @@
+"""Tests for thumbnail rendering, generation and serving."""
+
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.storage import LocalShardedStorage, get_storage
+from app.core.thumbnails import render_thumbnails, thumbnail_key
+from app.domain.models import User
+from app.main import app
+from app.services.thumbnails import ThumbnailGenerator
+from app.services.upload_service import UploadService
+
+
+def _image_bytes(size: tuple[int, int], fmt: str = "JPEG", mode: str = "RGB") -> bytes:
+    """Encode a gradient test image."""
+    image = Image.linear_gradient("L").resize(size).convert(mode)
+    buffer = io.BytesIO()
+    image.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+async def _chunks(data: bytes) -> AsyncIterator[bytes]:
+    """Yield data as a single chunk."""
+    yield data
+
+
+@pytest.fixture
+def storage_root():
+    """Temporary storage root."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+class TestRenderThumbnails:
+    """Rendering in the worker function."""
+
+    def test_renders_requested_widths(self, storage_root):
+        """Each width narrower than the source is rendered as JPEG, keeping aspect ratio."""
+        source = Path(storage_root) / "cover.jpg"
+        source.write_bytes(_image_bytes((800, 1200)))
+
+        rendered = render_thumbnails(str(source), storage_root, [160, 320, 640, 1024])
+
+        assert sorted(rendered) == [160, 320, 640]
+        for width, path in rendered.items():
+            with Image.open(path) as thumb:
+                assert thumb.format == "JPEG"
+                assert thumb.size == (width, width * 3 // 2)
+
+    def test_flattens_transparent_png(self, storage_root):
+        """PNG sources with alpha become RGB JPEGs."""
+        source = Path(storage_root) / "cover.png"
+        source.write_bytes(_image_bytes((400, 400), "PNG", "RGBA"))
+
+        rendered = render_thumbnails(str(source), storage_root, [160])
+
+        with Image.open(rendered[160]) as thumb:
+            assert thumb.mode == "RGB"
+
+    def test_rejects_unvalidated_content(self, storage_root):
+        """Files that fail magic-byte validation are never decoded."""
+        source = Path(storage_root) / "cover.gif"
+        source.write_bytes(_image_bytes((400, 400), "GIF"))
+
+        with pytest.raises(ValueError):
+            render_thumbnails(str(source), storage_root, [160])
+
+
+class TestThumbnailGenerator:
+    """Queueing, deduplication and storage of thumbnails."""
+
+    @pytest.mark.asyncio
+    async def test_generates_once_per_digest(self, db_session: AsyncSession, storage_root):
+        """Identical uploads share one rendering job and its thumbnails."""
+        storage = LocalShardedStorage(storage_root)
+        generator = ThumbnailGenerator(
+            storage, workers=1, widths=[160, 320], executor=ThreadPoolExecutor(1)
+        )
+        generator.start()
+        owner = User(email="a@example.com", username="a", hashed_password="x")
+        db_session.add(owner)
+        await db_session.flush()
+
+        service = UploadService(db_session, storage, thumbnails=generator)
+        data = _image_bytes((800, 600))
+        upload = await service.store(owner, "a.jpg", _chunks(data))
+        await service.store(owner, "b.jpg", _chunks(data))
+        await generator.join()
+
+        assert generator.rendered == 2
+        for width in (160, 320):
+            assert await storage.exists(thumbnail_key(upload.sha256, width))
+
+        # A later upload of the same content finds the thumbnails in place
+        await service.store(owner, "c.jpg", _chunks(data))
+        await generator.join()
+        assert generator.rendered == 2
+        await generator.stop()
+
+    @pytest.mark.asyncio
+    async def test_submit_applies_back_pressure(self, storage_root):
+        """A full queue refuses new blobs instead of growing without bound."""
+        # No consumer tasks, so queued blobs stay queued
+        generator = ThumbnailGenerator(
+            LocalShardedStorage(storage_root),
+            workers=0,
+            queue_size=1,
+            executor=ThreadPoolExecutor(1),
+        )
+        generator.start()
+
+        assert generator.submit("a" * 64, "aa/aa/a.png") is True
+        assert generator.submit("a" * 64, "aa/aa/a.png") is True  # already pending
+        assert generator.submit("b" * 64, "bb/bb/b.png") is False
+        await generator.stop()
+
+    @pytest.mark.asyncio
+    async def test_process_pool_renders(self, storage_root):
+        """Rendering works across a real spawned process pool."""
+        storage = LocalShardedStorage(storage_root)
+        source = Path(storage_root) / "staged.tmp"
+        source.write_bytes(_image_bytes((400, 300)))
+        digest = "c" * 64
+        await storage.put_file(f"cc/cc/{digest}.jpg", source)
+
+        generator = ThumbnailGenerator(storage, workers=1, widths=[160])
+        generator.start()
+        try:
+            await generator.enqueue(digest, f"cc/cc/{digest}.jpg")
+            await generator.join()
+        finally:
+            await generator.stop()
+
+        assert await storage.exists(thumbnail_key(digest, 160))
+
+
+class TestServeThumbnail:
+    """GET /api/v1/uploads/{id}?width=."""
+
+    @pytest.fixture
+    async def stored(self, client: AsyncClient, db_session: AsyncSession, test_user, storage_root):
+        """Upload a cover and render its thumbnails synchronously."""
+        storage = LocalShardedStorage(storage_root)
+        app.dependency_overrides[get_storage] = lambda: storage
+        generator = ThumbnailGenerator(
+            storage, workers=1, widths=[160, 320, 640], executor=ThreadPoolExecutor(1)
+        )
+        generator.start()
+        owner = await db_session.get(User, test_user["user"]["id"])
+        upload = await UploadService(db_session, storage, thumbnails=generator).store(
+            owner, "cover.jpg", _chunks(_image_bytes((500, 500)))
+        )
+        await db_session.commit()
+        await generator.join()
+        await generator.stop()
+        return upload
+
+    @pytest.mark.asyncio
+    async def test_serves_thumbnail(self, client, test_user, stored):
+        """A rendered width is served as an immutable JPEG with its own ETag."""
+        response = await client.get(
+            f"/api/v1/uploads/{stored.id}?width=160",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{stored.sha256}.w160"'
+        assert "immutable" in response.headers["cache-control"]
+        with Image.open(io.BytesIO(response.content)) as thumb:
+            assert thumb.size == (160, 160)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_original(self, client, test_user, stored):
+        """Widths without a thumbnail serve the original without long-term caching."""
+        response = await client.get(
+            f"/api/v1/uploads/{stored.id}?width=640",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{stored.sha256}"'
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_width(self, client, test_user, stored):
+        """Only configured widths are accepted."""
+        response = await client.get(
+            f"/api/v1/uploads/{stored.id}?width=123",
+            headers={"Authorization": f"Bearer {test_user['access_token']}"},
+        )
+        assert response.status_code == 422
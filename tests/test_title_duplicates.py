@@ -0,0 +1,88 @@
+"""Tests for MinHash-based near-duplicate title detection."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.minhash import (
+    NUM_PERM,
+    estimate_similarity,
+    find_duplicate_groups,
+    normalize_title,
+    title_signature,
+)
+from app.domain.models import Entry
+
+
+class TestMinHash:
+    """Verify normalization, signatures and LSH grouping."""
+
+    def test_normalize_title(self):
+        """Case, accents and punctuation do not affect the normalized title."""
+        assert normalize_title("  Crème  Brûlée: A History!") == "creme brulee a history"
+
+    def test_signature_is_deterministic_and_compact(self):
+        """Signatures are stable across calls and have a fixed size."""
+        signature = title_signature("Clean Code")
+        assert signature == title_signature("clean code!")
+        assert len(signature) == NUM_PERM * 4
+
+    def test_similarity_estimates(self):
+        """Near-identical titles score high and unrelated titles score low."""
+        clean_code = title_signature("Clean Code")
+        assert estimate_similarity(clean_code, title_signature("Clean Code (2nd ed.)")) > 0.4
+        assert (
+            estimate_similarity(clean_code, title_signature("The Art of Computer Programming"))
+            < 0.2
+        )
+
+    def test_groups_only_near_duplicates(self):
+        """LSH grouping returns each near-duplicate cluster once."""
+        titles = {
+            1: "Clean Code",
+            2: "Refactoring",
+            3: "Clean Code (2nd ed.)",
+            4: "Designing Data-Intensive Applications",
+            5: "Designing Data Intensive Applications",
+            6: "The Pragmatic Programmer",
+        }
+
+        groups = find_duplicate_groups(
+            titles.keys(), [title_signature(t) for t in titles.values()], threshold=0.4
+        )
+
+        assert sorted(ids for ids, _ in groups) == [[1, 3], [4, 5]]
+        assert all(0.4 <= similarity <= 1.0 for _, similarity in groups)
+
+    def test_small_inputs(self):
+        """Fewer than two items never form a group."""
+        assert find_duplicate_groups([], []) == []
+        assert find_duplicate_groups([1], [title_signature("Only")]) == []
+
+
+@pytest.mark.asyncio
+async def test_duplicates_endpoint(client: AsyncClient, test_user: dict, db_session):
+    """The endpoint groups the user's near-duplicate titles, including legacy rows."""
+    headers = {"Authorization": f"Bearer {test_user['access_token']}"}
+    for title in ["Clean Code", "Clean Code (2nd ed.)", "Refactoring"]:
+        response = await client.post(
+            "/api/v1/entries", json={"title": title, "kind": "book"}, headers=headers
+        )
+        assert response.status_code == 201
+
+    # Row created before signatures existed
+    db_session.add(Entry(title="Refactoring!", kind="book", owner_id=test_user["user"]["id"]))
+    # Another user's entry is never included
+    db_session.add(Entry(title="Clean Code", kind="book", owner_id=test_user["user"]["id"] + 1))
+    await db_session.commit()
+
+    response = await client.get(
+        "/api/v1/entries/duplicates", params={"threshold": 0.4}, headers=headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert sorted(group["titles"] for group in data["groups"]) == [
+        ["Clean Code", "Clean Code (2nd ed.)"],
+        ["Refactoring", "Refactoring!"],
+    ]
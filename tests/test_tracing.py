@@ -0,0 +1,144 @@
+"""Tests for request tracing spans and exporters."""
+
+import contextvars
+import json
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import (
+    NOOP_SPAN,
+    JsonlSpanExporter,
+    SpanExportWorker,
+    Trace,
+    span,
+    start_trace,
+    to_otlp,
+)
+
+REQUEST_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+
+def _in_fresh_context(func):
+    """Run func in a copied context so trace state does not leak between tests."""
+    return contextvars.copy_context().run(func)
+
+
+def _sampled_trace() -> Trace:
+    """Trace with nested spans, one of which failed."""
+    with patch.object(settings, "tracing_enabled", True):
+        with patch.object(settings, "tracing_sample_rate", 1.0):
+            trace = start_trace(REQUEST_ID, "GET /x")
+    with span("outer", kind="test") as outer:
+        outer.set_attribute("rows", 3)
+        with span("inner"):
+            pass
+        with pytest.raises(KeyError):
+            with span("failing"):
+                raise KeyError("missing")
+    trace.root.end()
+    return trace
+
+
+class TestSpans:
+    """Span tree construction and sampling."""
+
+    def test_nested_spans_form_tree(self):
+        """Children point at the span that was current when they started."""
+        trace = _in_fresh_context(_sampled_trace)
+        spans = {recorded.name: recorded for recorded in trace.spans}
+
+        assert trace.trace_id == REQUEST_ID.replace("-", "")
+        assert spans["outer"].parent_id == trace.root.span_id
+        assert spans["inner"].parent_id == spans["outer"].span_id
+        assert spans["outer"].attributes == {"kind": "test", "rows": 3}
+        assert spans["failing"].error == "KeyError"
+        assert all(recorded.end_ns >= recorded.start_ns for recorded in trace.spans)
+
+    def test_unsampled_requests_record_nothing(self):
+        """Outside a sampled trace spans are no-ops."""
+
+        def run():
+            with patch.object(settings, "tracing_enabled", True):
+                with patch.object(settings, "tracing_sample_rate", 0.0):
+                    assert start_trace(REQUEST_ID, "GET /x") is None
+            with span("ignored") as current:
+                current.set_attribute("key", "value")
+                return current
+
+        assert _in_fresh_context(run) is NOOP_SPAN
+
+
+class TestExporters:
+    """Export formats and the export queue."""
+
+    def test_jsonl_worker(self, tmp_path):
+        """The worker writes one line per span and flushes on stop."""
+        path = tmp_path / "traces.jsonl"
+        worker = SpanExportWorker(JsonlSpanExporter(str(path)))
+        worker.start()
+        worker.submit(_in_fresh_context(_sampled_trace))
+        worker.stop()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [record["name"] for record in records] == ["GET /x", "inner", "failing", "outer"]
+        assert {record["request_id"] for record in records} == {REQUEST_ID}
+
+    def test_full_queue_drops(self):
+        """Traces beyond the queue size are dropped, not waited for."""
+        worker = SpanExportWorker(JsonlSpanExporter("unused"), queue_size=1)
+        trace = Trace(REQUEST_ID, "GET /x")
+        worker.submit(trace)
+        worker.submit(trace)
+        assert worker.dropped == 1
+
+    def test_otlp_payload(self):
+        """Spans are converted to OTLP/HTTP JSON."""
+        trace = _in_fresh_context(_sampled_trace)
+        payload = to_otlp([trace], "reading-list")
+
+        resource = payload["resourceSpans"][0]
+        assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "reading-list"}
+        spans = {item["name"]: item for item in resource["scopeSpans"][0]["spans"]}
+        assert spans["GET /x"]["kind"] == 2
+        assert spans["GET /x"]["parentSpanId"] == ""
+        assert spans["inner"]["parentSpanId"] == spans["outer"]["spanId"]
+        assert spans["failing"]["status"] == {"code": 2, "message": "KeyError"}
+        assert {"key": "rows", "value": {"intValue": "3"}} in spans["outer"]["attributes"]
+
+
+class TestRequestTracing:
+    """Spans recorded for API requests."""
+
+    @pytest.mark.asyncio
+    async def test_request_spans(self, client: AsyncClient, test_user, tmp_path):
+        """Authentication and service calls appear under the request's root span."""
+        headers = {"Authorization": f"Bearer {test_user['access_token']}"}
+        entry = await client.post(
+            "/api/v1/entries", json={"title": "Dune", "kind": "book"}, headers=headers
+        )
+        path = tmp_path / "traces.jsonl"
+        worker = SpanExportWorker(JsonlSpanExporter(str(path)))
+
+        with (
+            patch.object(settings, "tracing_enabled", True),
+            patch.object(settings, "tracing_sample_rate", 1.0),
+            patch.object(tracing, "span_exporter", worker),
+        ):
+            response = await client.get(f"/api/v1/entries/{entry.json()['id']}", headers=headers)
+        worker.start()
+        worker.stop()
+
+        spans = {
+            record["name"]: record for record in map(json.loads, path.read_text().splitlines())
+        }
+        root = spans["GET /api/v1/entries/{entry_id}"]
+        assert root["trace_id"] == response.headers["x-request-id"].replace("-", "")
+        assert root["attributes"]["status"] == 200
+        assert spans["auth.current_user"]["parent_id"] == root["span_id"]
+        assert spans["auth.decode_token"]["parent_id"] == spans["auth.current_user"]["span_id"]
+        assert spans["UserService.get_by_id"]["parent_id"] == spans["auth.current_user"]["span_id"]
+        assert spans["EntryService.get_entry"]["parent_id"] == root["span_id"]
@@ -0,0 +1,277 @@
+"""Tests for multi-file uploads."""
+
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.multipart import MultipartError, QuotaExceededError, spool_multipart
+from app.core.storage import LocalShardedStorage, get_storage
+from app.core.upload import JPEG_EOI, JPEG_SOI, MAX_FILE_SIZE, PNG_MAGIC, inspect_file
+from app.domain.models import Upload, UserStorageUsage
+from app.main import app
+
+PNG_DATA = PNG_MAGIC + b"p" * 2000
+JPEG_DATA = JPEG_SOI + b"j" * 2000 + JPEG_EOI
+GIF_DATA = b"GIF89a" + b"g" * 100
+BOUNDARY = "batchboundary"
+
+
+@pytest.fixture
+async def storage(client: AsyncClient) -> AsyncIterator[LocalShardedStorage]:
+    """Local storage in a temporary directory, injected into the app."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        backend = LocalShardedStorage(temp_dir)
+        app.dependency_overrides[get_storage] = lambda: backend
+        yield backend
+
+
+def _auth(user: dict) -> dict:
+    """Authorization header."""
+    return {"Authorization": f"Bearer {user['access_token']}"}
+
+
+def _files(root: str) -> list[Path]:
+    """All regular files below root."""
+    return [path for path in Path(root).rglob("*") if path.is_file()]
+
+
+def _body(parts: list[tuple[str, str, bytes]]) -> bytes:
+    """Encode (field, filename, data) parts as multipart/form-data."""
+    body = b""
+    for field, filename, data in parts:
+        body += (
+            (
+                f"--{BOUNDARY}\r\n"
+                f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                "Content-Type: application/octet-stream\r\n\r\n"
+            ).encode()
+            + data
+            + b"\r\n"
+        )
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    """Yield data in chunks of the given size."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+class TestSpoolMultipart:
+    """Streaming multipart parsing into temporary files."""
+
+    @pytest.mark.asyncio
+    async def test_spools_file_parts(self):
+        """File parts land in temp files whatever the chunking; other fields are skipped."""
+        body = _body(
+            [
+                ("files", "a.png", PNG_DATA),
+                ("note", "x.txt", b"skip"),
+                ("files", "b.jpg", JPEG_DATA),
+            ]
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            parts = await spool_multipart(
+                _chunks(body, 7), f"multipart/form-data; boundary={BOUNDARY}", temp_dir
+            )
+
+            assert [part["filename"] for part in parts] == ["a.png", "b.jpg"]
+            assert parts[0]["temp_path"].read_bytes() == PNG_DATA
+            assert parts[1]["temp_path"].read_bytes() == JPEG_DATA
+
+    @pytest.mark.asyncio
+    async def test_oversized_part_is_cut_off(self):
+        """A part over the limit is reported and its temp file removed."""
+        body = _body([("files", "big.png", PNG_DATA), ("files", "ok.png", b"x")])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            parts = await spool_multipart(
+                _chunks(body, 512),
+                f"multipart/form-data; boundary={BOUNDARY}",
+                temp_dir,
+                max_size=1000,
+            )
+
+            assert parts[0]["error"] == "file_too_large"
+            assert parts[0]["temp_path"] is None
+            assert parts[1]["error"] is None
+            assert len(_files(temp_dir)) == 1
+
+    @pytest.mark.asyncio
+    async def test_too_many_files(self):
+        """Exceeding max_files fails the body and removes every temp file."""
+        body = _body([("files", f"{index}.png", PNG_DATA) for index in range(3)])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(MultipartError):
+                await spool_multipart(
+                    _chunks(body, 1024),
+                    f"multipart/form-data; boundary={BOUNDARY}",
+                    temp_dir,
+                    max_files=2,
+                )
+            assert _files(temp_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_stops_at_remaining_quota(self):
+        """Spooling stops once the file parts exceed max_total, leaving no temp files."""
+        body = _body([("files", f"{index}.png", PNG_DATA) for index in range(4)])
+        consumed = []
+
+        async def chunks() -> AsyncIterator[bytes]:
+            async for chunk in _chunks(body, 512):
+                consumed.append(chunk)
+                yield chunk
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(QuotaExceededError):
+                await spool_multipart(
+                    chunks(),
+                    f"multipart/form-data; boundary={BOUNDARY}",
+                    temp_dir,
+                    max_total=len(PNG_DATA) + 100,
+                )
+            assert _files(temp_dir) == []
+        assert sum(len(chunk) for chunk in consumed) < len(body) // 2
+
+    def test_inspect_file(self, tmp_path):
+        """Spooled files get the same checks as streamed uploads."""
+        truncated = tmp_path / "truncated.tmp"
+        truncated.write_bytes(JPEG_DATA[:-2])
+        good = tmp_path / "good.tmp"
+        good.write_bytes(JPEG_DATA)
+
+        assert inspect_file(truncated)[:2] == (False, "invalid_file_type")
+        assert inspect_file(good, max_size=100)[:2] == (False, "file_too_large")
+        success, _, info = inspect_file(good)
+        assert success is True
+        assert (info["content_type"], info["size"]) == ("image/jpeg", len(JPEG_DATA))
+
+
+class TestUploadBatch:
+    """POST /api/v1/uploads."""
+
+    @pytest.mark.asyncio
+    async def test_stores_all_files(self, client: AsyncClient, test_user, storage):
+        """Every valid part is stored and reported with its upload id."""
+        response = await client.post(
+            "/api/v1/uploads",
+            files=[("files", ("a.png", PNG_DATA)), ("files", ("b.jpg", JPEG_DATA))],
+            headers=_auth(test_user),
+        )
+
+        assert response.status_code == 201
+        files = response.json()["files"]
+        assert [(f["filename"], f["status"], f["content_type"]) for f in files] == [
+            ("a.png", "stored", "image/png"),
+            ("b.jpg", "stored", "image/jpeg"),
+        ]
+        served = await client.get(
+            f"/api/v1/uploads/{files[1]['upload_id']}", headers=_auth(test_user)
+        )
+        assert served.content == JPEG_DATA
+        assert not list(Path(storage.root).glob("*.tmp"))
+
+    @pytest.mark.asyncio
+    async def test_invalid_file_rolls_back_batch(
+        self, client: AsyncClient, db_session: AsyncSession, test_user, storage
+    ):
+        """One bad file means nothing is stored, with a result per file."""
+        response = await client.post(
+            "/api/v1/uploads",
+            files=[("files", ("a.png", PNG_DATA)), ("files", ("c.gif", GIF_DATA))],
+            headers=_auth(test_user),
+        )
+
+        assert response.status_code == 422
+        files = response.json()["error"]["details"]["files"]
+        assert [(f["status"], f["error"]) for f in files] == [
+            ("rolled_back", None),
+            ("rejected", "invalid_file_type"),
+        ]
+        assert await db_session.scalar(select(func.count()).select_from(Upload)) == 0
+        assert _files(storage.root) == []
+
+    @pytest.mark.asyncio
+    async def test_oversized_file(self, client: AsyncClient, test_user, storage):
+        """A part over the size limit rejects the batch with 413."""
+        response = await client.post(
+            "/api/v1/uploads",
+            files=[("files", ("big.png", PNG_MAGIC + b"p" * MAX_FILE_SIZE))],
+            headers=_auth(test_user),
+        )
+
+        assert response.status_code == 413
+        assert response.json()["error"]["details"]["files"][0]["error"] == "file_too_large"
+        assert _files(storage.root) == []
+
+    @pytest.mark.asyncio
+    async def test_requires_files(self, client: AsyncClient, test_user, storage):
+        """Bodies without file parts, or that are not multipart, are refused."""
+        empty = await client.post(
+            "/api/v1/uploads", data={"note": "hello"}, files=[], headers=_auth(test_user)
+        )
+        not_multipart = await client.post(
+            "/api/v1/uploads", json={"files": []}, headers=_auth(test_user)
+        )
+
+        assert empty.status_code == 400
+        assert not_multipart.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_over_quota_rejected_before_spooling(
+        self, client: AsyncClient, db_session: AsyncSession, test_user, storage
+    ):
+        """A body that cannot fit the remaining quota is refused from Content-Length."""
+        db_session.add(
+            UserStorageUsage(user_id=test_user["user"]["id"], bytes_used=9_000, file_count=1)
+        )
+        await db_session.commit()
+
+        with (
+            patch.object(settings, "upload_quota_bytes", 10_000),
+            patch("app.api.v1.uploads.spool_multipart") as spool,
+        ):
+            response = await client.post(
+                "/api/v1/uploads",
+                files=[("files", ("big.png", PNG_MAGIC + b"p" * 100_000))],
+                headers=_auth(test_user),
+            )
+
+        assert response.status_code == 413
+        assert response.json()["error"]["message"] == "storage_quota_exceeded"
+        spool.assert_not_called()
+        assert _files(storage.root) == []
+
+    @pytest.mark.asyncio
+    async def test_streamed_body_stops_at_quota(
+        self, client: AsyncClient, db_session: AsyncSession, test_user, storage
+    ):
+        """Without Content-Length, the body is only read until it passes the quota."""
+        body = _body([("files", f"{index}.png", PNG_DATA) for index in range(5)])
+        sent = []
+
+        async def stream() -> AsyncIterator[bytes]:
+            async for chunk in _chunks(body, 512):
+                sent.append(chunk)
+                yield chunk
+
+        with patch.object(settings, "upload_quota_bytes", len(PNG_DATA)):
+            response = await client.post(
+                "/api/v1/uploads",
+                content=stream(),
+                headers={
+                    **_auth(test_user),
+                    "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+                },
+            )
+
+        assert response.status_code == 413
+        assert response.json()["error"]["message"] == "storage_quota_exceeded"
+        assert sum(len(chunk) for chunk in sent) < len(body)
+        assert _files(storage.root) == []
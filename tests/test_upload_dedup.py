@@ -0,0 +1,158 @@
+"""Tests for content-addressed, reference-counted upload storage."""
+
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.storage import LocalShardedStorage
+from app.core.upload import commit_content_addressed, content_path, receive_stream
+from app.domain.models import UploadBlob, User
+from app.services.upload_service import UploadService
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + b"p" * 1000
+OTHER_PNG = b"\x89PNG\r\n\x1a\n" + b"q" * 1000
+
+
+async def _chunks(data: bytes, size: int = 100) -> AsyncIterator[bytes]:
+    """Yield data in chunks of the given size."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.fixture
+def upload_dir():
+    """Temporary upload directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+@pytest.fixture
+async def users(db_session: AsyncSession) -> tuple[User, User]:
+    """Two users without going through the API."""
+    alice = User(email="alice@example.com", username="alice", hashed_password="x")
+    bob = User(email="bob@example.com", username="bob", hashed_password="x")
+    db_session.add_all([alice, bob])
+    await db_session.flush()
+    return alice, bob
+
+
+def _files(base_dir: str) -> list[Path]:
+    """All regular files below base_dir."""
+    return [path for path in Path(base_dir).rglob("*") if path.is_file()]
+
+
+class TestContentAddressedFiles:
+    """Hashing and sharded placement at the file layer."""
+
+    @pytest.mark.asyncio
+    async def test_receive_hashes_incrementally(self, upload_dir):
+        """The digest matches the content regardless of chunking."""
+        success, _, info = await receive_stream(upload_dir, _chunks(PNG_DATA, 7))
+
+        assert success is True
+        assert info["sha256"] == hashlib.sha256(PNG_DATA).hexdigest()
+        assert info["size"] == len(PNG_DATA)
+        assert info["temp_path"].read_bytes() == PNG_DATA
+
+    @pytest.mark.asyncio
+    async def test_duplicate_is_not_rewritten(self, upload_dir):
+        """A second copy of the same content is discarded, leaving one sharded file."""
+        paths = []
+        for _ in range(2):
+            _, _, info = await receive_stream(upload_dir, _chunks(PNG_DATA))
+            success, path = commit_content_addressed(
+                upload_dir, info["temp_path"], info["sha256"], info["extension"]
+            )
+            assert success is True
+            paths.append(path)
+
+        digest = hashlib.sha256(PNG_DATA).hexdigest()
+        assert paths[0] == paths[1] == str(content_path(upload_dir, digest, ".png"))
+        assert paths[0].endswith(f"{digest[:2]}/{digest[2:4]}/{digest}.png")
+        assert _files(upload_dir) == [Path(paths[0])]
+
+    def test_content_path_rejects_non_digest(self, upload_dir):
+        """Only lowercase hex digests can address a blob."""
+        with pytest.raises(ValueError):
+            content_path(upload_dir, "../" + "a" * 61, ".png")
+
+
+class TestUploadService:
+    """Reference counting across users."""
+
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_blob(self, db_session, users, upload_dir):
+        """Uploads of the same bytes by different users reference one stored blob."""
+        service = UploadService(db_session, storage=LocalShardedStorage(upload_dir))
+        first = await service.store(users[0], "cover.png", _chunks(PNG_DATA))
+        second = await service.store(users[1], "same.png", _chunks(PNG_DATA))
+        await service.store(users[1], "other.png", _chunks(OTHER_PNG))
+
+        assert first.id != second.id
+        assert first.sha256 == second.sha256
+        blob = await db_session.get(UploadBlob, first.sha256)
+        assert blob.ref_count == 2
+        assert len(_files(upload_dir)) == 2
+
+    @pytest.mark.asyncio
+    async def test_blob_deleted_with_last_reference(self, db_session, users, upload_dir):
+        """The file survives until the last upload referencing it is released."""
+        service = UploadService(db_session, storage=LocalShardedStorage(upload_dir))
+        first = await service.store(users[0], "cover.png", _chunks(PNG_DATA))
+        second = await service.store(users[1], "cover.png", _chunks(PNG_DATA))
+        blob_path = Path(upload_dir) / (await db_session.get(UploadBlob, first.sha256)).path
+
+        assert await service.release(first.id, users[0]) == []
+        assert blob_path.exists()
+
+        keys = await service.release(second.id, users[1])
+        await db_session.commit()
+        assert blob_path.exists()
+        await service.delete_files(keys)
+        assert not blob_path.exists()
+        result = await db_session.execute(select(UploadBlob))
+        assert result.scalars().all() == []
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_release_keeps_blob(self, db_session, users, upload_dir):
+        """Releasing touches no files, so a rollback leaves the blob intact."""
+        service = UploadService(db_session, storage=LocalShardedStorage(upload_dir))
+        upload = await service.store(users[0], "cover.png", _chunks(PNG_DATA))
+        upload_id, digest = upload.id, upload.sha256
+        await db_session.commit()
+        blob_path = Path(upload_dir) / (await db_session.get(UploadBlob, digest)).path
+
+        assert await service.release(upload_id, users[0])
+        await db_session.rollback()
+
+        assert blob_path.exists()
+        blob = await db_session.get(UploadBlob, digest)
+        assert blob.ref_count == 1
+
+    @pytest.mark.asyncio
+    async def test_release_requires_ownership(self, db_session, users, upload_dir):
+        """Users cannot release someone else's upload."""
+        service = UploadService(db_session, storage=LocalShardedStorage(upload_dir))
+        upload = await service.store(users[0], "cover.png", _chunks(PNG_DATA))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.release(upload.id, users[1])
+        assert exc_info.value.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_rejected_upload_leaves_nothing(self, db_session, users, upload_dir):
+        """Invalid content is refused without creating files or rows."""
+        service = UploadService(db_session, storage=LocalShardedStorage(upload_dir))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await service.store(users[0], "x.gif", _chunks(b"GIF89a" * 10))
+
+        assert exc_info.value.status_code == 415
+        assert _files(upload_dir) == []
+        assert (await db_session.execute(select(UploadBlob))).scalars().all() == []
@@ -0,0 +1,195 @@
+"""Tests for the orphaned-upload garbage collector."""
+
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.upload import iter_upload_files, shard_key
+from app.domain.models import UploadBlob
+from app.services.upload_gc import UploadGarbageCollector, blob_digest
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def upload_root():
+    """Temporary upload tree."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def _write(root: str, key: str, size: int = 100, age: float = 0.0) -> Path:
+    """Create a file of the given size, modified ``age`` seconds ago."""
+    path = Path(root) / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    modified = time.time() - age
+    os.utime(path, (modified, modified))
+    return path
+
+
+def test_blob_digest():
+    """Originals and thumbnails map to their blob; other names do not."""
+    digest = "ab" * 32
+    assert blob_digest(f"{digest}.png") == digest
+    assert blob_digest(f"{digest}.w160.jpg") == digest
+    assert blob_digest("0b7e3c1a-2f4d-4e5b-9c8a-1d2e3f4a5b6c.png") is None
+
+
+def test_iter_upload_files_batches(upload_root):
+    """The scan covers every shard and honours the batch size."""
+    for index in range(5):
+        _write(upload_root, shard_key(f"{index:02x}{index:02x}ffff.png"))
+    os.symlink("/etc/passwd", Path(upload_root) / "link.png")
+
+    batches = list(iter_upload_files(upload_root, batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    keys = {item["key"] for batch in batches for item in batch}
+    assert keys == {shard_key(f"{index:02x}{index:02x}ffff.png") for index in range(5)}
+
+
+@pytest.mark.asyncio
+async def test_collects_orphans_after_grace_period(db_session: AsyncSession, upload_root):
+    """Unreferenced and stale temporary files go; referenced and recent ones stay."""
+    kept_digest = "aa" * 32
+    orphan_digest = "bb" * 32
+    db_session.add(
+        UploadBlob(
+            sha256=kept_digest, path=shard_key(f"{kept_digest}.png"), size=100, content_type="x"
+        )
+    )
+    await db_session.commit()
+
+    kept = [
+        _write(upload_root, shard_key(f"{kept_digest}.png"), age=2 * DAY),
+        _write(upload_root, shard_key(f"{kept_digest}.w160.jpg"), age=2 * DAY),
+        _write(upload_root, shard_key(f"{orphan_digest}.w320.jpg"), age=60),
+        _write(upload_root, "fresh.tmp", age=60),
+    ]
+    removed = [
+        _write(upload_root, shard_key(f"{orphan_digest}.png"), size=300, age=2 * DAY),
+        _write(upload_root, shard_key("0b7e3c1a-uuid.png"), size=200, age=2 * DAY),
+        _write(upload_root, "crashed.tmp", size=50, age=2 * 3600),
+    ]
+
+    reports = []
+    collector = UploadGarbageCollector(
+        base_dir=upload_root,
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        grace_period=timedelta(days=1),
+        temp_grace_period=timedelta(hours=1),
+        batch_size=2,
+        max_files_per_second=0,
+        progress_hook=reports.append,
+    )
+    report = await collector.run()
+
+    assert report["scanned"] == 7
+    assert report["deleted"] == 3
+    assert report["bytes_reclaimed"] == 550
+    assert len(reports) == 4
+    assert all(path.exists() for path in kept)
+    assert not any(path.exists() for path in removed)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_deletes_nothing(db_session: AsyncSession, upload_root):
+    """A dry run reports reclaimable space but leaves files in place."""
+    orphan = _write(upload_root, shard_key("cc" * 32 + ".png"), size=100, age=2 * DAY)
+
+    collector = UploadGarbageCollector(
+        base_dir=upload_root,
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        max_files_per_second=0,
+        dry_run=True,
+    )
+    report = await collector.run()
+
+    assert report["orphans"] == 1
+    assert report["deleted"] == 0
+    assert report["bytes_reclaimed"] == 100
+    assert orphan.exists()
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_spreads_scan(db_session: AsyncSession, upload_root):
+    """The scan is throttled to the configured files per second."""
+    for index in range(4):
+        _write(upload_root, f"{index}.png")
+
+    collector = UploadGarbageCollector(
+        base_dir=upload_root,
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        batch_size=2,
+        max_files_per_second=40,
+    )
+    started = time.monotonic()
+    await collector.run()
+
+    assert time.monotonic() - started >= 0.09
+
+
+class RacingCollector(UploadGarbageCollector):
+    """Collector that runs a callback between picking orphans and deleting them."""
+
+    def __init__(self, on_collected, **kwargs):
+        super().__init__(**kwargs)
+        self.on_collected = on_collected
+
+    async def collect_batch(self, files: list[dict], now: float) -> list[dict]:
+        orphans = await super().collect_batch(files, now)
+        await self.on_collected()
+        return orphans
+
+
+@pytest.mark.asyncio
+async def test_reference_committed_after_batch_query_keeps_file(
+    db_session: AsyncSession, upload_root
+):
+    """An upload that references the digest before the unlink keeps its file."""
+    digest = "dd" * 32
+    key = shard_key(f"{digest}.png")
+    path = _write(upload_root, key, age=2 * DAY)
+
+    async def upload_commits():
+        db_session.add(UploadBlob(sha256=digest, path=key, size=100, content_type="x"))
+        await db_session.commit()
+
+    collector = RacingCollector(
+        upload_commits,
+        base_dir=upload_root,
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        max_files_per_second=0,
+    )
+    report = await collector.run()
+
+    assert report["orphans"] == 1
+    assert report["deleted"] == 0
+    assert path.exists()
+
+
+@pytest.mark.asyncio
+async def test_file_rewritten_after_scan_is_kept(db_session: AsyncSession, upload_root):
+    """A file whose mtime changed since the scan is not deleted."""
+    digest = "ee" * 32
+    path = _write(upload_root, shard_key(f"{digest}.png"), age=2 * DAY)
+
+    async def upload_rewrites():
+        os.utime(path, None)
+
+    collector = RacingCollector(
+        upload_rewrites,
+        base_dir=upload_root,
+        session_factory=async_sessionmaker(db_session.bind, expire_on_commit=False),
+        max_files_per_second=0,
+    )
+    report = await collector.run()
+
+    assert report["deleted"] == 0
+    assert path.exists()
@@ -0,0 +1,107 @@
+"""Tests for the streaming upload path."""
+
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+
+from app.core.upload import iter_upload_chunks, secure_save_stream
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + b"p" * 1000
+JPEG_DATA = b"\xff\xd8" + b"j" * 1000 + b"\xff\xd9"
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    """Yield data in chunks of the given size."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+class FakeUpload:
+    """Minimal stand-in for Starlette's UploadFile."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+        self.read_sizes: list[int] = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        chunk = self.data[self.position : self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+@pytest.mark.parametrize("data,suffix", [(PNG_DATA, ".png"), (JPEG_DATA, ".jpg")])
+async def test_stream_save_matches_input(chunk_size, data, suffix):
+    """Files are stored intact regardless of how the stream is chunked."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        success, path = await secure_save_stream(temp_dir, "cover", _chunks(data, chunk_size))
+
+        assert success is True
+        assert path.endswith(suffix)
+        assert Path(path).read_bytes() == data
+        assert list(Path(temp_dir).glob("*.tmp")) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_unknown_magic_bytes():
+    """Streams that do not start with an allowed signature are rejected before writing."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        success, reason = await secure_save_stream(temp_dir, "x", _chunks(b"GIF89a" * 10, 2))
+
+        assert (success, reason) == (False, "invalid_file_type")
+        assert list(Path(temp_dir).iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_jpeg_without_eoi():
+    """Truncated JPEGs fail the tail check and leave no temp file behind."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        success, reason = await secure_save_stream(temp_dir, "x.jpg", _chunks(JPEG_DATA[:-1], 100))
+
+        assert (success, reason) == (False, "invalid_file_type")
+        assert list(Path(temp_dir).iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_enforces_size_limit_incrementally():
+    """The size limit aborts the stream without consuming the remaining chunks."""
+    consumed = []
+
+    async def oversized() -> AsyncIterator[bytes]:
+        yield PNG_DATA[:8]
+        for _ in range(100):
+            consumed.append(1)
+            yield b"x" * 100
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        success, reason = await secure_save_stream(temp_dir, "big.png", oversized(), max_size=500)
+
+        assert (success, reason) == (False, "file_too_large")
+        assert len(consumed) == 5
+        assert list(Path(temp_dir).iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_rejects_empty_upload():
+    """Empty streams are not valid images."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        success, reason = await secure_save_stream(temp_dir, "empty", _chunks(b"", 10))
+
+        assert (success, reason) == (False, "invalid_file_type")
+
+
+@pytest.mark.asyncio
+async def test_iter_upload_chunks_reads_fixed_sizes():
+    """UploadFile-like objects are read chunk by chunk."""
+    upload = FakeUpload(PNG_DATA)
+
+    chunks = [chunk async for chunk in iter_upload_chunks(upload, chunk_size=256)]
+
+    assert b"".join(chunks) == PNG_DATA
+    assert max(len(chunk) for chunk in chunks) == 256
+    assert set(upload.read_sizes) == {256}
@@ -0,0 +1,208 @@
+"""Tests for the upload serving endpoint."""
+
+import hashlib
+import tempfile
+from typing import AsyncIterator
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import RangeNotSatisfiableError, etag_matches, parse_byte_range
+from app.core.storage import LocalShardedStorage, get_storage
+from app.domain.models import User
+from app.main import app
+from app.services.upload_service import UploadService
+
+PNG_DATA = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 8
+ETAG = f'"{hashlib.sha256(PNG_DATA).hexdigest()}"'
+
+
+async def _chunks(data: bytes) -> AsyncIterator[bytes]:
+    """Yield data as a single chunk."""
+    yield data
+
+
+@pytest.fixture
+async def storage(client: AsyncClient) -> AsyncIterator[LocalShardedStorage]:
+    """Local storage in a temporary directory, injected into the app."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        backend = LocalShardedStorage(temp_dir)
+        app.dependency_overrides[get_storage] = lambda: backend
+        yield backend
+
+
+@pytest.fixture
+async def upload_id(db_session: AsyncSession, test_user: dict, storage) -> int:
+    """Store a PNG for the test user."""
+    owner = await db_session.get(User, test_user["user"]["id"])
+    upload = await UploadService(db_session, storage).store(owner, "cover.png", _chunks(PNG_DATA))
+    await db_session.commit()
+    return upload.id
+
+
+def _auth(user: dict, **headers: str) -> dict:
+    """Authorization header plus extra headers."""
+    return {"Authorization": f"Bearer {user['access_token']}", **headers}
+
+
+class TestRangeParsing:
+    """Range and conditional header helpers."""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ("bytes=0-9", (0, 9)),
+            ("bytes=10-", (10, 99)),
+            ("bytes=-10", (90, 99)),
+            ("bytes=50-1000", (50, 99)),
+            ("bytes=-1000", (0, 99)),
+            ("bytes=0-1,5-6", None),
+            ("bytes=9-3", None),
+            ("items=0-9", None),
+            ("bytes=a-b", None),
+            (None, None),
+        ],
+    )
+    def test_parse_byte_range(self, header, expected):
+        """Single ranges are resolved; multi-range and malformed headers are ignored."""
+        assert parse_byte_range(header, 100) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0"])
+    def test_unsatisfiable_range(self, header):
+        """Ranges outside the file are rejected."""
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_byte_range(header, 100)
+
+    def test_etag_matching(self):
+        """If-None-Match uses weak comparison and accepts lists and wildcards."""
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"b"')
+
+
+class TestServeUpload:
+    """GET /api/v1/uploads/{id}."""
+
+    @pytest.mark.asyncio
+    async def test_full_response_with_cache_headers(self, client, test_user, upload_id):
+        """The whole file is served with a strong ETag and immutable caching."""
+        response = await client.get(f"/api/v1/uploads/{upload_id}", headers=_auth(test_user))
+
+        assert response.status_code == 200
+        assert response.content == PNG_DATA
+        assert response.headers["content-type"] == "image/png"
+        assert response.headers["etag"] == ETAG
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["accept-ranges"] == "bytes"
+
+    @pytest.mark.asyncio
+    async def test_range_request(self, client, test_user, upload_id):
+        """A single range returns 206 with Content-Range."""
+        response = await client.get(
+            f"/api/v1/uploads/{upload_id}", headers=_auth(test_user, Range="bytes=8-15")
+        )
+
+        assert response.status_code == 206
+        assert response.content == PNG_DATA[8:16]
+        assert response.headers["content-range"] == f"bytes 8-15/{len(PNG_DATA)}"
+        assert response.headers["content-length"] == "8"
+
+    @pytest.mark.asyncio
+    async def test_unsatisfiable_range(self, client, test_user, upload_id):
+        """Ranges past the end return 416."""
+        response = await client.get(
+            f"/api/v1/uploads/{upload_id}",
+            headers=_auth(test_user, Range=f"bytes={len(PNG_DATA)}-"),
+        )
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(PNG_DATA)}"
+
+    @pytest.mark.asyncio
+    async def test_stale_if_range_serves_full_file(self, client, test_user, upload_id):
+        """A mismatching If-Range validator disables the range."""
+        response = await client.get(
+            f"/api/v1/uploads/{upload_id}",
+            headers=_auth(test_user, Range="bytes=0-3", **{"If-Range": '"stale"'}),
+        )
+
+        assert response.status_code == 200
+        assert response.content == PNG_DATA
+
+    @pytest.mark.asyncio
+    async def test_not_modified(self, client, test_user, upload_id):
+        """A matching If-None-Match returns 304 without a body."""
+        response = await client.get(
+            f"/api/v1/uploads/{upload_id}", headers=_auth(test_user, **{"If-None-Match": ETAG})
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == ETAG
+
+    @pytest.mark.asyncio
+    async def test_accel_redirect(self, client, test_user, upload_id):
+        """With a prefix configured, nginx is told to send the file."""
+        with patch("app.api.v1.uploads.settings.upload_accel_redirect_prefix", "/protected/"):
+            response = await client.get(f"/api/v1/uploads/{upload_id}", headers=_auth(test_user))
+
+        digest = ETAG.strip('"')
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == (
+            f"/protected/{digest[:2]}/{digest[2:4]}/{digest}.png"
+        )
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_upload_and_file(self, client, test_user, upload_id, storage):
+        """Deleting the last reference removes the row and, after commit, the file."""
+        digest = ETAG.strip('"')
+        key = f"{digest[:2]}/{digest[2:4]}/{digest}.png"
+        assert await storage.exists(key)
+
+        response = await client.delete(f"/api/v1/uploads/{upload_id}", headers=_auth(test_user))
+        assert response.status_code == 204
+        assert not await storage.exists(key)
+
+        response = await client.get(f"/api/v1/uploads/{upload_id}", headers=_auth(test_user))
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_zero_copy_extension_is_not_used(self, client, test_user, upload_id):
+        """A server offering zero-copy send still gets plain body messages."""
+
+        async def with_zerocopy(scope, receive, send):
+            if scope["type"] == "http":
+                scope = {**scope, "extensions": {"http.response.zerocopysend": {}}}
+            await app(scope, receive, send)
+
+        transport = ASGITransport(app=with_zerocopy)
+        async with AsyncClient(transport=transport, base_url="http://test") as zerocopy_client:
+            response = await zerocopy_client.get(
+                f"/api/v1/uploads/{upload_id}", headers=_auth(test_user)
+            )
+
+        assert response.status_code == 200
+        assert response.content == PNG_DATA
+
+    @pytest.mark.asyncio
+    async def test_requires_ownership(self, client, upload_id):
+        """Other users cannot read the upload."""
+        user_data = {"email": "o@example.com", "username": "other", "password": "Secur3Pass!45"}
+        await client.post("/api/v1/auth/register", json=user_data)
+        login = await client.post(
+            "/api/v1/auth/login",
+            json={"username": "other", "password": user_data["password"]},
+        )
+
+        response = await client.get(f"/api/v1/uploads/{upload_id}", headers=_auth(login.json()))
+        assert response.status_code == 403
+
+    @pytest.mark.asyncio
+    async def test_requires_authentication(self, client, upload_id):
+        """Anonymous requests are rejected."""
+        response = await client.get(f"/api/v1/uploads/{upload_id}")
+        assert response.status_code == 403